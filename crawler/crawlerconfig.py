@@ -1,4 +1,5 @@
 from pathlib import Path
+from utils.env import env_bool, env_int, env_str
 
 # Base directory
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -7,9 +8,27 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Watcher-specific configuration
 CRAWLER_CONFIG = {
     "UPLOAD_FOLDER": BASE_DIR / "uploads",
-    "PROCESSED_FOLDER": BASE_DIR / "processed"
+    "PROCESSED_FOLDER": BASE_DIR / "processed",
+    # Pre-flight sniffing: reject files whose header/envelope is invalid before enqueueing
+    "REJECT_INVALID_FILES": env_bool("REJECT_INVALID_FILES", True),
+    # Upper bound of bytes walked in the DLIS envelope scan (0 scans the whole file); counts are
+    # extrapolated beyond it, so large files are not read in full on the watcher
+    "SNIFF_MAX_SCAN_BYTES": env_int("SNIFF_MAX_SCAN_BYTES", 8 * 1024 * 1024),
+    # Optional JSON file with calibrated cost model coefficients
+    "COST_MODEL_FILE": env_str("COST_MODEL_FILE", str(BASE_DIR / "worker" / "data" / "summary" / "cost_model.json")),
+    # Small LAS files are grouped into batch tasks bounded by file count and total bytes
+    "BATCH_SMALL_FILES": env_bool("BATCH_SMALL_FILES", True),
+    "SMALL_FILE_MAX_BYTES": env_int("SMALL_FILE_MAX_BYTES", 256 * 1024),
+    "BATCH_MAX_FILES": env_int("BATCH_MAX_FILES", 200),
+    "BATCH_MAX_BYTES": env_int("BATCH_MAX_BYTES", 16 * 1024 * 1024),
+    # Discovery walks the upload tree recursively; outputs mirror its folder structure. With a state
+    # file, the discovery cursor survives restarts (files already handed out are not enqueued again)
+    "DISCOVERY_STATE_FILE": env_str("DISCOVERY_STATE_FILE", ""),
+    "DISCOVERY_MAX_FILES_PER_PASS": env_int("DISCOVERY_MAX_FILES_PER_PASS", 0),
+    # Inputs are moved here, keeping their relative path, when handed to the workers (empty keeps them in place)
+    "ARCHIVE_FOLDER": env_str("ARCHIVE_FOLDER", ""),
 }
 
 # Ensure directories exist
-for folder in CRAWLER_CONFIG.values():
-    folder.mkdir(parents=True, exist_ok=True)
\ No newline at end of file
+for folder in (CRAWLER_CONFIG["UPLOAD_FOLDER"], CRAWLER_CONFIG["PROCESSED_FOLDER"]):
+    folder.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,171 @@
+"""
+    Incremental discovery of input files in a (nested) upload directory tree.
+
+    Adding, removing or renaming an entry updates the modification time of its directory, so a
+    directory whose mtime did not change since the last pass still holds the same files and is
+    not listed again: a pass costs one stat per directory instead of one per file. Only the
+    files of changed directories are compared with the files already reported.
+
+    New files are handed out in path order, at most `max_files_per_pass` at a time; the rest
+    stay pending (the cursor) for the following passes. With a state file, directory mtimes,
+    reported files and the cursor survive restarts.
+"""
+import os
+import time
+import orjson
+from pathlib import Path
+
+# A directory listed less than this after its last change is listed again on the next pass, as
+# filesystems with coarse timestamps (NFS, FAT) can record a later change with the same mtime
+_MTIME_SETTLE_NS = 2 * 10 ** 9
+
+
+class UploadDiscovery:
+    """
+    Walks an upload tree with `os.scandir` and reports each new file once.
+    """
+
+    def __init__(self, root, logger, excluded=(), ignored_suffixes=(), state_file=None, max_files_per_pass=0):
+        """
+        Initialize the UploadDiscovery.
+
+        Args:
+            root (str or Path): Upload folder.
+            logger: Logger instance.
+            excluded (iterable, optional): Folders inside the tree that are never walked (e.g. the archive).
+            ignored_suffixes (iterable, optional): File name suffixes that are not inputs.
+            state_file (str or Path, optional): JSON file keeping the discovery state across restarts.
+            max_files_per_pass (int, optional): New files handed out per pass (0 for all).
+        """
+        self._root = Path(root)
+        self._logger = logger
+        self._excluded = {os.path.abspath(folder) for folder in excluded if folder}
+        self._ignored_suffixes = tuple(ignored_suffixes)
+        self._state_file = Path(state_file) if state_file else None
+        self._max_files_per_pass = max_files_per_pass
+        # directory -> {"mtime": mtime_ns, "settled": bool, "files": [names], "dirs": [names]}
+        self._directories = {}
+        self._reported = set()
+        self._pending = []
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        if self._state_file is None or not self._state_file.exists():
+            return
+        try:
+            state = orjson.loads(self._state_file.read_bytes())
+            self._directories = state["directories"]
+            self._reported = set(state["reported"])
+            self._pending = state["pending"]
+            self._logger.info(f"Resuming discovery of {self._root}: {len(self._directories)} directories, "
+                              f"{len(self._reported)} files reported, {len(self._pending)} pending")
+        except (OSError, KeyError, TypeError, orjson.JSONDecodeError) as e:
+            self._logger.warning(f"Ignoring unreadable discovery state {self._state_file}: {e}")
+
+    def save(self):
+        """
+        Writes the discovery state atomically, when it changed since the last save.
+        """
+        if self._state_file is None or not self._dirty:
+            return
+        state = {"directories": self._directories, "reported": sorted(self._reported), "pending": self._pending}
+        tmp_path = self._state_file.with_name(self._state_file.name + ".tmp")
+        tmp_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(orjson.dumps(state))
+        os.replace(tmp_path, self._state_file)
+        self._dirty = False
+
+    def _is_input(self, name):
+        return not name.startswith(".") and not name.endswith(self._ignored_suffixes)
+
+    def _list(self, path):
+        """
+        Lists the input files and sub-directories of a directory, skipping hidden entries.
+        """
+        files, dirs = [], []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    if os.path.abspath(entry.path) not in self._excluded:
+                        dirs.append(entry.name)
+                elif entry.is_file() and self._is_input(entry.name):
+                    files.append(entry.name)
+        return sorted(files), sorted(dirs)
+
+    def _walk(self):
+        """
+        Refreshes the listings of changed directories.
+
+        Returns:
+            list: Paths of the files in changed directories that were not reported yet.
+        """
+        candidates = []
+        visited = set()
+        stack = [str(self._root)]
+        while stack:
+            path = stack.pop()
+            visited.add(path)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+                cached = self._directories.get(path)
+                if cached is None or cached["mtime"] != mtime or not cached["settled"]:
+                    files, dirs = self._list(path)
+                    previous = set(cached["files"]) if cached else set()
+                    # Removed files can be delivered again under the same name
+                    for name in previous.difference(files):
+                        self._reported.discard(os.path.join(path, name))
+                    candidates.extend(os.path.join(path, name) for name in files
+                                      if os.path.join(path, name) not in self._reported)
+                    cached = self._directories[path] = {"mtime": mtime,
+                                                        "settled": time.time_ns() - mtime > _MTIME_SETTLE_NS,
+                                                        "files": files, "dirs": dirs}
+                    self._dirty = True
+            except OSError as e:
+                self._logger.debug(f"Cannot list {path}: {e}")
+                continue
+            stack.extend(os.path.join(path, name) for name in reversed(cached["dirs"]))
+
+        # Forget directories that were removed
+        for path in set(self._directories).difference(visited):
+            for name in self._directories.pop(path)["files"]:
+                self._reported.discard(os.path.join(path, name))
+            self._dirty = True
+        return candidates
+
+    def poll(self):
+        """
+        Returns the new files of the tree, pending files from earlier passes first.
+
+        Returns:
+            list: Paths of new files, each reported once.
+        """
+        queued = set(self._pending)
+        self._pending.extend(path for path in sorted(self._walk()) if path not in queued)
+
+        if self._max_files_per_pass > 0:
+            handed_out, self._pending = self._pending[:self._max_files_per_pass], self._pending[self._max_files_per_pass:]
+        else:
+            handed_out, self._pending = self._pending, []
+
+        self._reported.update(handed_out)
+        self._dirty = self._dirty or bool(handed_out)
+        return [Path(path) for path in handed_out if os.path.exists(path)]
+
+    def retry(self, path):
+        """
+        Reports a file again in the next pass, e.g. while another node holds its claim.
+        """
+        path = str(path)
+        self._reported.discard(path)
+        if path not in self._pending:
+            self._pending.append(path)
+        self._dirty = True
+
+    def relative_folder(self, path):
+        """
+        Returns the folder of `path` relative to the upload root, used to mirror the input tree.
+        """
+        return Path(path).parent.relative_to(self._root)
@@ -1,95 +1,394 @@
-from pathlib import Path
 import time
+
+_import_started = time.perf_counter()
+
+from pathlib import Path
 import os
-from dlisio import dlis
-from worker.tasks import convert_to_json_task
+import shutil
+from worker import app
+from worker.workerconfig import WORKER_CONFIG
+from worker.celeryconfig import broker_folder, results_folder, processed_messages_folder
+from worker.retention import RetentionPolicy, purge_subfolders
 from .crawlerconfig import CRAWLER_CONFIG
-from utils.IdentifyWellLogFormat import IdentifyWellLogFormat
+from .discovery import UploadDiscovery
+from utils.WellLogSniffer import WellLogSniffer
+from utils.CostModel import CostModel
 from mappings.WellLogsFormat import WellLogFormat
 import traceback
 from utils.logger import Logger
+from utils import metrics
+from utils.profiling import PROFILE_MARKER_SUFFIX
+from utils.claims import create_claim_manager, conversion_unit, CLAIMS_CONFIG, FILE_UNIT, HELD, DONE
+from utils.containers import container_type, iter_member_headers, CONTAINER_ZIP
 
 watcher_logger = Logger("watcher.log").get_logger()
 
+# Tasks are submitted by name so the watcher does not import the scanners and their dependencies
+CONVERT_TASK_NAME = "worker.tasks.convert_to_json_task"
+CONVERT_BATCH_TASK_NAME = "worker.tasks.convert_batch_task"
+CONVERT_CONTAINER_TASK_NAME = "worker.tasks.convert_container_task"
+
+
+def _log_startup():
+    """
+    Logs how long the watcher took to start and its peak memory so far.
+    """
+    message = f"Watcher started in {time.perf_counter() - _import_started:.3f}s"
+    try:
+        import resource
+        # ru_maxrss is reported in kilobytes on Linux
+        message += f", peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB"
+    except (ImportError, AttributeError):
+        pass  # The resource module is not available on Windows
+    watcher_logger.info(message)
+
 def poll_folder():
     """
-    Poll the uploads folder for new .las and .dlis files, dynamically detect file formats,
-    and trigger the appropriate Celery tasks.
+    Poll the uploads folder tree for new .las and .dlis files, also inside archives and compressed
+    files, dynamically detect file formats, and trigger the appropriate Celery tasks.
     """
     upload_folder = Path(CRAWLER_CONFIG["UPLOAD_FOLDER"])
     processed_folder = Path(CRAWLER_CONFIG["PROCESSED_FOLDER"])
+    archive_folder = Path(CRAWLER_CONFIG["ARCHIVE_FOLDER"]) if CRAWLER_CONFIG["ARCHIVE_FOLDER"] else None
+
+    # Profiling markers ({input}.profile) are read by the worker, not converted
+    discovery = UploadDiscovery(upload_folder, logger=watcher_logger,
+                                excluded=[archive_folder, processed_folder],
+                                ignored_suffixes=[PROFILE_MARKER_SUFFIX],
+                                state_file=CRAWLER_CONFIG["DISCOVERY_STATE_FILE"] or None,
+                                max_files_per_pass=CRAWLER_CONFIG["DISCOVERY_MAX_FILES_PER_PASS"])
+
+    cost_model = CostModel.load(CRAWLER_CONFIG["COST_MODEL_FILE"])
+    max_scan_bytes = CRAWLER_CONFIG["SNIFF_MAX_SCAN_BYTES"] or None
+
+    # With claims enabled, watchers on several nodes share the uploads folder
+    claims = create_claim_manager(watcher_logger, root=upload_folder)
+    if claims is not None:
+        claims.adopt()
+        claims.start_heartbeat()
+    # With claims, inputs stay in uploads until converted, so another node can reclaim them if
+    # this one dies: file -> archive folder
+    archive_when_done = {}
 
+    # Unconsumed messages in data/in are never touched, only results and consumed messages,
+    # checkpoints of conversions that were never retried and expired claim markers
+    cleanups = {"checkpoints": lambda: purge_subfolders(WORKER_CONFIG["CHECKPOINT_FOLDER"],
+                                                        WORKER_CONFIG["CHECKPOINT_TTL_SECONDS"], watcher_logger)}
+    if claims is not None:
+        cleanups["claims"] = lambda: claims.purge(CLAIMS_CONFIG["DONE_TTL_SECONDS"])
+    retention = RetentionPolicy(folders=[results_folder, processed_messages_folder],
+                                ttl_seconds=WORKER_CONFIG["RESULTS_TTL_SECONDS"],
+                                max_files=WORKER_CONFIG["RESULTS_MAX_FILES"],
+                                interval_seconds=WORKER_CONFIG["RETENTION_INTERVAL_SECONDS"],
+                                logger=watcher_logger, cleanups=cleanups)
+
+    metrics.configure("watcher")
+    if metrics.METRICS_CONFIG["ENABLED"] and metrics.METRICS_CONFIG["PORT"]:
+        metrics.start_http_server(metrics.METRICS_CONFIG["PORT"])
+        watcher_logger.info(f"Serving metrics on port {metrics.METRICS_CONFIG['PORT']}")
+
+    _log_startup()
     watcher_logger.info(f"Polling folder: {upload_folder} for new LAS and DLIS files...")
-    seen_files = set()
 
     while True:
         try:
-            # Get all files in the upload folder
-            current_files = {f for f in upload_folder.iterdir() if f.is_file()}
+            retention.run_if_due()
+            if archive_when_done:
+                _archive_converted(claims, archive_when_done)
+            metrics.set_gauge("welllog_broker_queue_depth", _queue_depth(broker_folder))
 
-            # Detect new files
-            new_files = current_files - seen_files
+            # Detect new files in the upload tree
+            new_files = discovery.poll()
+            batch = []
             for file in new_files:
+                if claims is not None:
+                    claim_status = _claim_status(claims, file)
+                    if claim_status == HELD:
+                        discovery.retry(file)
+                        continue  # Converted by another node, unless its lease expires
+                    if claim_status == DONE:
+                        continue
+
                 watcher_logger.info(f"New file detected: {file}")
+                metrics.inc("welllog_files_detected_total")
 
+                # Outputs mirror the folder structure of the inputs
+                relative_folder = discovery.relative_folder(file)
+                output_folder = processed_folder / relative_folder
+
+                claim = None
+                retry_later = False
                 try:
                     # Wait for the file to stabilize
                     if not _wait_for_file_complete(filepath=file):
                         watcher_logger.info(f"File not ready: {file}")
                         continue
 
-                    # Identify the file format
-                    file_format = IdentifyWellLogFormat.GetFormat(file)
+                    if claims is not None:
+                        claim = claims.try_claim(file)
+                        if claim is None:
+                            watcher_logger.info(f"File claimed by another node: {file}")
+                            metrics.inc("welllog_claims_total", result="lost")
+                            retry_later = True
+                            continue
+                        metrics.inc("welllog_claims_total", result="claimed")
+
+                    # Archives and compressed files are converted member by member, without extracting them
+                    if container_type(file) is not None:
+                        if archive_folder is not None:
+                            if claim is None:
+                                file = _archive_input(file, archive_folder / relative_folder)
+                            else:
+                                archive_when_done[file] = archive_folder / relative_folder
+                        _submit_container(file, output_folder, claims, claim)
+                        continue
+
+                    # Sniff the file: identify the format, validate its structure and estimate cost
+                    sniff_report = WellLogSniffer.sniff(file, cost_model=cost_model, max_scan_bytes=max_scan_bytes)
+                    file_format = WellLogFormat(sniff_report["format"])
+
+                    if file_format != WellLogFormat.UNKNOWN and not sniff_report["valid"]:
+                        if CRAWLER_CONFIG["REJECT_INVALID_FILES"]:
+                            metrics.inc("welllog_files_rejected_total", format=file_format.value, reason="invalid")
+                            watcher_logger.warning(f"Rejected {file_format.value} file {file}: {sniff_report['errors']}")
+                            if claim is not None:
+                                claims.finish(claim)
+                            continue
+                        watcher_logger.warning(f"Sniffing reported errors for {file}: {sniff_report['errors']}")
+
+                    if file_format == WellLogFormat.UNKNOWN:
+                        metrics.inc("welllog_files_rejected_total", format=file_format.value, reason="unknown_format")
+                        watcher_logger.warning(f"Unknown format: {file}")
+                        if claim is not None:
+                            claims.finish(claim)
+                        continue
+
+                    if sniff_report.get("estimate"):
+                        watcher_logger.info(f"Estimated cost for {file}: {sniff_report['estimate']}")
+
+                    # Only accepted files are archived; rejected files stay where they were uploaded
+                    if archive_folder is not None:
+                        if claim is None:
+                            file = _archive_input(file, archive_folder / relative_folder)
+                        else:
+                            archive_when_done[file] = archive_folder / relative_folder
 
                     if file_format == WellLogFormat.LAS:
-                        watcher_logger.info(f"Identified as LAS: {file}")
+                        watcher_logger.info(f"Identified as LAS: {file} (version: {sniff_report.get('version')}, "
+                                            f"wrap: {sniff_report.get('wrap')}, curves: {sniff_report.get('curve_count')}, "
+                                            f"estimated rows: {sniff_report.get('estimated_rows')})")
+
+                        task_kwargs = {
+                            "filepath": str(file),
+                            "output_folder": str(output_folder),
+                            "file_format": WellLogFormat.LAS.value,
+                        }
+                        if claim is not None:
+                            claims.set_units(claim, file, [FILE_UNIT])
+                            task_kwargs["claim_key"] = claim
+
+                        if CRAWLER_CONFIG["BATCH_SMALL_FILES"] and sniff_report["file_size"] <= CRAWLER_CONFIG["SMALL_FILE_MAX_BYTES"]:
+                            # Small files are converted together to amortise the per-task overhead
+                            batch.append({**task_kwargs, "file_size": sniff_report["file_size"]})
+                            if (len(batch) >= CRAWLER_CONFIG["BATCH_MAX_FILES"]
+                                    or sum(item["file_size"] for item in batch) >= CRAWLER_CONFIG["BATCH_MAX_BYTES"]):
+                                _submit_batch(batch, claims)
+                                batch = []
+                            continue
 
-                        result = convert_to_json_task.delay(
-                            filepath=str(file),
-                            output_folder=str(processed_folder),
-                            file_format=WellLogFormat.LAS.value
-                        )
+                        result = app.send_task(CONVERT_TASK_NAME, kwargs=task_kwargs)
 
+                        metrics.inc("welllog_files_enqueued_total", format=WellLogFormat.LAS.value)
                         watcher_logger.info(f"Task submitted for LAS file {file}, Task ID: {result}")
 
                     elif file_format == WellLogFormat.DLIS:
-                        watcher_logger.info(f"Identified as DLIS: {file}. Extracting logical files for scanning")
+                        watcher_logger.info(f"Identified as DLIS: {file} (logical files: {sniff_report.get('logical_file_count')}, "
+                                            f"frames: {sniff_report.get('frame_count')}). Extracting logical files for scanning")
 
-                        logical_files = dlis.load(file)
-                        watcher_logger.info(f"Loaded {len(logical_files)} logical files from DLIS {file}")
+                        logical_file_ids = _list_logical_file_ids(file)
 
-                        for logical_file in logical_files:
+                        # Every logical file is a unit of the claim, finished by its own task
+                        if claim is not None:
+                            claims.set_units(claim, file, logical_file_ids)
 
-                            try:
-                                logical_file_id = str(logical_file.fileheader.id)
-                            except Exception as e:
-                                watcher_logger.error(f"Error accessing logical file header in {file}: {e}")
-                                continue  # Skip this logical file but continue processing others
+                        for logical_file_id in logical_file_ids:
+                            task_kwargs = {
+                                "filepath": str(file),
+                                "output_folder": str(output_folder),
+                                "file_format": WellLogFormat.DLIS.value,
+                                "logical_file_id": logical_file_id,
+                            }
+                            if claim is not None:
+                                task_kwargs["claim_key"] = claim
 
-                            result = convert_to_json_task.delay(
-                                filepath=str(file),
-                                output_folder=str(processed_folder),
-                                file_format=WellLogFormat.DLIS.value,
-                                logical_file_id=logical_file_id
-                            )
+                            result = app.send_task(CONVERT_TASK_NAME, kwargs=task_kwargs)
+                            metrics.inc("welllog_files_enqueued_total", format=WellLogFormat.DLIS.value)
                             watcher_logger.info(
-                                f"Task submitted for logical file {logical_file.fileheader.id} in DLIS file {file}, Task ID: {result}")
-                    else:
-                        watcher_logger.warning(f"Unknown format: {file}")
+                                f"Task submitted for logical file {logical_file_id} in DLIS file {file}, Task ID: {result}")
 
                 except Exception as e:
                     watcher_logger.error(f"Error processing file {file}: {e}")
                     watcher_logger.debug(traceback.format_exc())
+                    if claim is not None:
+                        claims.finish(claim)
 
                 finally:
-                    # Always add the file to the seen_files set, even if an error occurs
-                    seen_files.add(file)
+                    # A file is reported once, even if an error occurs, unless another node holds
+                    # it (it is claimed again if that node's lease expires)
+                    if retry_later:
+                        discovery.retry(file)
+
+            # Submit the remaining small files of this pass
+            if batch:
+                _submit_batch(batch, claims)
+
+            discovery.save()
 
             time.sleep(5)  # Poll every 5 seconds
         except Exception as e:
             watcher_logger.error(f"Critical error during polling: {e}")
             watcher_logger.debug(traceback.format_exc())
 
+def _list_logical_file_ids(file, label=None):
+    """
+    Lists the IDs of the logical files of a DLIS file, skipping those whose header cannot be read.
+    """
+    # dlisio is only needed to list logical files, so it is loaded on first use
+    from dlisio import dlis
+
+    label = label or file
+    with dlis.load(file) as logical_files:
+        watcher_logger.info(f"Loaded {len(logical_files)} logical files from DLIS {label}")
+
+        logical_file_ids = []
+        for logical_file in logical_files:
+
+            try:
+                logical_file_ids.append(str(logical_file.fileheader.id))
+            except Exception as e:
+                watcher_logger.error(f"Error accessing logical file header in {label}: {e}")
+                continue  # Skip this logical file but continue processing others
+    return logical_file_ids
+
+def _submit_container(file, output_folder, claims=None, claim=None):
+    """
+    Submits the conversion of an archive or compressed file. Members are decompressed by the
+    workers, once each:
+    |_zip               members are read directly, so every LAS / DLIS member (identified from
+    |                   its header) gets its own task and unit of the claim
+    |_tar, gz, zst      members can only be reached by decompressing the stream up to them, so the
+                        whole container is one task that converts the members as it reads them
+    """
+    if container_type(file) == CONTAINER_ZIP:
+        members = []
+        for member, member_size, header in iter_member_headers(file):
+            member_format = WellLogSniffer.detect_format(header)
+            if member_format in (WellLogFormat.LAS, WellLogFormat.DLIS):
+                members.append(member)
+            else:
+                metrics.inc("welllog_files_rejected_total", format=member_format.value, reason="unknown_format")
+                watcher_logger.warning(f"Unknown format: member {member} of {file}")
+        submissions = [[member] for member in members]
+        units = [conversion_unit(archive_member=member) for member in members]
+    else:
+        submissions = [None]
+        units = [FILE_UNIT]
+
+    watcher_logger.info(f"Identified as archive: {file} ({len(submissions)} container task(s))")
+
+    # Every member of a zip archive, or the whole stream, is a unit of the claim on the container
+    if claim is not None:
+        claims.set_units(claim, file, units)
+
+    for members in submissions:
+        task_kwargs = {"filepath": str(file), "output_folder": str(output_folder), "members": members}
+        if claim is not None:
+            task_kwargs["claim_key"] = claim
+        result = app.send_task(CONVERT_CONTAINER_TASK_NAME, kwargs=task_kwargs)
+        metrics.inc("welllog_files_enqueued_total", format="container")
+        watcher_logger.info(f"Task submitted for {f'member {members[0]}' if members else 'all members'} of {file}, "
+                            f"Task ID: {result}")
+
+def _submit_batch(batch, claims=None):
+    """
+    Submits a batch of small files as a single Celery task. When it cannot be sent, the claims of
+    its files are finished, as for a file whose submission fails, so their heartbeat stops.
+    """
+    try:
+        items = [{key: value for key, value in item.items() if key != "file_size"} for item in batch]
+        result = app.send_task(CONVERT_BATCH_TASK_NAME, kwargs={"items": items})
+        metrics.inc("welllog_files_enqueued_total", len(items), format=WellLogFormat.LAS.value)
+        watcher_logger.info(f"Batch task submitted for {len(items)} small files, Task ID: {result}")
+    except Exception as e:
+        watcher_logger.error(f"Error submitting batch of {len(batch)} files: {e}")
+        watcher_logger.debug(traceback.format_exc())
+        if claims is not None:
+            for item in batch:
+                if item.get("claim_key"):
+                    claims.finish(item["claim_key"])
+
+def _archive_input(file, target_folder):
+    """
+    Moves an input (and its profiling marker) into the archive tree before it is handed to the
+    workers, so the upload folder only holds files that were not picked up yet.
+
+    A file uploaded again under the same name is archived in a subfolder named after the upload
+    time instead of replacing the earlier copy, which queued tasks may still read. The file name
+    is kept, as output names are derived from it.
+
+    Returns:
+        Path: The archived file, which the workers read.
+    """
+    target = target_folder / file.name
+    if target.exists():
+        target = target_folder / f"{file.name}.{time.time_ns()}" / file.name
+    target.parent.mkdir(parents=True, exist_ok=True)
+    shutil.move(str(file), str(target))
+
+    marker = file.with_name(file.name + PROFILE_MARKER_SUFFIX)
+    if marker.exists():
+        shutil.move(str(marker), str(target.with_name(target.name + PROFILE_MARKER_SUFFIX)))
+
+    watcher_logger.info(f"Archived {file} to {target}")
+    return target
+
+def _archive_converted(claims, archive_when_done):
+    """
+    Archives the claimed inputs whose units all finished (on this node or, after a takeover, on
+    another). Inputs that disappeared are forgotten.
+    """
+    for file, target_folder in list(archive_when_done.items()):
+        claim_status = _claim_status(claims, file)
+        if claim_status == HELD or (claim_status != DONE and file.exists()):
+            continue
+        del archive_when_done[file]
+        if claim_status == DONE:
+            try:
+                _archive_input(file, target_folder)
+            except OSError as e:
+                # Archived by the node that took the file over
+                watcher_logger.warning(f"Error archiving {file}: {e}")
+
+def _claim_status(claims, file):
+    """
+    Returns the claim status of a file, or None if it cannot be read (e.g. the file was removed).
+    """
+    try:
+        return claims.status(file)
+    except OSError as e:
+        watcher_logger.debug(f"Cannot read claim status of {file}: {e}")
+        return None
+
+def _queue_depth(folder):
+    """
+    Counts the messages waiting in the filesystem broker.
+    """
+    try:
+        with os.scandir(folder) as entries:
+            return sum(1 for entry in entries if entry.name.endswith(".msg"))
+    except OSError:
+        return 0
+
 def _wait_for_file_complete(filepath, stabilization_time=10, check_interval=5, abandonment_time=1800):
     """
     Wait until the file size stabilizes and is not modified for a certain duration.
@@ -131,6 +430,10 @@ def _wait_for_file_complete(filepath, stabilization_time=10, check_interval=5, a
                         return False
             else:
                 watcher_logger.info(f"Current file size: {current_size} bytes.")
+                # Files that have not been modified for the stabilization time are ready right away
+                if (time.time() - current_modified_time) >= stabilization_time:
+                    watcher_logger.info(f"File stabilized: {filepath} with size {current_size} bytes.")
+                    return True
 
             # Check if the file has stabilized
             if current_size == last_size and (time.time() - current_modified_time) >= stabilization_time:
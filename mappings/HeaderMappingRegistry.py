@@ -0,0 +1,103 @@
+import json
+from functools import lru_cache
+from pathlib import Path
+from mappings.HeaderMappings import HeaderMapping
+from utils.env import env_str
+
+# Vendor mapping files: {"mapping": {"<json key>": ["<source field>", ...]}, "date_fields": [...]}
+VENDOR_MAPPINGS_FOLDER = Path(env_str("HEADER_MAPPINGS_FOLDER", str(Path(__file__).resolve().parent / "vendors")))
+
+
+class HeaderMappingRegistry:
+    """
+    Header mapping compiled into a reverse lookup table, so a header is built in a single pass
+    over the source fields.
+
+    The default mapping comes from `HeaderMapping`; vendor files add source field aliases after
+    the default ones, so the default fields keep precedence.
+    """
+
+    def __init__(self, mapping, date_fields):
+        """
+        Initialize the HeaderMappingRegistry.
+
+        Args:
+            mapping (dict): JSON Well Log header key -> source fields in order of precedence.
+            date_fields (list): Header keys holding dates.
+        """
+        self._keys = tuple(mapping.keys())
+        self._date_fields = frozenset(date_fields)
+
+        # source field -> (header key, precedence); the first listing of a field wins
+        self._lookup = {}
+        for key, fields in mapping.items():
+            for precedence, field in enumerate(fields):
+                self._lookup.setdefault(field, (key, precedence))
+
+    @classmethod
+    def load(cls, folder=VENDOR_MAPPINGS_FOLDER):
+        """
+        Builds the registry from the default mapping and the vendor files in `folder`, read in
+        file name order.
+        """
+        mapping = {key: list(fields) for key, fields in HeaderMapping.get_default_mapping().items()}
+        date_fields = set(HeaderMapping.get_date_fields())
+
+        folder = Path(folder)
+        vendor_files = sorted(folder.glob("*.json")) if folder.is_dir() else []
+        for vendor_file in vendor_files:
+            with open(vendor_file, "r", encoding="utf-8") as file:
+                vendor = json.load(file)
+            for key, fields in vendor.get("mapping", {}).items():
+                known = mapping.setdefault(key, [])
+                known.extend(field for field in fields if field not in known)
+            date_fields.update(vendor.get("date_fields", []))
+
+        return cls(mapping, sorted(date_fields))
+
+    @property
+    def keys(self):
+        return self._keys
+
+    def is_date_field(self, key):
+        return key in self._date_fields
+
+    def is_mapped(self, field):
+        return field in self._lookup
+
+    def resolve(self, fields, skip_none=False):
+        """
+        Picks the value of every header key from `(source field, value)` pairs in one pass.
+        For each key the value of its highest precedence field present wins; a field listed
+        more than once keeps its first value.
+
+        Args:
+            fields (iterable): `(source field, value)` pairs.
+            skip_none (bool, optional): None values do not count as present for mapped fields.
+
+        Returns:
+            tuple: (dict of header key -> value, dict of unmapped source field -> value)
+        """
+        best = {}
+        mapped = {}
+        unmapped = {}
+        for field, value in fields:
+            entry = self._lookup.get(field)
+            if entry is None:
+                unmapped[field] = value
+                continue
+            key, precedence = entry
+            if skip_none and value is None:
+                continue
+            if key not in best or precedence < best[key]:
+                best[key] = precedence
+                mapped[key] = value
+        return mapped, unmapped
+
+
+@lru_cache(maxsize=1)
+def get_header_mapping_registry():
+    """
+    Returns the registry of this process, compiled on first use.
+    """
+    return HeaderMappingRegistry.load()
@@ -1,12 +1,15 @@
 from scanners.DLISProcessorBase import DLISProcessorBase
+from scanners.ScanRecord import ScanRecord
 import traceback
+import contextlib
+import math
 import numpy as np
 
 class DLISChannelsProcessor(DLISProcessorBase):
     """
     Processes the equipment data in a DLIS logical file and handles extraction and transformation.
     """
-    def __init__(self, logical_file_id, items, logger):
+    def __init__(self, logical_file_id, items, logger, io_lock=None):
         """
         Initialize the DLISParametersProcessor.
 
@@ -14,8 +17,13 @@ class DLISChannelsProcessor(DLISProcessorBase):
             logical_file_id (str): Unique identifier for the logical file.
             items (list): List of parameter objects.
             logger: Logger instance.
+            io_lock (threading.Lock, optional): Lock held while reading curves from the DLIS file,
+                shared by processors that read the same logical file from different threads.
         """
         self._logger = logger
+        self._io_lock = io_lock or contextlib.nullcontext()
+        # Numeric arrays of the scalar channels read by the last bulk data extraction
+        self.columns = {}
         super().__init__(logical_file_id, items, logger)  # Pass logger to base class
 
     def extract_channels(self):
@@ -43,6 +51,40 @@ class DLISChannelsProcessor(DLISProcessorBase):
 
         return self.process_items(attributes, units_relevant_columns, related_columns=related_columns)
 
+    def _read_channels(self):
+        """
+        Reads the bulk data of every channel.
+
+        Returns:
+            tuple: (channel names, channel value arrays, row count of the longest channel)
+        """
+        channel_data = []
+        channel_names = []
+        max_rows = 0
+
+        # Extract and analyze data for each channel
+        for channel in self._items:
+            try:
+                with self._io_lock:
+                    channel_values = channel.curves()  # Get data
+                rows = channel_values.shape[0] if hasattr(channel_values, "shape") else len(channel_values)
+
+                channel_names.append(channel.name)
+                channel_data.append(channel_values)
+                max_rows = max(max_rows, rows)
+
+                column = ScanRecord.numeric_column(channel_values)
+                if column is not None:
+                    self.columns[channel.name] = column
+
+            except Exception as e:
+                self._logger.error(f"Error retrieving data for channel '{channel.name}': {e}")
+                self._logger.debug(traceback.format_exc())
+                continue
+
+        self._logger.info(f"Data acquired for channels: {channel_names}")
+        return channel_names, channel_data, max_rows
+
     def extract_bulk_data(self, null_value=None):
         """
         Optimized extraction of bulk data (curve measurements) from DLIS channels.
@@ -54,26 +96,7 @@ class DLISChannelsProcessor(DLISProcessorBase):
             list: A list containing "data" as a list of rows with values for each channel.
         """
         try:
-            channel_data = []
-            channel_names = []
-            max_rows = 0
-
-            # Extract and analyze data for each channel
-            for channel in self._items:
-                try:
-                    channel_values = channel.curves()  # Get data
-                    rows = channel_values.shape[0] if hasattr(channel_values, "shape") else len(channel_values)
-
-                    channel_names.append(channel.name)
-                    channel_data.append(channel_values)
-                    max_rows = max(max_rows, rows)
-
-                except Exception as e:
-                    self._logger.error(f"Error retrieving data for channel '{channel.name}': {e}")
-                    self._logger.debug(traceback.format_exc())
-                    continue
-
-            self._logger.info(f"Data acquired for channels: {channel_names}")
+            _, channel_data, max_rows = self._read_channels()
 
             # Pre-allocate storage for formatted data
             formatted_data = np.full((max_rows, len(channel_data)), null_value, dtype=object)
@@ -100,4 +123,49 @@ class DLISChannelsProcessor(DLISProcessorBase):
         except Exception as e:
             self._logger.error(f"Unexpected error in extract_bulk_data: {e}")
             self._logger.debug(traceback.format_exc())
-            return []
\ No newline at end of file
+            return []
+
+    def extract_bulk_data_flat(self, null_value=None, min_elements=1):
+        """
+        Extraction of bulk data with array (multi-dimensional) channels kept out of the rows.
+
+        Scalar channels fill the data rows as in `extract_bulk_data`. The cells of array channels
+        with at least `min_elements` elements per sample are left null and their samples are
+        returned as one flattened, row-major array per channel, so they serialize (or are written
+        to a blob) as a single block instead of one small list per sample. Smaller array channels
+        stay nested in the rows.
+
+        Args:
+            null_value (float, optional): Value to replace NaNs. Defaults to None.
+            min_elements (int, optional): Elements per sample from which array channels are flattened.
+
+        Returns:
+            tuple: (data rows, dict of channel name -> {"shape": [rows, *dimensions], "values": 1D array})
+        """
+        try:
+            channel_names, channel_data, max_rows = self._read_channels()
+
+            formatted_data = np.full((max_rows, len(channel_data)), null_value, dtype=object)
+            arrays = {}
+
+            for col_idx, (name, channel_values) in enumerate(zip(channel_names, channel_data)):
+                try:
+                    row_count = len(channel_values)
+                    if not hasattr(channel_values, "shape") or channel_values.ndim == 1:
+                        formatted_data[:row_count, col_idx] = channel_values
+                    elif math.prod(channel_values.shape[1:]) >= min_elements:
+                        arrays[name] = {"shape": list(channel_values.shape),
+                                        "values": np.ascontiguousarray(channel_values).reshape(-1)}
+                    else:
+                        formatted_data[:row_count, col_idx] = [list(row) for row in channel_values]
+
+                except Exception as e:
+                    self._logger.error(f"Error processing column {col_idx}: {e}")
+                    self._logger.debug(traceback.format_exc())
+
+            return formatted_data.tolist(), arrays
+
+        except Exception as e:
+            self._logger.error(f"Unexpected error in extract_bulk_data_flat: {e}")
+            self._logger.debug(traceback.format_exc())
+            return [], {}
@@ -6,7 +6,17 @@ from scanners.DLISEquipmentsProcessor import DLISEquipmentsProcessor
 from scanners.DLISFramesProcessor import DLISFramesProcessor
 from scanners.DLISZonesProcessor import DLISZoneProcessor
 from utils.dlis_utils import transform_curves_to_json_well_log_format
+from utils.executors import create_executor
+from scanners.ScanRecord import ScanRecord
+from dlisio import dlis
+import threading
+import math
+from collections import deque
 
+# Layouts of array (multi-dimensional) channels in the output: "nested" writes one list per sample
+# in the data rows, "flat" one flattened block per channel in the record's "arrays" section
+ARRAY_LAYOUT_NESTED = "nested"
+ARRAY_LAYOUT_FLAT = "flat"
 
 class DLISLogicalFile:
     """
@@ -14,22 +24,215 @@ class DLISLogicalFile:
     Extracts, processes, and transforms origin data using pandas DataFrame.
     """
 
-    def __init__(self, logical_file, logger):
+    def __init__(self, logical_file, logger, parallelism=1, metadata_cache=None, array_layout=ARRAY_LAYOUT_NESTED,
+                 blob_min_elements=0, file_path=None):
         """
         Initialize the DLISLogicalFile.
 
         Args:
             logical_file: The DLIS logical file object.
+            logger: Logger instance.
+            parallelism (int, optional): Number of threads used to run the metadata processors and
+                the per-frame extraction concurrently. 1 runs everything serially.
+            metadata_cache (DLISMetadataCache, optional): Reuses metadata processor outputs for
+                object sets identical to ones already processed.
+            array_layout (str, optional): `nested` or `flat` layout of array channels.
+            blob_min_elements (int, optional): Array channels with at least this many elements per
+                sample are flattened whatever the layout, to be offloaded to blob files (0 disables it).
+            file_path (str or Path, optional): DLIS file holding the logical file. With parallelism
+                above 1, each worker thread reads bulk data through its own handle of this file.
         """
+        if array_layout not in (ARRAY_LAYOUT_NESTED, ARRAY_LAYOUT_FLAT):
+            raise ValueError(f"Unknown array channel layout: {array_layout}")
         self._logical_file = logical_file
         self._logical_file_id = logical_file.fileheader.id
         self._logger = logger  # Store the logger
+        self._parallelism = parallelism
+        # dlisio reads bulk data through the file handle of the logical file, so worker threads open
+        # their own handle of the file, or take turns on the shared one when it cannot be reopened
+        self._file_path = file_path
+        self._io_lock = threading.Lock()
+        self._thread_handles = threading.local()
+        self._opened_files = []
+        self._opened_lock = threading.Lock()
+        self._frames = None
+        self._metadata_cache = metadata_cache
+        self.metadata_cache_hits = 0
+        self.metadata_cache_misses = 0
+        self._stats_lock = threading.Lock()
+        self._array_layout = array_layout
+        self._blob_min_elements = blob_min_elements
 
-    def scan_logical_file(self):
+    def scan_logical_file(self, checkpoint=None):
         """
         Scans the logical file, extracts, transforms, and prints origin data as JSON.
+
+        The metadata processors and the frames are independent, so with parallelism above 1 they
+        are submitted to a thread pool together. Results are collected in submission order, which
+        keeps the output identical to the serial run.
+
+        Args:
+            checkpoint (ConversionCheckpoint, optional): Restores the metadata and frames of a
+                previous attempt and records each newly completed frame.
+        """
+        combined_output = list(self.iter_records(checkpoint=checkpoint))
+
+        self._logger.info(f"Extracting channels for {self._logical_file_id} is successful")
+
+        return combined_output
+
+    def iter_records(self, checkpoint=None):
+        """
+        Yields the records (one per frame) in frame order as they are extracted, so a consumer can
+        serialize and write frame N while the following frames are extracted.
+
+        Args:
+            checkpoint (ConversionCheckpoint, optional): Restores the metadata and frames of a
+                previous attempt and records each newly completed frame.
+
+        Yields:
+            ScanRecord: The logical file metadata combined with the frame metadata, curves and data.
+        """
+        metadata, completed_frames = checkpoint.load() if checkpoint else (None, {})
+        frame_count = len(self._resolve_frames())
+
+        try:
+            yield from self._iter_records(metadata, completed_frames, frame_count, checkpoint)
+        finally:
+            self._close_thread_handles()
+
+    def _iter_records(self, metadata, completed_frames, frame_count, checkpoint):
+        with create_executor(self._parallelism, thread_name_prefix=f"lf-{self._logical_file_id}") as executor:
+            metadata_futures = self._submit_metadata(executor) if metadata is None else None
+
+            self._logger.info(f"Extracting channels for {self._logical_file_id}")
+            frame_outputs = self.iter_frames(executor, skip=completed_frames.keys())
+
+            if metadata_futures is not None:
+                metadata = {key: future.result() for key, future in metadata_futures.items()}
+                if checkpoint:
+                    checkpoint.save_metadata(metadata)
+
+            # Process frames, channels, and curves
+            for frame_index in range(frame_count):
+                frame_output = completed_frames.get(frame_index)
+                if frame_output is None:
+                    _, frame_output = next(frame_outputs)
+                    if checkpoint:
+                        checkpoint.save_frame(frame_index, frame_output)
+
+                # Combine all data into the frame-specific dictionary; restored frames carry no columns
+                yield ScanRecord({**metadata, **frame_output}, columns=getattr(frame_output, "columns", None))
+
+    def extract_metadata(self):
+        """
+        Extracts the header, parameters, equipments, zones and tools shared by all frames.
+
+        Returns:
+            dict: Metadata keyed by output section.
+        """
+        with create_executor(self._parallelism, thread_name_prefix=f"lf-{self._logical_file_id}") as executor:
+            return {key: future.result() for key, future in self._submit_metadata(executor).items()}
+
+    def iter_frames(self, executor, skip=()):
+        """
+        Extracts every frame not in `skip` and yields the results in frame order.
+
+        At most twice the parallelism frames are submitted ahead of the consumer, which keeps
+        the pool busy without holding the bulk data of every frame in memory at once.
+
+        Args:
+            executor: Executor running the per-frame extraction.
+            skip (iterable, optional): Indexes of frames that are already available.
+
+        Yields:
+            tuple: (frame index, ScanRecord with the frame metadata, curves and data, plus the
+            flattened array channels when there are any)
+        """
+        skip = set(skip)
+        pending = [(frame_index, frame) for frame_index, frame in enumerate(self._resolve_frames())
+                   if frame_index not in skip]
+        window = max(self._parallelism, 1) * 2
+
+        def results():
+            futures = deque()
+            for frame_index, frame in pending:
+                futures.append((frame_index, executor.submit(self._extract_frame, frame)))
+                if len(futures) >= window:
+                    yield self._frame_result(*futures.popleft())
+            while futures:
+                yield self._frame_result(*futures.popleft())
+
+        return results()
+
+    def _frame_result(self, frame_index, future):
+        frame_data, formatted_channels, curves, arrays, columns = future.result()
+        frame_output = ScanRecord({"frame": frame_data, "curves": formatted_channels, "data": curves}, columns=columns)
+        if arrays:
+            frame_output["arrays"] = arrays
+        return frame_index, frame_output
+
+    def _resolve_frames(self):
+        """
+        Resolves the dlisio frame and channel sets once, before any worker thread starts, so
+        worker threads only touch parsed objects.
+        """
+        if self._frames is None:
+            self._frames = list(self._logical_file.frames)
+            for frame in self._frames:
+                frame.channels
+        return self._frames
+
+    def _thread_logical_file(self):
+        """
+        Returns the logical file as read through a file handle owned by the calling worker thread,
+        opened on first use, or None when reads go through the shared handle: no file path, a
+        single thread, or a logical file ID the file holds more than once.
+        """
+        if self._file_path is None or self._parallelism <= 1:
+            return None
+        if not hasattr(self._thread_handles, "logical_file"):
+            physical_file = dlis.load(str(self._file_path))
+            with self._opened_lock:
+                self._opened_files.append(physical_file)
+            matches = [logical_file for logical_file in physical_file
+                       if logical_file.fileheader.id == self._logical_file_id]
+            self._thread_handles.logical_file = matches[0] if len(matches) == 1 else None
+        return self._thread_handles.logical_file
+
+    def _close_thread_handles(self):
+        with self._opened_lock:
+            opened, self._opened_files = self._opened_files, []
+        for physical_file in opened:
+            physical_file.close()
+        self._thread_handles = threading.local()
+
+    def _submit_metadata(self, executor):
+        return {
+            "header": executor.submit(self._extract_origins),
+            "parameters": executor.submit(self._extract_parameters),
+            "equipments": executor.submit(self._extract_equipments),
+            "zones": executor.submit(self._extract_zones),
+            "tools": executor.submit(self._extract_tools),
+        }
+
+    def _cached(self, kind, objects, extract):
         """
-        # try:
+        Runs a metadata processor through the metadata cache, when there is one.
+        """
+        if self._metadata_cache is None:
+            return extract()
+
+        value, hit = self._metadata_cache.get_or_extract(kind, objects, extract)
+        with self._stats_lock:
+            if hit:
+                self.metadata_cache_hits += 1
+                self._logger.info(f"Reusing cached {kind} for {self._logical_file_id}")
+            else:
+                self.metadata_cache_misses += 1
+        return value
+
+    def _extract_origins(self):
         # Delegate origin processing to DLISOriginsProcessor
         self._logger.info(f"Extracting origins for {self._logical_file_id}")
 
@@ -38,10 +241,15 @@ class DLISLogicalFile:
             origins=self._logical_file.origins,
             logger=self._logger
         )
-        header = origins_processor.map_headers()
+        header = self._cached("origins", self._logical_file.origins, origins_processor.map_headers)
+        if header:
+            # A cached header may come from another logical file with the same origins
+            header["name"] = self._logical_file_id
 
         self._logger.info(f"Extracting origins for {self._logical_file_id} is successful")
+        return header
 
+    def _extract_parameters(self):
         self._logger.info(f"Extracting parameters for {self._logical_file_id}")
 
         parameters_processor = DLISParametersProcessor(
@@ -49,10 +257,13 @@ class DLISLogicalFile:
             items=self._logical_file.parameters,
             logger=self._logger
         )
-        parameters = parameters_processor.extract_parameters()
+        parameters = self._cached("parameters", self._logical_file.parameters,
+                                  parameters_processor.extract_parameters)
 
         self._logger.info(f"Extracting parameters for {self._logical_file_id} is successful")
+        return parameters
 
+    def _extract_equipments(self):
         self._logger.info(f"Extracting equipments for {self._logical_file_id}")
 
         equipments_processor = DLISEquipmentsProcessor(
@@ -60,10 +271,13 @@ class DLISLogicalFile:
             items=self._logical_file.equipments,
             logger=self._logger
         )
-        equipments = equipments_processor.extract_equipments()
+        equipments = self._cached("equipments", self._logical_file.equipments,
+                                  equipments_processor.extract_equipments)
 
         self._logger.info(f"Extracting equipments for {self._logical_file_id} is successful")
+        return equipments
 
+    def _extract_zones(self):
         self._logger.info(f"Extracting zones for {self._logical_file_id}")
 
         zones_processor = DLISZoneProcessor(
@@ -71,10 +285,12 @@ class DLISLogicalFile:
             items=self._logical_file.zones,
             logger=self._logger
         )
-        zones = zones_processor.extract_zones()
+        zones = self._cached("zones", self._logical_file.zones, zones_processor.extract_zones)
 
         self._logger.info(f"Extracting zones for {self._logical_file_id} is successful")
+        return zones
 
+    def _extract_tools(self):
         self._logger.info(f"Extracting tools for {self._logical_file_id}")
 
         tools_processor = DLISToolsProcessor(
@@ -82,47 +298,58 @@ class DLISLogicalFile:
             items=self._logical_file.tools,
             logger=self._logger
         )
-        tools = tools_processor.extract_tools()
+        tools = self._cached("tools", self._logical_file.tools, tools_processor.extract_tools)
 
         self._logger.info(f"Extracting tools for {self._logical_file_id} is successful")
+        return tools
 
-        self._logger.info(f"Extracting channels for {self._logical_file_id}")
-
-        # Process frames, channels, and curves
-        combined_output = []
-        for frame in self._logical_file.frames:
-            # Extract frame-level metadata
-            frames_processor = DLISFramesProcessor(
-                logical_file_id=self._logical_file_id,
-                items=[frame],
-                logger=self._logger
-            )
-            frame_data = frames_processor.extract_frames()
-
-            # Extract channels and curves for the current frame
-            channels_processor = DLISChannelsProcessor(
-                logical_file_id=self._logical_file_id,
-                items=frame.channels,
-                logger=self._logger
-            )
-            channels = channels_processor.extract_channels()
-            formatted_channels = transform_curves_to_json_well_log_format(channels, logger=self._logger)
-            curves = channels_processor.extract_bulk_data()
+    def _extract_frame(self, frame):
+        """
+        Extracts the frame metadata, curve definitions and bulk data of a single frame.
+
+        Returns:
+            tuple: (frame metadata, curves in JSON Well Log format, data rows, flattened array
+            channels or None, numeric arrays of the scalar channels)
+        """
+        # Reading through a handle of this thread needs no lock
+        io_lock = self._io_lock
+        logical_file = self._thread_logical_file()
+        if logical_file is not None:
+            frame = logical_file.object(frame.type, frame.name, frame.origin, frame.copynumber)
+            io_lock = None
 
-            # Combine all data into the frame-specific dictionary
-            frame_output = {
-                "header": header,
-                "parameters": parameters,
-                "equipments": equipments,
-                "zones": zones,
-                "tools": tools,
-                "frame": frame_data,
-                "curves": formatted_channels,
-                "data": curves
-            }
+        # Extract frame-level metadata
+        frames_processor = DLISFramesProcessor(
+            logical_file_id=self._logical_file_id,
+            items=[frame],
+            logger=self._logger
+        )
+        frame_data = frames_processor.extract_frames()
 
-            combined_output.append(frame_output)
+        # Extract channels and curves for the current frame
+        channels_processor = DLISChannelsProcessor(
+            logical_file_id=self._logical_file_id,
+            items=frame.channels,
+            logger=self._logger,
+            io_lock=io_lock
+        )
+        channels = channels_processor.extract_channels()
+        formatted_channels = transform_curves_to_json_well_log_format(channels, logger=self._logger)
 
-        self._logger.info(f"Extracting channels for {self._logical_file_id} is successful")
+        if self._array_layout == ARRAY_LAYOUT_FLAT:
+            min_elements = 1
+        elif self._blob_min_elements > 0:
+            min_elements = self._blob_min_elements
+        else:
+            curves = channels_processor.extract_bulk_data()
+            return frame_data, formatted_channels, curves, None, channels_processor.columns
 
-        return combined_output
\ No newline at end of file
+        curves, arrays = channels_processor.extract_bulk_data_flat(min_elements=min_elements)
+        for curve in formatted_channels:
+            array = arrays.get(curve["name"])
+            if array is not None:
+                # The curve definition carries what a reader needs to rebuild the samples
+                curve.update({"dimensions": math.prod(array["shape"][1:]), "shape": array["shape"],
+                              "layout": ARRAY_LAYOUT_FLAT})
+        return (frame_data, formatted_channels, curves, {name: array["values"] for name, array in arrays.items()},
+                channels_processor.columns)
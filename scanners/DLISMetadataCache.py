@@ -0,0 +1,89 @@
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+def _encode_value(value):
+    """
+    Encodes an attribute value for hashing. Arrays are hashed by content, since their repr
+    elides the middle of large arrays.
+    """
+    if isinstance(value, np.ndarray):
+        return f"ndarray:{value.dtype}:{value.shape}:".encode() + hashlib.blake2b(value.tobytes()).digest()
+    if isinstance(value, (list, tuple)):
+        return b"[" + b",".join(_encode_value(item) for item in value) + b"]"
+    return repr(value).encode()
+
+
+def fingerprint_objects(kind, objects):
+    """
+    Hashes a set of DLIS metadata objects by their fingerprints and raw attribute values.
+
+    Args:
+        kind (str): Kind of metadata (e.g. `origins`, `parameters`), part of the key.
+        objects (list): dlisio objects.
+
+    Returns:
+        str: Hex digest identifying the object set.
+    """
+    digest = hashlib.blake2b(kind.encode(), digest_size=20)
+    for obj in objects:
+        digest.update(b"\x00" + obj.fingerprint.encode())
+        attic = obj.attic
+        for key in sorted(attic.keys()):
+            attribute = attic[key]
+            digest.update(b"\x01" + key.encode() + b"\x02" + _encode_value(attribute.value)
+                          + b"\x03" + str(attribute.units).encode())
+    return digest.hexdigest()
+
+
+class DLISMetadataCache:
+    """
+    Bounded LRU cache of metadata processor outputs keyed by the fingerprint of the object sets
+    they were built from.
+
+    Multi-run DLIS files often repeat the same origins, parameters, equipments, zones and tools
+    in every logical file; with the cache they are processed once per worker process.
+    """
+
+    def __init__(self, max_entries=256):
+        """
+        Initialize the DLISMetadataCache.
+
+        Args:
+            max_entries (int, optional): Maximum number of cached processor outputs.
+        """
+        self._max_entries = max(max_entries, 1)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_extract(self, kind, objects, extract):
+        """
+        Returns the cached output for an identical object set, or runs `extract` and caches it.
+
+        Args:
+            kind (str): Kind of metadata.
+            objects (list): dlisio objects the output is built from.
+            extract (callable): Builds the output when it is not cached.
+
+        Returns:
+            tuple: (a copy of the output, True on a cache hit)
+        """
+        key = fingerprint_objects(kind, objects)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self._entries[key]), True
+            self.misses += 1
+
+        value = extract()
+        with self._lock:
+            self._entries[key] = copy.deepcopy(value)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return value, False
@@ -1,41 +1,15 @@
-from mappings.HeaderMappings import HeaderMapping
+from mappings.HeaderMappingRegistry import get_header_mapping_registry
 from utils.DateUtils import DateUtils
 import pandas as pd
 from utils.dlis_utils import parse_value, process_dataframe_lists
 import traceback
 
-def _get_first_matching_value(fields, origins_df):
-    """
-    Retrieves the first matching value for a list of fields from the origins DataFrame.
-
-    Args:
-        fields (list): A list of field names to search for.
-        origins_df (pd.DataFrame): DataFrame containing extracted origins.
 
-    Returns:
-        Any: The first non-None value found, or None if no match.
+def _header_value(value):
     """
-    for field in fields:
-        match = origins_df[origins_df["name"] == field]
-        if not match.empty:
-            return match["value"].iloc[0]
-    return None
-
-
-def _add_unmapped_fields(header, header_mapping, origins_df):
+    Returns None for missing origin values (NaN after the DataFrame cleanup), the value otherwise.
     """
-    Adds fields from the origins DataFrame that are not part of the header mapping.
-
-    Args:
-        header (dict): The header dictionary being constructed.
-        header_mapping (dict): The header mapping used for transformation.
-        origins_df (pd.DataFrame): DataFrame containing extracted origins.
-    """
-    mapped_fields = {field for fields in header_mapping.values() for field in fields}
-    for _, row in origins_df.iterrows():
-        field_name = row["name"]
-        if field_name not in mapped_fields:
-            header[field_name] = row["value"]
+    return None if isinstance(value, float) and value != value else value
 
 
 class DLISOriginsProcessor:
@@ -69,19 +43,24 @@ class DLISOriginsProcessor:
             self._logger.info(f"Mapping headers for logical file {self._logical_file_id}...")
 
             origins_df = self._extract_origins()
-            header_mapping = HeaderMapping.get_default_mapping()
+            registry = get_header_mapping_registry()
+
+            # Single pass over the origin attributes: the first origin holding a field wins for
+            # mapped keys, the last one for unmapped fields. Empty attributes are None, not NaN
+            mapped, unmapped = registry.resolve(zip(origins_df["name"], map(_header_value, origins_df["value"])),
+                                                skip_none=True)
             header = {}
 
             # Map fields based on the header mapping
-            for key, fields in header_mapping.items():
-                header[key] = _get_first_matching_value(fields, origins_df)
+            for key in registry.keys:
+                header[key] = mapped.get(key)
 
                 # Convert date fields to ISO 8601 if required
-                if key in HeaderMapping.get_date_fields() and header[key]:
-                    header[key] = DateUtils.to_iso8601(header[key])
+                if registry.is_date_field(key) and header[key]:
+                    header[key] = DateUtils.to_iso8601(header[key], source="dlis")
 
             # Add unmapped fields
-            _add_unmapped_fields(header, header_mapping, origins_df)
+            header.update(unmapped)
 
             # Add the logical file ID
             header["name"] = self._logical_file_id
@@ -161,4 +140,4 @@ class DLISOriginsProcessor:
                 })
                 self._logger.error(f"Error processing attribute '{key}' in logical file {self._logical_file_id}: {ve}")
                 self._logger.debug(traceback.format_exc())  # Logs the full traceback
-            return origin_list
\ No newline at end of file
+        return origin_list
\ No newline at end of file
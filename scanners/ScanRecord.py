@@ -0,0 +1,118 @@
+import numpy as np
+
+
+class ScanRecord(dict):
+    """
+    A record produced by a scanner: one LAS file or one DLIS frame.
+
+    It serializes as the plain dict it is. `columns` also keeps the numeric arrays of the scalar
+    curves as the scanner read them, so previews and statistics are computed without converting
+    the data rows back. Records restored from a checkpoint are plain dicts; their columns are
+    rebuilt from the rows.
+    """
+
+    def __init__(self, *args, columns=None, **kwargs):
+        """
+        Initialize the ScanRecord.
+
+        Args:
+            columns (dict, optional): Curve name -> 1D float64 array (NaN for nulls), in curve order.
+        """
+        super().__init__(*args, **kwargs)
+        self.columns = columns
+
+    @staticmethod
+    def numeric_column(values):
+        """
+        Returns the samples of a scalar curve as a float64 array, or None for array and non-numeric curves.
+        """
+        values = np.asarray(values)
+        if values.ndim != 1 or values.dtype.kind not in "biuf":
+            return None
+        return values.astype(np.float64, copy=False)
+
+    @staticmethod
+    def frame_name(record):
+        """
+        Returns the name of the DLIS frame of a record, or None for LAS records.
+        """
+        frame = record.get("frame")
+        if isinstance(frame, dict) and frame.get("objects"):
+            return next(iter(frame["objects"]))
+        return None
+
+    @staticmethod
+    def index_curve_name(record):
+        """
+        Returns the name of the index curve of a record: the first channel of a DLIS frame that
+        declares an index type, or the first curve of a LAS record. None for DLIS frames indexed
+        by frame number.
+        """
+        frame = record.get("frame")
+        if isinstance(frame, dict) and frame.get("objects"):
+            attributes = frame.get("attributes") or []
+            values = next(iter(frame["objects"].values()))
+            described = dict(zip(attributes, values))
+            channels = described.get("channels") or []
+            return channels[0] if described.get("index_type") and channels else None
+        curves = record.get("curves") or []
+        return curves[0].get("name") if curves else None
+
+    @staticmethod
+    def curve_columns(record):
+        """
+        Returns the numeric arrays of the scalar curves of a record, keyed by curve name in curve
+        order: the scanner's arrays when the record carries them, otherwise arrays rebuilt from
+        the data rows, with the header's null value replaced by NaN.
+
+        Args:
+            record (dict): Record produced by a scanner, or read back from an output.
+
+        Returns:
+            dict: Curve name -> 1D float64 array.
+        """
+        columns = getattr(record, "columns", None)
+        if columns is not None:
+            return columns
+
+        data = record.get("data") or []
+        null_value = (record.get("header") or {}).get("null")
+        columns = {}
+        for position, curve in enumerate(record.get("curves", [])):
+            # Flattened and offloaded array channels have no values in the rows
+            if curve.get("dimensions", 1) != 1 or "layout" in curve:
+                continue
+            try:
+                values = np.array([row[position] for row in data], dtype=np.float64)
+            except (TypeError, ValueError, IndexError):
+                continue  # Text or ragged values
+            if values.ndim != 1:
+                continue  # Array channels nested in the rows
+            if isinstance(null_value, (int, float)) and not np.isnan(null_value):
+                values[values == null_value] = np.nan
+            columns[curve.get("name")] = values
+        return columns
+
+    @staticmethod
+    def index_and_matrix(record):
+        """
+        Splits the numeric columns of a record into its index (the first curve) and a matrix of
+        the other scalar curves, for computations over all curves at once.
+
+        Returns:
+            tuple: (index curve definition, index array, curve names, matrix of shape (rows, curves)
+            padded with NaN), or None when the first curve is not numeric.
+        """
+        curves = record.get("curves") or []
+        columns = ScanRecord.curve_columns(record)
+        if not curves or curves[0].get("name") not in columns:
+            return None
+
+        index_curve = curves[0]
+        index = columns[index_curve["name"]]
+        names = [name for name in columns if name != index_curve["name"]]
+        matrix = np.full((len(index), len(names)), np.nan)
+        for position, name in enumerate(names):
+            values = columns[name][:len(index)]
+            matrix[:len(values), position] = values
+        return index_curve, index, names, matrix
@@ -13,22 +13,48 @@
     A JSON Well Log file consists of one or more log sets each containing a log header, curve definitions and the corresponding measurement data.
     it means that one JSON Well Log file with represent one Logical File.
 """
-from scanners.DLISLogicalFile import DLISLogicalFile
+from scanners.DLISLogicalFile import DLISLogicalFile, ARRAY_LAYOUT_NESTED
 class DLISScanner:
     """
        Scans a DLIS physical file and processes its logical files.
     """
 
-    def __init__(self, file_path, logical_file, logger):
+    def __init__(self, file_path, logical_file, logger, parallelism=1, metadata_cache=None,
+                 array_layout=ARRAY_LAYOUT_NESTED, blob_min_elements=0):
         self._file_path = file_path
         self._logical_file = logical_file
         self._logger = logger
+        self._parallelism = parallelism
+        self._metadata_cache = metadata_cache
+        self._array_layout = array_layout
+        self._blob_min_elements = blob_min_elements
+        self.metadata_cache_stats = {"hits": 0, "misses": 0}
 
-    def scan(self):
+    def scan(self, checkpoint=None):
         """
             Load and process all logical files in the DLIS physical file.
+
+            Args:
+                checkpoint (ConversionCheckpoint, optional): Resumes from and records completed frames.
+        """
+        return list(self.iter_records(checkpoint=checkpoint))
+
+    def iter_records(self, checkpoint=None):
+        """
+            Yields the records of the logical file frame by frame, as they are extracted.
+
+            Args:
+                checkpoint (ConversionCheckpoint, optional): Resumes from and records completed frames.
         """
         self._logger.info(f"Starting scan for logical file {self._logical_file.fileheader.id}")
 
-        logical_file_object = DLISLogicalFile(logical_file=self._logical_file, logger=self._logger)
-        return logical_file_object.scan_logical_file()
\ No newline at end of file
+        logical_file_object = DLISLogicalFile(logical_file=self._logical_file, logger=self._logger,
+                                              parallelism=self._parallelism,
+                                              metadata_cache=self._metadata_cache,
+                                              array_layout=self._array_layout,
+                                              blob_min_elements=self._blob_min_elements,
+                                              file_path=self._file_path)
+        yield from logical_file_object.iter_records(checkpoint=checkpoint)
+        self._logger.info(f"Extracting channels for {self._logical_file.fileheader.id} is successful")
+        self.metadata_cache_stats = {"hits": logical_file_object.metadata_cache_hits,
+                                     "misses": logical_file_object.metadata_cache_misses}
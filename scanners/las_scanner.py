@@ -4,7 +4,8 @@
 
 import lasio
 import lasio.examples
-from mappings.HeaderMappings import HeaderMapping
+from mappings.HeaderMappingRegistry import get_header_mapping_registry
+from scanners.ScanRecord import ScanRecord
 from utils.DateUtils import DateUtils
 from pathlib import Path
 from pydantic import ValidationError
@@ -12,9 +13,18 @@ import numpy as np
 import traceback
 
 class LasScanner:
-    def __init__(self, file, logger):
+    def __init__(self, file, logger, name=None):
+        """
+        Initialize the LasScanner.
+
+        Args:
+            file (str, Path or file-like object): LAS file, or a text stream of its content.
+            logger: Logger instance.
+            name (str, optional): File name used for a stream, e.g. an archive member.
+        """
         self._file = file
         self._logger = logger
+        self._name = name or str(file)
 
 
     def scan(self):
@@ -24,7 +34,7 @@ class LasScanner:
          Returns:
              list: Standardized JSON output of well log data.
          """
-        self._logger.info(f"Scanning LAS file: {self._file}")
+        self._logger.info(f"Scanning LAS file: {self._name}")
 
         try:
             las_file = lasio.read(self._file, engine="normal", encoding="utf-8")
@@ -38,18 +48,18 @@ class LasScanner:
 
             # Combine all sections into a single JSON structure
             combined_output = [
-                {
+                ScanRecord({
                     "header": las_headers,
                     "parameters": las_parameters_data,
                     "curves": las_curves_headers,
                     "data": las_curves_data
-                }
+                }, columns=self._extract_columns(las_file))
             ]
 
-            self._logger.info(f"Successfully scanned LAS file: {self._file}")
+            self._logger.info(f"Successfully scanned LAS file: {self._name}")
             return combined_output
         except Exception as e:
-            self._logger.error(f"Error scanning LAS file {self._file}: {e}")
+            self._logger.error(f"Error scanning LAS file {self._name}: {e}")
             self._logger.debug(traceback.format_exc())
             return []
 
@@ -65,7 +75,7 @@ class LasScanner:
             list: A list of data rows, each being an array of values corresponding to the curves.
         """
         try:
-            self._logger.info(f"Extracting bulk data for LAS file: {self._file}")
+            self._logger.info(f"Extracting bulk data for LAS file: {self._name}")
 
             # Extract data as a NumPy array for faster processing
             curve_data = np.array([curve.data for curve in las_file.curves])
@@ -77,49 +87,58 @@ class LasScanner:
             if null_value is not None:
                 curve_data = np.where(np.isnan(curve_data), null_value, curve_data)
 
-            self._logger.info(f"Successfully extracted bulk data for LAS file: {self._file}")
+            self._logger.info(f"Successfully extracted bulk data for LAS file: {self._name}")
             # Convert back to a Python list
             return curve_data.tolist()
 
         except Exception as e:
-            self._logger.error(f"Error during bulk data extraction for LAS file {self._file}: {e}")
+            self._logger.error(f"Error during bulk data extraction for LAS file {self._name}: {e}")
             self._logger.debug(traceback.format_exc())
             return []
 
+    def _extract_columns(self, las_file):
+        """
+        Keeps the numeric curves as arrays (lasio reads nulls as NaN), for previews and statistics.
+        """
+        columns = {}
+        for curve in las_file.curves:
+            column = ScanRecord.numeric_column(curve.data)
+            if column is not None:
+                columns[curve.mnemonic] = column
+        return columns
+
     #extracting only the headers of the well log file
     def _extract_header(self, las_file):
-        self._logger.info(f"Extracting header for LAS file: {self._file}")
-
-        #getting the default mapping for the well logs header
-        header_mapping = HeaderMapping.get_default_mapping()
-
-        # Build header information based on mapping
-        header = {}
-
-        for key, las_fields in header_mapping.items():
-            # Handle fields that map to multiple LAS attributes
-            header[key] = None
-            for las_field in las_fields:
-                value = las_file.well[las_field].value if las_field in las_file.well else None
+        self._logger.info(f"Extracting header for LAS file: {self._name}")
 
-                if value is not None:
-                    header[key] = value
-                    break  # Stop at the first non-None value
+        #getting the compiled mapping for the well logs header
+        registry = get_header_mapping_registry()
+        well_fields = [(las_field, las_file.well[las_field].value) for las_field in las_file.well.keys()]
+        mapped, unmapped = registry.resolve(well_fields, skip_none=True)
 
+        def mapped_value(key):
+            value = mapped.get(key)
             # Apply ISO 8601 conversion for date fields
-            if key in HeaderMapping.get_date_fields() and header[key] is not None:
-                header[key] = DateUtils.to_iso8601(header[key])
-
-            # Add any remaining LAS file headers not included in the mapping
-            for las_field in las_file.well.keys():
-                if las_field not in {field for fields in header_mapping.values() for field in fields}:
-                    header[las_field] = las_file.well[las_field].value
-
-            # Putting the name of well log file
-            if key in 'name':
-                header[key] = Path(self._file).stem
-
-        self._logger.info(f"Successfully extracted header for LAS file: {self._file}")
+            if registry.is_date_field(key) and value is not None:
+                value = DateUtils.to_iso8601(value, source="las")
+            return value
+
+        # Build header information based on mapping, in the key order of earlier outputs: the
+        # first mapped key, then the LAS file headers not included in the mapping, then the
+        # remaining mapped keys. An unmapped LAS header with the same name as a mapped
+        # key takes its place among the unmapped headers.
+        first_key, *other_keys = registry.keys
+        header = {first_key: mapped_value(first_key)}
+        header.update(unmapped)
+        for key in other_keys:
+            if key not in unmapped:
+                header[key] = mapped_value(key)
+
+        # Putting the name of well log file
+        if "name" in header:
+            header["name"] = Path(self._name).stem
+
+        self._logger.info(f"Successfully extracted header for LAS file: {self._name}")
         return header
 
     def _extract_curve_headers(self, las_file):
@@ -132,7 +151,7 @@ class LasScanner:
         Returns:
             list: A list of curves in the specified JSON schema format.
         """
-        self._logger.info(f"Extracting curve headers for LAS file: {self._file}")
+        self._logger.info(f"Extracting curve headers for LAS file: {self._name}")
         curves = []
 
         for curve in las_file.curves:
@@ -149,7 +168,7 @@ class LasScanner:
             }
             curves.append(curve_data)
 
-        self._logger.info(f"Successfully extracted curve headers for LAS file: {self._file}")
+        self._logger.info(f"Successfully extracted curve headers for LAS file: {self._name}")
         return curves
 
     def _extract_parameter_info(self, las_file):
@@ -162,7 +181,7 @@ class LasScanner:
         Returns:
             dict: Parameter information formatted as specified.
         """
-        self._logger.info(f"Extracting parameter information for LAS file: {self._file}")
+        self._logger.info(f"Extracting parameter information for LAS file: {self._name}")
 
         # Initialize the structure for parameter information
         parameter_info = {
@@ -181,5 +200,5 @@ class LasScanner:
             # Add parameter to the objects section
             parameter_info["objects"][mnemonic] = [value, unit, description]
 
-        self._logger.info(f"Successfully extracted parameter information for LAS file: {self._file}")
+        self._logger.info(f"Successfully extracted parameter information for LAS file: {self._name}")
         return parameter_info
\ No newline at end of file
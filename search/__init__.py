@@ -0,0 +1,2 @@
+from .index import SearchIndex, document_from_result, document_from_output
+from .searchconfig import SEARCH_CONFIG
@@ -0,0 +1,65 @@
+"""
+    Command line queries of the search index:
+
+    python -m search find -m DT -m RHOB --field "FIELD X"   outputs holding both curves in a field
+    python -m search terms mnemonic "DT*"                     indexed terms with their output counts
+    python -m search rebuild [processed folder]               index outputs converted before
+"""
+import argparse
+import sys
+import orjson
+from .index import SearchIndex, TERM_MNEMONIC, TERM_UNIT, TERM_WELL, TERM_FIELD, TERM_OPERATOR, TERM_DATE
+from .searchconfig import SEARCH_CONFIG
+
+_TERM_KINDS = (TERM_MNEMONIC, TERM_UNIT, TERM_WELL, TERM_FIELD, TERM_OPERATOR, TERM_DATE)
+_OUTPUT_COLUMNS = ("well", "field", "operator", "date", "input_file_format", "output_file")
+
+
+def _parser():
+    parser = argparse.ArgumentParser(prog="python -m search", description="Query the index of processed outputs.")
+    parser.add_argument("--index", default=str(SEARCH_CONFIG["INDEX_PATH"]), help="SQLite index file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    find = commands.add_parser("find", help="outputs matching all criteria (patterns: DT*, RHO?)")
+    find.add_argument("-m", "--mnemonic", action="append", default=[], help="curve mnemonic, all required")
+    find.add_argument("-u", "--unit", action="append", default=[], help="curve unit, all required")
+    find.add_argument("-w", "--well", action="append", default=[], help="well, any matches")
+    find.add_argument("-f", "--field", action="append", default=[], help="field, any matches")
+    find.add_argument("-o", "--operator", action="append", default=[], help="operator, any matches")
+    find.add_argument("-d", "--date", action="append", default=[], help="day (YYYY-MM-DD), any matches")
+    find.add_argument("--from", dest="date_from", help="earliest day, inclusive")
+    find.add_argument("--to", dest="date_to", help="latest day, inclusive")
+    find.add_argument("--limit", type=int)
+    find.add_argument("--json", action="store_true", help="print JSON instead of tab-separated columns")
+
+    terms = commands.add_parser("terms", help="indexed terms of a kind with their output counts")
+    terms.add_argument("kind", choices=_TERM_KINDS)
+    terms.add_argument("pattern", nargs="?")
+    terms.add_argument("--limit", type=int)
+
+    rebuild = commands.add_parser("rebuild", help="index every output of the processed folder")
+    rebuild.add_argument("folder", nargs="?", default=str(SEARCH_CONFIG["PROCESSED_FOLDER"]))
+    return parser
+
+
+def main(argv=None):
+    arguments = _parser().parse_args(argv)
+    with SearchIndex(arguments.index, busy_timeout=SEARCH_CONFIG["BUSY_TIMEOUT_SECONDS"]) as index:
+        if arguments.command == "find":
+            outputs = index.search(mnemonics=arguments.mnemonic, units=arguments.unit, wells=arguments.well,
+                                   fields=arguments.field, operators=arguments.operator, dates=arguments.date,
+                                   date_from=arguments.date_from, date_to=arguments.date_to, limit=arguments.limit)
+            if arguments.json:
+                sys.stdout.write(orjson.dumps(outputs, option=orjson.OPT_INDENT_2).decode() + "\n")
+            else:
+                for output in outputs:
+                    print("\t".join("" if output[column] is None else str(output[column]) for column in _OUTPUT_COLUMNS))
+        elif arguments.command == "terms":
+            for term, outputs in index.terms(arguments.kind, arguments.pattern, limit=arguments.limit):
+                print(f"{term}\t{outputs}")
+        else:
+            print(f"Indexed {index.rebuild(arguments.folder)} output(s) from {arguments.folder}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+    Inverted index of the processed outputs in SQLite, so questions such as "which wells have DT
+    and RHOB in field X" are answered from index lookups instead of scanning the summary CSVs.
+
+    |_outputs   one row per output file: file name, format, well, field, operator and date
+    |_terms     (kind, term, output) rows, the primary key serving every lookup; kinds are
+                mnemonic, unit, well, field, operator and date
+
+    Terms are case-folded. Patterns use GLOB wildcards (`DT*`, `RHO?`); a pattern with a literal
+    prefix is still an index range scan. Re-indexing an output replaces its terms.
+
+    The worker completion tasks index every recorded conversion; `rebuild` indexes outputs that
+    already exist. Several worker processes can write at once: the database runs in WAL mode and
+    writers wait for each other up to the busy timeout.
+"""
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+from utils.output_files import is_primary_output, load_output_records
+
+TERM_MNEMONIC = "mnemonic"
+TERM_UNIT = "unit"
+TERM_WELL = "well"
+TERM_FIELD = "field"
+TERM_OPERATOR = "operator"
+TERM_DATE = "date"
+
+# Header keys indexed as terms, as named in the JSON Well Log header
+_HEADER_TERMS = (TERM_WELL, TERM_FIELD, TERM_OPERATOR)
+
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+# Values of a header key that differ between frames are joined by the result consolidation
+_CONSOLIDATED_SEPARATOR = "; "
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outputs (
+    id INTEGER PRIMARY KEY,
+    output_file TEXT NOT NULL UNIQUE,
+    file_name TEXT,
+    input_file_format TEXT,
+    well TEXT,
+    field TEXT,
+    operator TEXT,
+    date TEXT,
+    curve_count INTEGER,
+    indexed_at REAL
+);
+CREATE INDEX IF NOT EXISTS outputs_date ON outputs (date);
+CREATE TABLE IF NOT EXISTS terms (
+    kind TEXT NOT NULL,
+    term TEXT NOT NULL,
+    output_id INTEGER NOT NULL,
+    PRIMARY KEY (kind, term, output_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS terms_output ON terms (output_id);
+"""
+
+
+def _header_values(value):
+    """
+    Returns the distinct non-empty values of a header or result field as strings.
+    """
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        values = [item for element in value for item in _header_values(element)]
+    else:
+        values = [part.strip() for part in str(value).split(_CONSOLIDATED_SEPARATOR)]
+    # Missing values may come back from the result serialization as "None" or "nan"
+    return list(dict.fromkeys(value for value in values if value and value not in ("None", "nan")))
+
+
+def _date_term(value):
+    # ISO dates are indexed by day, so `2020-01-*` and date ranges work
+    match = _ISO_DATE.match(value)
+    return match.group(0) if match else value
+
+
+def _term(value):
+    return str(value).strip().casefold()
+
+
+def document_from_result(result):
+    """
+    Builds the index document of a conversion from its result.
+
+    Args:
+        result (dict): Conversion result, with `curve_units` ([name, unit] pairs) when the worker
+            recorded them, otherwise the `Curve Names` of the summary.
+
+    Returns:
+        dict: Output file, file name, format, header values and curves.
+    """
+    curves = result.get("curve_units")
+    if curves is None:
+        names = result.get("Curve Names")
+        curves = [[name.strip(), None] for name in str(names).split(",")
+                  if name.strip()] if names and names != "None" else []
+    document = {
+        "output_file": str(result.get("output_file")),
+        "file_name": result.get("file_name"),
+        "input_file_format": result.get("input_file_format"),
+        "curves": [tuple(curve) for curve in curves],
+    }
+    for key in _HEADER_TERMS + (TERM_DATE,):
+        document[key] = _header_values(result.get(key))
+    return document
+
+
+def document_from_output(path):
+    """
+    Builds the index document of an output file by reading it (used to index existing outputs).
+
+    Args:
+        path (str or Path): Primary output (`{name}.json` or `{name}.manifest.json`).
+
+    Returns:
+        dict: Output file, file name, format, header values and curves.
+    """
+    path = Path(path)
+    records = load_output_records(path)
+    document = {
+        "output_file": str(path),
+        "file_name": path.name,
+        "input_file_format": "DLIS" if any("frame" in record for record in records) else "LAS",
+        "curves": list(dict.fromkeys((curve.get("name"), curve.get("unit"))
+                                     for record in records for curve in record.get("curves", []))),
+    }
+    for key in _HEADER_TERMS + (TERM_DATE,):
+        document[key] = _header_values([(record.get("header") or {}).get(key) for record in records])
+    return document
+
+
+class SearchIndex:
+    """
+    Inverted index from curve mnemonics, units, wells, fields, operators and dates to output files.
+    """
+
+    def __init__(self, path, busy_timeout=30, logger=None):
+        """
+        Opens the index, creating it when missing.
+
+        Args:
+            path (str or Path): SQLite database file.
+            busy_timeout (int, optional): Seconds a writer waits for the lock of another process.
+            logger (optional): Logger instance.
+        """
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._logger = logger
+        self._connection = sqlite3.connect(self._path, timeout=busy_timeout)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def add_documents(self, documents):
+        """
+        Indexes outputs in one transaction, replacing the terms of outputs indexed before.
+
+        Args:
+            documents (list): Results of `document_from_result` or `document_from_output`.
+        """
+        now = time.time()
+        with self._connection:
+            for document in documents:
+                dates = [_date_term(value) for value in document.get(TERM_DATE, [])]
+                row = (document.get("file_name"), document.get("input_file_format"),
+                       _CONSOLIDATED_SEPARATOR.join(document.get(TERM_WELL, [])) or None,
+                       _CONSOLIDATED_SEPARATOR.join(document.get(TERM_FIELD, [])) or None,
+                       _CONSOLIDATED_SEPARATOR.join(document.get(TERM_OPERATOR, [])) or None,
+                       min((date for date in dates if _ISO_DATE.match(date)), default=None),
+                       len(document.get("curves", [])), now)
+
+                existing = self._connection.execute("SELECT id FROM outputs WHERE output_file = ?",
+                                                    (document["output_file"],)).fetchone()
+                if existing:
+                    output_id = existing["id"]
+                    self._connection.execute("DELETE FROM terms WHERE output_id = ?", (output_id,))
+                    self._connection.execute(
+                        "UPDATE outputs SET file_name = ?, input_file_format = ?, well = ?, field = ?, "
+                        "operator = ?, date = ?, curve_count = ?, indexed_at = ? WHERE id = ?", row + (output_id,))
+                else:
+                    output_id = self._connection.execute(
+                        "INSERT INTO outputs (file_name, input_file_format, well, field, operator, date, "
+                        "curve_count, indexed_at, output_file) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        row + (document["output_file"],)).lastrowid
+
+                curves = document.get("curves", [])
+                terms = {(TERM_MNEMONIC, _term(name)) for curve_name, _ in curves for name in _header_values(curve_name)}
+                terms.update((TERM_UNIT, _term(unit)) for _, curve_unit in curves for unit in _header_values(curve_unit))
+                terms.update((kind, _term(value)) for kind in _HEADER_TERMS for value in document.get(kind, []))
+                terms.update((TERM_DATE, _term(date)) for date in dates)
+                self._connection.executemany("INSERT OR IGNORE INTO terms (kind, term, output_id) VALUES (?, ?, ?)",
+                                             [(kind, term, output_id) for kind, term in terms])
+
+        if self._logger:
+            self._logger.info(f"Indexed {len(documents)} output(s) in {self._path}")
+
+    def remove(self, output_file):
+        """
+        Removes an output from the index.
+        """
+        with self._connection:
+            existing = self._connection.execute("SELECT id FROM outputs WHERE output_file = ?",
+                                                (str(output_file),)).fetchone()
+            if existing:
+                self._connection.execute("DELETE FROM terms WHERE output_id = ?", (existing["id"],))
+                self._connection.execute("DELETE FROM outputs WHERE id = ?", (existing["id"],))
+
+    def search(self, mnemonics=(), units=(), wells=(), fields=(), operators=(), dates=(),
+               date_from=None, date_to=None, limit=None):
+        """
+        Finds the outputs matching all criteria. Every mnemonic and unit must be present in an
+        output; for wells, fields, operators and dates any of the values matches.
+
+        Args:
+            mnemonics (iterable, optional): Curve mnemonics or GLOB patterns, e.g. ["DT", "RHOB"].
+            units (iterable, optional): Curve units or patterns.
+            wells, fields, operators (iterable, optional): Header values or patterns.
+            dates (iterable, optional): Days (`2020-01-15`) or patterns (`2020-01-*`).
+            date_from, date_to (str, optional): Inclusive bounds on the output's earliest day.
+            limit (int, optional): Maximum number of outputs returned.
+
+        Returns:
+            list: Matching outputs as dicts, ordered by well and output file.
+        """
+        conditions, params = [], []
+        for kind, values in ((TERM_MNEMONIC, mnemonics), (TERM_UNIT, units)):
+            for value in values:
+                conditions.append("id IN (SELECT output_id FROM terms WHERE kind = ? AND term GLOB ?)")
+                params += [kind, _term(value)]
+        for kind, values in ((TERM_WELL, wells), (TERM_FIELD, fields), (TERM_OPERATOR, operators), (TERM_DATE, dates)):
+            values = list(values)
+            if values:
+                patterns = " OR ".join(["term GLOB ?"] * len(values))
+                conditions.append(f"id IN (SELECT output_id FROM terms WHERE kind = ? AND ({patterns}))")
+                params += [kind] + [_term(value) for value in values]
+        if date_from:
+            conditions.append("date >= ?")
+            params.append(_date_term(str(date_from)))
+        if date_to:
+            conditions.append("date <= ?")
+            params.append(_date_term(str(date_to)))
+
+        query = "SELECT output_file, file_name, input_file_format, well, field, operator, date, curve_count FROM outputs"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY well, output_file"
+        if limit:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        return [dict(row) for row in self._connection.execute(query, params)]
+
+    def terms(self, kind, pattern=None, limit=None):
+        """
+        Lists the indexed terms of a kind with the number of outputs holding each.
+
+        Args:
+            kind (str): `mnemonic`, `unit`, `well`, `field`, `operator` or `date`.
+            pattern (str, optional): GLOB pattern the terms match.
+            limit (int, optional): Maximum number of terms returned.
+
+        Returns:
+            list: (term, output count) tuples, by term.
+        """
+        query, params = "SELECT term, COUNT(*) AS outputs FROM terms WHERE kind = ?", [kind]
+        if pattern:
+            query += " AND term GLOB ?"
+            params.append(_term(pattern))
+        query += " GROUP BY term ORDER BY term"
+        if limit:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        return [(row["term"], row["outputs"]) for row in self._connection.execute(query, params)]
+
+    def rebuild(self, processed_folder, batch_size=100):
+        """
+        Indexes every output of a processed folder and drops the outputs of that folder that no
+        longer exist.
+
+        Args:
+            processed_folder (str or Path): Folder of the outputs.
+            batch_size (int, optional): Outputs indexed per transaction.
+
+        Returns:
+            int: Number of outputs indexed.
+        """
+        indexed, documents = 0, []
+        for root, _, files in os.walk(Path(processed_folder).resolve()):
+            for file_name in sorted(files):
+                path = Path(root) / file_name
+                if not is_primary_output(path):
+                    continue
+                try:
+                    documents.append(document_from_output(path))
+                except Exception as e:
+                    if self._logger:
+                        self._logger.warning(f"Skipping output {path}: {e}")
+                    continue
+                if len(documents) >= batch_size:
+                    self.add_documents(documents)
+                    indexed, documents = indexed + len(documents), []
+        if documents:
+            self.add_documents(documents)
+            indexed += len(documents)
+
+        processed_folder = Path(processed_folder).resolve()
+        for row in self._connection.execute("SELECT output_file FROM outputs").fetchall():
+            path = Path(row["output_file"])
+            if path.is_relative_to(processed_folder) and not path.exists():
+                self.remove(row["output_file"])
+        return indexed
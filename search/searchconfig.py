@@ -0,0 +1,16 @@
+from pathlib import Path
+from utils.env import env_int, env_str
+
+# Base directory
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+# Search index configuration
+SEARCH_CONFIG = {
+    # SQLite inverted index maintained by the worker completion tasks (next to the summary CSVs)
+    "INDEX_PATH": Path(env_str("SEARCH_INDEX_PATH", str(BASE_DIR / "worker" / "data" / "summary" / "search_index.sqlite"))),
+    # Folder indexed by `python -m search rebuild`
+    "PROCESSED_FOLDER": Path(env_str("SEARCH_PROCESSED_FOLDER", str(BASE_DIR / "processed"))),
+    # Seconds a writer waits for another process holding the index lock
+    "BUSY_TIMEOUT_SECONDS": env_int("SEARCH_BUSY_TIMEOUT_SECONDS", 30),
+}
@@ -0,0 +1,4 @@
+from service import serve
+
+if __name__ == "__main__":
+    serve()
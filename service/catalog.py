@@ -0,0 +1,177 @@
+import csv
+import os
+import threading
+import time
+from pathlib import Path
+import orjson
+from utils.json_index import IndexedJsonReader, index_path_for
+from utils.output_files import MANIFEST_SUFFIX, is_primary_output, output_name
+from .columnar import ColumnarCache, slice_by_index
+
+_SUMMARY_FILES = ("las_scanned_files.csv", "dlis_scanned_files.csv")
+
+
+class OutputCatalog:
+    """
+    In-memory catalogue of the processed folder: which outputs exist, which well they belong to
+    and which curves each frame holds. Curve values are served from the columnar cache.
+    """
+
+    def __init__(self, processed_folder, summary_folder, cache_folder, lru_size, refresh_seconds, logger):
+        self._processed_folder = Path(processed_folder)
+        self._summary_folder = Path(summary_folder)
+        self._refresh_seconds = refresh_seconds
+        self._logger = logger
+        self._columns = ColumnarCache(cache_folder, lru_size, logger)
+        self._outputs = {}
+        self._last_refresh = 0
+        self._lock = threading.Lock()
+
+    def _read_summary(self):
+        """
+        Maps resolved output paths to their summary rows so well names recorded at conversion
+        time are used even when an output header lacks them. Outputs mirror the input tree, so
+        names alone are not unique (`wellA/main.json` and `wellB/main.json`).
+        """
+        rows = {}
+        for summary_file in _SUMMARY_FILES:
+            summary_path = self._summary_folder / summary_file
+            if not summary_path.exists():
+                continue
+            with open(summary_path, "r", newline="", encoding="utf-8") as csv_file:
+                for row in csv.DictReader(csv_file):
+                    if row.get("output_file"):
+                        rows[str(Path(row["output_file"]).resolve())] = row
+        return rows
+
+    def _describe(self, path):
+        """
+        Reads the header and curve definitions of an output without loading its data when an
+        index sidecar or a manifest is available.
+        """
+        if path.name.endswith(MANIFEST_SUFFIX):
+            with open(path, "rb") as file:
+                manifest = orjson.loads(file.read())
+            first_part = path.parent / manifest["parts"][0]["file"] if manifest.get("parts") else None
+            header = {}
+            if first_part is not None:
+                with open(first_part, "rb") as file:
+                    header = orjson.loads(file.read())[0].get("header", {})
+            frames = [{"frame_index": frame["frame_index"], "name": frame.get("name"),
+                       "row_count": frame["row_count"], "curves": frame["curves"]}
+                      for frame in manifest.get("frames", [])]
+            return header, frames
+
+        if index_path_for(path).exists():
+            reader = IndexedJsonReader(path)
+            header = reader.read_section(0, "header") if reader.record_count else {}
+            frames = [{"frame_index": frame_index,
+                       "row_count": reader.index["records"][frame_index]["row_count"],
+                       "curves": [curve.get("name") for curve in reader.read_section(frame_index, "curves")]}
+                      for frame_index in range(reader.record_count)]
+            return header, frames
+
+        with open(path, "rb") as file:
+            records = orjson.loads(file.read())
+        header = records[0].get("header", {}) if records else {}
+        frames = [{"frame_index": frame_index, "row_count": len(record.get("data", [])),
+                   "curves": [curve.get("name") for curve in record.get("curves", [])]}
+                  for frame_index, record in enumerate(records)]
+        return header, frames
+
+    def refresh(self, force=False):
+        """
+        Rescans the processed folder, describing new or changed outputs and dropping removed ones.
+        """
+        with self._lock:
+            if not force and time.time() - self._last_refresh < self._refresh_seconds:
+                return
+            self._last_refresh = time.time()
+
+            summary = self._read_summary()
+            current = {}
+
+            for root, _, files in os.walk(self._processed_folder):
+                for file_name in files:
+                    path = Path(root) / file_name
+                    if not is_primary_output(path):
+                        continue
+                    try:
+                        mtime = path.stat().st_mtime_ns
+                        known = self._outputs.get(str(path))
+                        if known and known["mtime"] == mtime:
+                            current[str(path)] = known
+                            continue
+
+                        header, frames = self._describe(path)
+                        summary_row = summary.get(str(path.resolve()), {})
+                        current[str(path)] = {
+                            "id": str(path.relative_to(self._processed_folder)),
+                            "name": output_name(path),
+                            "path": str(path),
+                            "mtime": mtime,
+                            "well": header.get("well") or summary_row.get("well") or output_name(path),
+                            "field": header.get("field") or summary_row.get("field"),
+                            "frames": frames,
+                        }
+                    except Exception as e:
+                        self._logger.warning(f"Skipping output {path}: {e}")
+
+            self._outputs = current
+            self._logger.info(f"Catalogue refreshed: {len(current)} outputs")
+
+    def outputs(self):
+        self.refresh()
+        return [{key: value for key, value in output.items() if key not in ("path", "mtime")}
+                for output in self._outputs.values()]
+
+    def wells(self):
+        self.refresh()
+        wells = {}
+        for output in self._outputs.values():
+            wells.setdefault(str(output["well"]), []).append(output["id"])
+        return wells
+
+    def _outputs_for_well(self, well):
+        self.refresh()
+        return [output for output in self._outputs.values() if str(output["well"]) == well]
+
+    def curves(self, well):
+        """
+        Lists the curves available for a well, per output and frame.
+        """
+        return [{"output": output["id"], "frame_index": frame["frame_index"], "curves": frame["curves"]}
+                for output in self._outputs_for_well(well)
+                for frame in output["frames"]]
+
+    def curve_range(self, well, curve, start=None, stop=None):
+        """
+        Returns the values of `curve` for a well between index values `start` and `stop`,
+        one entry per output frame holding the curve.
+        """
+        results = []
+        for output in self._outputs_for_well(well):
+            frames = [frame for frame in output["frames"] if curve in frame["curves"]]
+            if not frames:
+                continue
+
+            cached_frames = self._columns.get(output["path"])
+            for frame in frames:
+                cached = cached_frames[frame["frame_index"]]
+                frame_columns = cached["columns"]
+                if curve not in frame_columns:
+                    continue
+
+                # The index declared by the frame (the first curve for LAS); none selects every row
+                index_name = cached["index_curve"]
+                index = frame_columns.get(index_name) if index_name else None
+                selection = slice_by_index(index, start, stop) if index is not None else slice(None)
+
+                results.append({
+                    "output": output["id"],
+                    "frame_index": frame["frame_index"],
+                    "index_curve": index_name,
+                    "index": index[selection].tolist() if index is not None else None,
+                    "values": frame_columns[curve][selection].tolist(),
+                })
+        return results
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np
+from scanners.ScanRecord import ScanRecord
+from utils.output_files import load_output_records, output_name
+
+_CHECKSUM_CHUNK_BYTES = 1024 * 1024
+
+
+def _output_checksum(path):
+    """
+    Hashes the bytes of an output. A manifest lists the checksums of its parts, so its own hash
+    changes whenever a part does.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(_CHECKSUM_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ColumnarCache:
+    """
+    Builds per-curve `.npy` columns from processed JSON outputs and serves them memory-mapped.
+
+    Each output gets a cache directory keyed by its checksum, so a re-converted output gets a
+    fresh cache while an identical one reuses it; the checksum is computed once per path, size
+    and modification time. Building a cache removes the caches of earlier versions of the output
+    and of outputs that no longer exist. Opened outputs are kept in an LRU of `lru_size` entries.
+    Caches are built outside the LRU lock, one build per output at a time, so a cold build does
+    not hold up requests for other outputs.
+    """
+
+    def __init__(self, cache_folder, lru_size, logger):
+        self._cache_folder = Path(cache_folder)
+        self._cache_folder.mkdir(parents=True, exist_ok=True)
+        self._lru_size = max(lru_size, 1)
+        self._logger = logger
+        self._open = OrderedDict()
+        self._keys = {}  # path -> (size, mtime, cache key)
+        self._building = {}  # cache key -> lock held while the cache is built and opened
+        self._lock = threading.Lock()
+
+    def _cache_key(self, path):
+        stat = os.stat(path)
+        known = self._keys.get(str(path))
+        if known is not None and known[:2] == (stat.st_size, stat.st_mtime_ns):
+            return known[2]
+        key = f"{output_name(path)}-{_output_checksum(path)}"
+        self._keys[str(path)] = (stat.st_size, stat.st_mtime_ns, key)
+        return key
+
+    def _build(self, path, cache_dir):
+        """
+        Parses the output once and writes one `.npy` file per scalar curve and frame, with the
+        index curve of every frame.
+        """
+        self._logger.info(f"Building columnar cache for {path}")
+        records = load_output_records(path)
+        tmp_dir = cache_dir.with_name(cache_dir.name + ".tmp")
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+
+        meta = {"source": str(Path(path).resolve()), "frames": []}
+        for frame_index, record in enumerate(records):
+            # Scalar curves as float64 with the header's null value (LAS) replaced by NaN
+            columns = ScanRecord.curve_columns(record)
+            frame_meta = {"frame_index": frame_index, "row_count": len(record.get("data", [])),
+                          "index_curve": ScanRecord.index_curve_name(record), "columns": {}}
+
+            for column, curve in enumerate(record.get("curves", [])):
+                values = columns.get(curve.get("name"))
+                if values is None:
+                    continue
+                file_name = f"f{frame_index}_c{column}.npy"
+                np.save(tmp_dir / file_name, values)
+                frame_meta["columns"][curve.get("name")] = file_name
+
+            meta["frames"].append(frame_meta)
+
+        with open(tmp_dir / "meta.json", "w") as meta_file:
+            json.dump(meta, meta_file)
+        os.replace(tmp_dir, cache_dir)
+        self._prune(meta["source"], keep=cache_dir.name)
+
+    def _prune(self, source, keep):
+        """
+        Removes the caches of other versions of `source` and of outputs that were removed.
+        """
+        for cache_dir in self._cache_folder.iterdir():
+            if not cache_dir.is_dir() or cache_dir.name == keep:
+                continue
+            try:
+                with open(cache_dir / "meta.json", "r") as meta_file:
+                    cached_source = json.load(meta_file).get("source")
+            except (OSError, ValueError):
+                continue  # Being built, or not a cache directory
+            if cached_source is not None and cached_source != source and os.path.exists(cached_source):
+                continue
+            with self._lock:
+                self._open.pop(cache_dir.name, None)
+            try:
+                shutil.rmtree(cache_dir)
+                self._logger.info(f"Removed columnar cache {cache_dir.name}")
+            except OSError as e:
+                # Memory-mapped columns cannot be deleted on Windows; retried on the next build
+                self._logger.warning(f"Cannot remove columnar cache {cache_dir}: {e}")
+
+    def get(self, path):
+        """
+        Returns the memory-mapped columns of an output.
+
+        Returns:
+            list: One dict per frame with its `index_curve` name (None for frames without an
+            index) and `columns` mapping curve name to a read-only memory-mapped array.
+        """
+        key = self._cache_key(path)
+        with self._lock:
+            if key in self._open:
+                self._open.move_to_end(key)
+                return self._open[key]
+            build_lock = self._building.setdefault(key, threading.Lock())
+
+        with build_lock:
+            with self._lock:
+                if key in self._open:
+                    # Opened by the request that held the build lock
+                    self._open.move_to_end(key)
+                    return self._open[key]
+
+            cache_dir = self._cache_folder / key
+            if not (cache_dir / "meta.json").exists():
+                self._build(path, cache_dir)
+
+            with open(cache_dir / "meta.json", "r") as meta_file:
+                meta = json.load(meta_file)
+
+            frames = [{"index_curve": frame.get("index_curve"),
+                       "columns": {name: np.load(cache_dir / file_name, mmap_mode="r")
+                                   for name, file_name in frame["columns"].items()}}
+                      for frame in meta["frames"]]
+
+            with self._lock:
+                self._building.pop(key, None)
+                self._open[key] = frames
+                while len(self._open) > self._lru_size:
+                    self._open.popitem(last=False)
+            return frames
+
+
+def slice_by_index(index, start, stop):
+    """
+    Returns the slice of rows whose index lies within [start, stop] for a monotonic index,
+    increasing or decreasing. None leaves that side open.
+    """
+    if len(index) == 0:
+        return slice(0, 0)
+
+    decreasing = index[0] > index[-1]
+    ordered = index[::-1] if decreasing else index
+    low = -np.inf if start is None else start
+    high = np.inf if stop is None else stop
+    if low > high:
+        low, high = high, low
+
+    first = int(np.searchsorted(ordered, low, side="left"))
+    last = int(np.searchsorted(ordered, high, side="right"))
+    if decreasing:
+        return slice(len(index) - last, len(index) - first)
+    return slice(first, last)
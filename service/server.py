@@ -0,0 +1,91 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+import traceback
+import orjson
+from utils.logger import Logger
+from .catalog import OutputCatalog
+from .serviceconfig import SERVICE_CONFIG
+
+service_logger = Logger("query_service.log").get_logger()
+
+
+def _float_param(params, name):
+    values = params.get(name)
+    if not values or values[0] == "":
+        return None
+    return float(values[0])
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """
+    Read-only JSON endpoints over the processed outputs:
+
+    GET /outputs                                 all outputs with their frames and curves
+    GET /wells                                   well name -> outputs
+    GET /wells/{well}/curves                     curves available for a well
+    GET /wells/{well}/curves/{curve}?start=&stop= curve values between two index values
+    """
+
+    catalog = None
+
+    def _send(self, status, payload):
+        body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+        params = parse_qs(url.query)
+
+        try:
+            if parts == ["outputs"]:
+                return self._send(200, self.catalog.outputs())
+            if parts == ["wells"]:
+                return self._send(200, self.catalog.wells())
+            if len(parts) == 3 and parts[0] == "wells" and parts[2] == "curves":
+                return self._send(200, self.catalog.curves(parts[1]))
+            if len(parts) == 4 and parts[0] == "wells" and parts[2] == "curves":
+                return self._send(200, self.catalog.curve_range(parts[1], parts[3],
+                                                                start=_float_param(params, "start"),
+                                                                stop=_float_param(params, "stop")))
+            return self._send(404, {"error": f"Unknown endpoint: {url.path}"})
+        except ValueError as e:
+            return self._send(400, {"error": str(e)})
+        except Exception as e:
+            service_logger.error(f"Error serving {self.path}: {e}")
+            service_logger.debug(traceback.format_exc())
+            return self._send(500, {"error": str(e)})
+
+    def do_POST(self):
+        self._send(405, {"error": "The query service is read-only"})
+
+    do_PUT = do_POST
+    do_DELETE = do_POST
+
+    def log_message(self, format, *args):
+        service_logger.debug(f"{self.address_string()} - {format % args}")
+
+
+def serve():
+    """
+    Indexes the processed folder and serves the query endpoints until interrupted.
+    """
+    catalog = OutputCatalog(processed_folder=SERVICE_CONFIG["PROCESSED_FOLDER"],
+                            summary_folder=SERVICE_CONFIG["SUMMARY_FOLDER"],
+                            cache_folder=SERVICE_CONFIG["CACHE_FOLDER"],
+                            lru_size=SERVICE_CONFIG["LRU_SIZE"],
+                            refresh_seconds=SERVICE_CONFIG["REFRESH_SECONDS"],
+                            logger=service_logger)
+    catalog.refresh(force=True)
+    QueryRequestHandler.catalog = catalog
+
+    server = ThreadingHTTPServer((SERVICE_CONFIG["HOST"], SERVICE_CONFIG["PORT"]), QueryRequestHandler)
+    service_logger.info(f"Query service listening on {SERVICE_CONFIG['HOST']}:{SERVICE_CONFIG['PORT']}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
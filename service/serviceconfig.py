@@ -0,0 +1,20 @@
+from pathlib import Path
+from utils.env import env_int, env_str
+
+# Base directory
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+# Query service configuration
+SERVICE_CONFIG = {
+    "PROCESSED_FOLDER": Path(env_str("QUERY_PROCESSED_FOLDER", str(BASE_DIR / "processed"))),
+    "SUMMARY_FOLDER": Path(env_str("QUERY_SUMMARY_FOLDER", str(BASE_DIR / "worker" / "data" / "summary"))),
+    # Columnar (.npy) caches built from the JSON outputs, memory-mapped when served
+    "CACHE_FOLDER": Path(env_str("QUERY_CACHE_FOLDER", str(BASE_DIR / "cache"))),
+    "HOST": env_str("QUERY_HOST", "0.0.0.0"),
+    "PORT": env_int("QUERY_PORT", 8080),
+    # Number of outputs whose memory-mapped columns are kept open
+    "LRU_SIZE": env_int("QUERY_LRU_SIZE", 32),
+    # Minimum seconds between rescans of the processed folder
+    "REFRESH_SECONDS": env_int("QUERY_REFRESH_SECONDS", 30),
+}
@@ -22,6 +22,8 @@ FOLDERS=(
   "$BASE_DIR/worker/data/in"
   "$BASE_DIR/worker/data/results"
   "$BASE_DIR/worker/data/summary"
+  "$BASE_DIR/worker/data/checkpoints"
+  "$BASE_DIR/worker/data/processed"
 )
 
 # Create the folders
@@ -48,6 +50,8 @@ while IFS= read -r line || [ -n "$line" ]; do
     DATA_IN_VOLUME=*) echo "DATA_IN_VOLUME=$BASE_DIR/worker/data/in" >> updated_env.tmp ;;
     DATA_RESULTS_VOLUME=*) echo "DATA_RESULTS_VOLUME=$BASE_DIR/worker/data/results" >> updated_env.tmp ;;
     SUMMARY_VOLUME=*) echo "SUMMARY_VOLUME=$BASE_DIR/worker/data/summary" >> updated_env.tmp ;;
+    CHECKPOINTS_VOLUME=*) echo "CHECKPOINTS_VOLUME=$BASE_DIR/worker/data/checkpoints" >> updated_env.tmp ;;
+    DATA_PROCESSED_VOLUME=*) echo "DATA_PROCESSED_VOLUME=$BASE_DIR/worker/data/processed" >> updated_env.tmp ;;
     *) echo "$line" >> updated_env.tmp ;;
   esac
 done < .env
@@ -16,7 +16,7 @@ if not exist "%BASE_DIR%" (
 
 :: Define folder paths based on the .env file structure
 setlocal enabledelayedexpansion
-set FOLDERS="%BASE_DIR%\processed" "%BASE_DIR%\uploads" "%BASE_DIR%\logs" "%BASE_DIR%\worker\data\in" "%BASE_DIR%\worker\data\results" "%BASE_DIR%\worker\data\summary"
+set FOLDERS="%BASE_DIR%\processed" "%BASE_DIR%\uploads" "%BASE_DIR%\logs" "%BASE_DIR%\worker\data\in" "%BASE_DIR%\worker\data\results" "%BASE_DIR%\worker\data\summary" "%BASE_DIR%\worker\data\checkpoints" "%BASE_DIR%\worker\data\processed"
 
 :: Create the folders
 for %%F in (%FOLDERS%) do (
@@ -51,6 +51,10 @@ if not exist .env (
       echo DATA_RESULTS_VOLUME=%BASE_DIR%\worker\data\results>> updated_env.tmp
     ) || echo !line! | findstr /b "SUMMARY_VOLUME=" >nul && (
       echo SUMMARY_VOLUME=%BASE_DIR%\worker\data\summary>> updated_env.tmp
+    ) || echo !line! | findstr /b "CHECKPOINTS_VOLUME=" >nul && (
+      echo CHECKPOINTS_VOLUME=%BASE_DIR%\worker\data\checkpoints>> updated_env.tmp
+    ) || echo !line! | findstr /b "DATA_PROCESSED_VOLUME=" >nul && (
+      echo DATA_PROCESSED_VOLUME=%BASE_DIR%\worker\data\processed>> updated_env.tmp
     ) || (
       echo %%A>> updated_env.tmp
     )
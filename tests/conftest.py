@@ -0,0 +1,43 @@
+import logging
+import sys
+from pathlib import Path
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA = Path(__file__).resolve().parent / "data"
+
+# Tests import the packages the way the watcher and the worker do, from the repository root
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def logger():
+    return logging.getLogger("tests")
+
+
+@pytest.fixture
+def las_path():
+    # LAS 2.0, well WELL-B, DEPT/GR/RHOB with 40 rows from 1000 to 1019.5 m and some nulls
+    return DATA / "sample.las"
+
+
+@pytest.fixture
+def dlis_path():
+    # Two logical files (LF0, LF1) of well WELL-A, each with FRAME0 (DEPTH, GR, 4-wide WF, increasing)
+    # and FRAME1 (TDEP, NPHI, 6-wide IMG, decreasing), 40 rows per frame
+    return DATA / "sample.dlis"
+
+
+@pytest.fixture
+def las_records(las_path, logger):
+    from scanners.las_scanner import LasScanner
+    return LasScanner(las_path, logger).scan()
+
+
+@pytest.fixture
+def dlis_records(dlis_path, logger):
+    from dlisio import dlis
+    from scanners.dlis_scanner import DLISScanner
+    with dlis.load(str(dlis_path)) as logical_files:
+        return DLISScanner(dlis_path, logical_files[0], logger).scan()
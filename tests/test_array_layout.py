@@ -0,0 +1,40 @@
+import numpy as np
+import orjson
+import pytest
+from dlisio import dlis
+from scanners.DLISLogicalFile import ARRAY_LAYOUT_FLAT, ARRAY_LAYOUT_NESTED, DLISLogicalFile
+from utils.SerialiseJson import JsonSerializable
+
+
+def _scan(dlis_path, logger, **options):
+    with dlis.load(str(dlis_path)) as logical_files:
+        records = DLISLogicalFile(logical_files[0], logger, **options).scan_logical_file()
+        return orjson.loads(JsonSerializable.to_json_bytes(records))
+
+
+@pytest.mark.parametrize("frame, name, width", [(0, "WF", 4), (1, "IMG", 6)])
+def test_flat_layout_holds_the_same_values(dlis_path, logger, frame, name, width):
+    nested = _scan(dlis_path, logger)[frame]
+    flat = _scan(dlis_path, logger, array_layout=ARRAY_LAYOUT_FLAT)[frame]
+
+    column = [curve["name"] for curve in flat["curves"]].index(name)
+    curve = flat["curves"][column]
+    assert (curve["layout"], curve["shape"], curve["dimensions"]) == ("flat", [40, width], width)
+    assert "layout" not in nested["curves"][column]
+
+    # Array cells are null in the rows, the values are one row-major block
+    assert all(row[column] is None for row in flat["data"])
+    np.testing.assert_array_equal(np.array(flat["arrays"][name]).reshape(curve["shape"]),
+                                  np.array([row[column] for row in nested["data"]]))
+    scalars = [position for position in range(len(flat["curves"])) if position != column]
+    assert [[row[position] for position in scalars] for row in flat["data"]] == \
+        [[row[position] for position in scalars] for row in nested["data"]]
+
+
+def test_nested_layout_is_the_default(dlis_path, logger):
+    assert _scan(dlis_path, logger, array_layout=ARRAY_LAYOUT_NESTED) == _scan(dlis_path, logger)
+
+
+def test_unknown_layout_raises(dlis_path, logger):
+    with pytest.raises(ValueError, match="Unknown array channel layout"):
+        _scan(dlis_path, logger, array_layout="columns")
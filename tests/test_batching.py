@@ -0,0 +1,105 @@
+import csv
+import functools
+import json
+import pytest
+from utils.logger import Logger
+
+
+@pytest.fixture
+def tasks(tmp_path, monkeypatch):
+    from worker import tasks
+    completions = []
+
+    class Chain:
+        def __init__(self, signature):
+            self.signature = signature
+
+        def apply_async(self):
+            completions.append(self.signature.kwargs)
+
+    monkeypatch.setattr(tasks, "Logger", functools.partial(Logger, log_dir=str(tmp_path / "logs")))
+    monkeypatch.setattr(tasks, "chain", Chain)
+    tasks.completions = completions
+    return tasks
+
+
+@pytest.fixture
+def summary(tmp_path, monkeypatch):
+    from worker import result_handler
+    paths = {"las_csv_path": tmp_path / "las.csv", "las_header_file_path": tmp_path / "las_headers.json"}
+    for name, path in paths.items():
+        monkeypatch.setattr(result_handler, name, path)
+    return result_handler, paths
+
+
+def _small_files(tmp_path, las_path, count):
+    folder = tmp_path / "uploads"
+    folder.mkdir()
+    files = []
+    for position in range(count):
+        path = folder / f"small{position}.las"
+        path.write_bytes(las_path.read_bytes().replace(b"WELL-B", f"WELL-{position}".encode()))
+        files.append(path)
+    return files
+
+
+def test_batch_converts_every_file(tasks, tmp_path, las_path, monkeypatch):
+    files = _small_files(tmp_path, las_path, 3)
+    prefetched = []
+    monkeypatch.setattr(tasks, "prefetch_file", lambda filepath, logger=None: prefetched.append(filepath))
+    items = [{"filepath": str(path), "output_folder": str(tmp_path / "processed"), "file_format": "LAS"}
+             for path in files]
+    # A file that cannot be written fails on its own
+    (tmp_path / "not_a_folder").write_bytes(b"")
+    items.insert(1, dict(items[0], output_folder=str(tmp_path / "not_a_folder")))
+
+    results = tasks.convert_batch_task(items)
+
+    assert [result["status"] for result in results] == ["SUCCESS", "FAILED", "SUCCESS", "SUCCESS"]
+    assert sorted(path.name for path in (tmp_path / "processed").iterdir()) == \
+        ["small0.json", "small1.json", "small2.json"]
+    assert prefetched == [item["filepath"] for item in items[1:]]
+    # One completion task records the converted files
+    completion, = tasks.completions
+    assert [row["well"] for row in completion["results"]] == ["WELL-0", "WELL-1", "WELL-2"]
+
+
+def test_batch_summary_written_once(summary, logger):
+    result_handler, paths = summary
+    results = [{"file_name": "a.las", "input_file_format": "LAS", "well": "A"},
+               {"file_name": "b.las", "input_file_format": "LAS", "well": "B", "field": "F"}]
+    result_handler.update_csv_batch(results, logger)
+    result_handler.update_csv_batch([{"file_name": "c.las", "input_file_format": "LAS", "country": "X"}], logger)
+
+    assert json.loads(paths["las_header_file_path"].read_text()) == \
+        ["file_name", "input_file_format", "well", "field", "country"]
+    with open(paths["las_csv_path"], newline="", encoding="utf-8") as csv_file:
+        rows = list(csv.DictReader(csv_file))
+    # The new file got its header row, and it was extended for the later field
+    assert [(row["file_name"], row["field"], row["country"]) for row in rows] == \
+        [("a.las", "", ""), ("b.las", "F", ""), ("c.las", "", "X")]
+
+
+def test_watcher_submits_one_task_per_batch(monkeypatch):
+    from crawler import watcher
+    sent = []
+    monkeypatch.setattr(watcher.app, "send_task", lambda name, kwargs: sent.append((name, kwargs)) or "task-1")
+    batch = [{"filepath": "a.las", "output_folder": "out", "file_format": "LAS", "file_size": 10},
+             {"filepath": "b.las", "output_folder": "out", "file_format": "LAS", "file_size": 20}]
+
+    watcher._submit_batch(batch)
+
+    assert sent == [(watcher.CONVERT_BATCH_TASK_NAME, {"items": [
+        {"filepath": "a.las", "output_folder": "out", "file_format": "LAS"},
+        {"filepath": "b.las", "output_folder": "out", "file_format": "LAS"}]})]
+
+
+def test_settled_file_accepted_on_first_check(tmp_path, monkeypatch):
+    from crawler import watcher
+    path = tmp_path / "old.las"
+    path.write_bytes(b"~V")
+    sleeps = []
+    monkeypatch.setattr(watcher.time, "sleep", sleeps.append)
+    monkeypatch.setattr(watcher.time, "time", lambda: path.stat().st_mtime + 60)
+    assert watcher._wait_for_file_complete(path, stabilization_time=10, check_interval=5)
+    assert sleeps == []
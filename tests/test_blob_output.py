@@ -0,0 +1,58 @@
+import numpy as np
+import orjson
+import pytest
+from dlisio import dlis
+from scanners.DLISLogicalFile import DLISLogicalFile
+from utils.SerialiseJson import JsonSerializable
+from utils.blob_output import BLOB_FORMAT_NPY, BLOB_FORMAT_RAW, load_blob, offload_array_channels
+
+
+def _scan(dlis_path, logger, **options):
+    with dlis.load(str(dlis_path)) as logical_files:
+        return DLISLogicalFile(logical_files[0], logger, **options).scan_logical_file()
+
+
+def _nested_column(records, frame, name):
+    record = orjson.loads(JsonSerializable.to_json_bytes(records))[frame]
+    column = [curve["name"] for curve in record["curves"]].index(name)
+    return np.array([row[column] for row in record["data"]])
+
+
+@pytest.mark.parametrize("blob_format, files", [
+    (BLOB_FORMAT_NPY, ["sample.frame00000.WF.npy", "sample.frame00001.IMG.npy"]),
+    (BLOB_FORMAT_RAW, ["sample.blobs.bin"]),
+])
+def test_offloaded_channels_round_trip(dlis_path, tmp_path, logger, blob_format, files):
+    nested = _scan(dlis_path, logger)
+    records = _scan(dlis_path, logger, blob_min_elements=4)
+    blob_paths = offload_array_channels(records, tmp_path, "sample", 4, blob_format, logger)
+    assert sorted(path.name for path in blob_paths) == files
+
+    json_path = tmp_path / "sample.json"
+    json_path.write_bytes(JsonSerializable.to_json_bytes(records))
+    written = orjson.loads(json_path.read_bytes())
+    for frame, name in [(0, "WF"), (1, "IMG")]:
+        assert "arrays" not in written[frame]
+        curve = next(curve for curve in written[frame]["curves"] if curve["name"] == name)
+        assert curve["layout"] == "blob"
+        if blob_format == BLOB_FORMAT_RAW:
+            assert curve["blob"]["offset"] % 64 == 0
+        else:
+            np.testing.assert_array_equal(np.load(tmp_path / curve["blob"]["file"]),
+                                          _nested_column(nested, frame, name))
+        np.testing.assert_array_equal(load_blob(json_path, curve), _nested_column(nested, frame, name))
+
+
+def test_channels_below_the_threshold_stay_in_the_json(dlis_path, tmp_path, logger):
+    records = _scan(dlis_path, logger, blob_min_elements=5)
+    # WF (4 per sample) keeps the nested layout, IMG (6 per sample) is flattened for its blob
+    assert "arrays" not in records[0]
+    assert list(records[1]["arrays"]) == ["IMG"]
+
+    offload_array_channels(records, tmp_path, "sample", 5, BLOB_FORMAT_NPY, logger)
+    assert [path.name for path in tmp_path.iterdir()] == ["sample.frame00001.IMG.npy"]
+
+
+def test_unknown_blob_format_raises(tmp_path, logger):
+    with pytest.raises(ValueError, match="Unknown blob format"):
+        offload_array_channels([], tmp_path, "sample", 4, "hdf5", logger)
@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+import pytest
+from utils.claims import (ClaimManager, DONE, FILE_UNIT, FREE, HELD, claim_key, complete_unit,
+                          conversion_unit)
+
+
+@pytest.fixture
+def uploads(tmp_path):
+    folder = tmp_path / "uploads"
+    folder.mkdir()
+    (folder / "well.las").write_bytes(b"~Version\n")
+    return folder
+
+
+def _manager(uploads, node_id, logger, lease_seconds=300):
+    return ClaimManager(uploads / ".claims", node_id, lease_seconds, 60, logger, root=uploads)
+
+
+def _race(managers, filepath):
+    barrier = threading.Barrier(len(managers))
+    keys = [None] * len(managers)
+
+    def claim(position):
+        barrier.wait()
+        keys[position] = managers[position].try_claim(filepath)
+
+    threads = [threading.Thread(target=claim, args=(position,)) for position in range(len(managers))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return keys
+
+
+def test_only_one_node_wins(uploads, logger):
+    managers = [_manager(uploads, f"node{position}", logger) for position in range(8)]
+    keys = _race(managers, uploads / "well.las")
+
+    assert len([key for key in keys if key]) == 1
+    assert all(manager.status(uploads / "well.las") == HELD for manager in managers)
+
+
+def test_expired_claim_is_taken_over_once(uploads, logger):
+    filepath = uploads / "well.las"
+    key = _manager(uploads, "dead", logger, lease_seconds=1).try_claim(filepath)
+    claim_path = uploads / ".claims" / f"{key}.claim"
+    expired = time.time() - 60
+    os.utime(claim_path, (expired, expired))
+
+    managers = [_manager(uploads, f"node{position}", logger, lease_seconds=1) for position in range(8)]
+    assert managers[0].status(filepath) == FREE
+    keys = _race(managers, filepath)
+
+    assert keys.count(key) == 1
+    assert keys.count(None) == len(managers) - 1
+    assert claim_path.exists()
+
+
+def test_live_claim_is_not_taken_over(uploads, logger):
+    filepath = uploads / "well.las"
+    assert _manager(uploads, "node0", logger).try_claim(filepath)
+    assert _manager(uploads, "node1", logger).try_claim(filepath) is None
+
+
+def test_keys_use_the_relative_path(uploads, logger):
+    for folder in ("a", "b"):
+        (uploads / folder).mkdir()
+        (uploads / folder / "well.las").write_bytes(b"~Version\n")
+        os.utime(uploads / folder / "well.las", ns=(0, 0))
+
+    assert claim_key(uploads / "a" / "well.las", uploads) != claim_key(uploads / "b" / "well.las", uploads)
+    # Without a root only the name, size and time count
+    assert claim_key(uploads / "a" / "well.las") == claim_key(uploads / "b" / "well.las")
+
+    manager = _manager(uploads, "node0", logger)
+    assert manager.try_claim(uploads / "a" / "well.las")
+    assert manager.try_claim(uploads / "b" / "well.las")
+
+
+def test_last_unit_marks_the_file_done(uploads, logger):
+    filepath = uploads / "well.las"
+    manager = _manager(uploads, "node0", logger)
+    key = manager.try_claim(filepath)
+    units = [conversion_unit("LF0", "run/a.dlis"), conversion_unit(archive_member="run/b.las")]
+    assert units == ["run/a.dlis:LF0", f"run/b.las:{FILE_UNIT}"]
+    manager.set_units(key, filepath, units)
+
+    complete_unit(key, units[0], logger, folder=uploads / ".claims")
+    assert manager.status(filepath) == HELD
+    complete_unit(key, units[1], logger, folder=uploads / ".claims")
+    assert manager.status(filepath) == DONE
+    assert sorted(path.suffix for path in (uploads / ".claims").iterdir()) == [".done"]
+    assert manager.try_claim(filepath) is None
+
+
+def test_purge_expired_markers(uploads, logger):
+    manager = _manager(uploads, "node0", logger)
+    claims = uploads / ".claims"
+    expired = time.time() - 3600
+
+    (uploads / "done.las").write_bytes(b"1")
+    manager.finish(manager.try_claim(uploads / "done.las"))
+    (uploads / "held.las").write_bytes(b"2")
+    held_key = manager.try_claim(uploads / "held.las")
+    complete_unit(held_key, "LF0", logger, folder=claims)
+    complete_unit("orphan", "LF0", logger, folder=claims)
+    for path in claims.iterdir():
+        os.utime(path, (expired, expired))
+
+    assert manager.purge(0) == 0
+    assert manager.purge(60) == 2  # The done marker and the unit file without a claim
+    assert sorted(path.name.split(".", 1)[0] for path in claims.iterdir()) == [held_key, held_key]
+    assert manager.status(uploads / "done.las") == FREE
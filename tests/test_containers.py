@@ -0,0 +1,172 @@
+import gzip
+import io
+import tarfile
+import zipfile
+from pathlib import PurePosixPath
+import pytest
+from utils import containers
+from utils.containers import (CONTAINER_GZIP, CONTAINER_TAR, CONTAINER_ZIP, container_stem, container_type,
+                              iter_member_streams, list_members, member_output_stem, member_temp_file,
+                              member_text, open_member_text, peek_member)
+
+MEMBERS = ["wells/a.las", "wells/b.dlis", "c.las"]
+
+
+def _read_members(path, members=None):
+    return [(member, stream.read()) for member, stream, _ in iter_member_streams(path, members)]
+
+
+@pytest.fixture
+def temp_folder(tmp_path, monkeypatch):
+    folder = tmp_path / "members"
+    folder.mkdir()
+    monkeypatch.setitem(containers.CONTAINERS_CONFIG, "MEMBER_TEMP_FOLDER", str(folder))
+    return folder
+
+
+@pytest.fixture
+def contents(las_path, dlis_path):
+    return {"wells/a.las": las_path.read_bytes(), "wells/b.dlis": dlis_path.read_bytes(),
+            "c.las": las_path.read_bytes().replace(b"WELL-B", b"WELL-C")}
+
+
+@pytest.fixture
+def zip_path(tmp_path, contents):
+    path = tmp_path / "run1.zip"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("wells/", b"")
+        for member in MEMBERS:
+            archive.writestr(member, contents[member])
+        # Not inputs
+        archive.writestr("__MACOSX/wells/._a.las", b"resource fork")
+        archive.writestr("wells/.hidden.las", b"hidden")
+    return path
+
+
+@pytest.fixture
+def tar_path(tmp_path, contents):
+    path = tmp_path / "run1.tar.gz"
+    with tarfile.open(path, "w:gz") as archive:
+        for member in MEMBERS:
+            info = tarfile.TarInfo(member)
+            info.size = len(contents[member])
+            archive.addfile(info, io.BytesIO(contents[member]))
+    return path
+
+
+@pytest.fixture
+def gzip_path(tmp_path, dlis_path):
+    path = tmp_path / "sample.dlis.gz"
+    path.write_bytes(gzip.compress(dlis_path.read_bytes()))
+    return path
+
+
+def test_container_types(zip_path, tar_path, gzip_path, las_path):
+    assert container_type(zip_path) == CONTAINER_ZIP
+    assert container_type(tar_path) == CONTAINER_TAR
+    assert container_type(gzip_path) == CONTAINER_GZIP
+    assert container_type(las_path) is None
+    assert container_stem(tar_path) == "run1"
+    assert container_stem(gzip_path) == "sample.dlis"
+
+
+def test_list_members(zip_path, tar_path, gzip_path, contents, dlis_path):
+    expected = [(member, len(contents[member])) for member in MEMBERS]
+    assert list_members(zip_path) == expected
+    assert list_members(tar_path) == expected
+    assert list_members(gzip_path) == [("sample.dlis", None)]
+    # The gzip trailer gives the uncompressed size
+    assert containers._gzip_size(gzip_path) == dlis_path.stat().st_size
+
+
+def test_list_members_rejects_other_files(las_path):
+    with pytest.raises(ValueError, match="Not a container"):
+        list_members(las_path)
+
+
+@pytest.mark.parametrize("archive", ["zip_path", "tar_path"])
+def test_member_streams_in_one_pass(request, archive, contents, monkeypatch):
+    path = request.getfixturevalue(archive)
+    opened = []
+    open_tar = containers._open_tar
+    monkeypatch.setattr(containers, "_open_tar", lambda *args: opened.append(args) or open_tar(*args))
+
+    assert _read_members(path, members=["c.las", "wells/b.dlis"]) == \
+        [("wells/b.dlis", contents["wells/b.dlis"]), ("c.las", contents["c.las"])]  # Archive order
+    assert len(opened) == (1 if archive == "tar_path" else 0)
+
+
+def test_member_temp_file(zip_path, contents, temp_folder):
+    for member, stream, size in iter_member_streams(zip_path, members=["wells/b.dlis"]):
+        with member_temp_file(stream, member, size) as temp_path:
+            assert temp_path.parent == temp_folder
+            assert temp_path.suffix == ".dlis"
+            assert temp_path.read_bytes() == contents[member]
+    assert not list(temp_folder.iterdir())
+
+
+def test_abandoned_iteration_closes_the_stream(zip_path):
+    members = iter_member_streams(zip_path)
+    member, stream, _ = next(members)
+    assert member == "wells/a.las"
+    members.close()
+    assert stream.closed
+
+
+def test_single_file_member(gzip_path, dlis_path):
+    assert _read_members(gzip_path) == [("sample.dlis", dlis_path.read_bytes())]
+
+
+@pytest.mark.parametrize("archive", ["zip_path", "tar_path"])
+def test_open_member_text(request, archive, contents):
+    with open_member_text(request.getfixturevalue(archive), "c.las") as (text, size):
+        assert text.read() == contents["c.las"].decode()
+        assert size == len(contents["c.las"])
+
+
+def test_member_output_stem(zip_path, gzip_path):
+    assert member_output_stem(zip_path, "wells/a.las") == PurePosixPath("run1/wells/a")
+    assert member_output_stem(zip_path, "../../etc/b.dlis") == PurePosixPath("run1/etc/b")
+    assert member_output_stem(gzip_path, "sample.dlis") == PurePosixPath("sample")
+
+
+def test_zstd_members(tmp_path, dlis_path, temp_folder):
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "sample.dlis.zst"
+    path.write_bytes(zstandard.ZstdCompressor().compress(dlis_path.read_bytes()))
+
+    assert list_members(path) == [("sample.dlis", None)]
+    assert _read_members(path) == [("sample.dlis", dlis_path.read_bytes())]
+    for _, stream, _ in iter_member_streams(path):
+        header, stream = peek_member(stream)
+        assert stream.read() == dlis_path.read_bytes()
+    assert header == dlis_path.read_bytes()[:256]
+
+
+def test_tar_zstd_members(tmp_path, tar_path, contents, temp_folder):
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "run1.tar.zst"
+    path.write_bytes(zstandard.ZstdCompressor().compress(gzip.decompress(tar_path.read_bytes())))
+
+    assert container_type(path) == containers.CONTAINER_TAR_ZSTD
+    assert container_stem(path) == "run1"
+    assert list_members(path) == [(member, len(contents[member])) for member in MEMBERS]
+    assert dict(_read_members(path)) == contents
+
+
+def test_las_member_parsed_from_stream(tmp_path, tar_path, contents, temp_folder, logger):
+    # tar.zst members cannot seek, so the LAS member is spooled in memory, not to a temporary file
+    zstandard = pytest.importorskip("zstandard")
+    from scanners.las_scanner import LasScanner
+    path = tmp_path / "run1.tar.zst"
+    path.write_bytes(zstandard.ZstdCompressor().compress(gzip.decompress(tar_path.read_bytes())))
+
+    for member, stream, size in iter_member_streams(path, members=["c.las"]):
+        header, stream = peek_member(stream)
+        assert header == contents[member][:256]
+        with member_text(stream, size) as (text, text_size):
+            records = LasScanner(text, logger, name=member).scan()
+            assert text_size == len(contents[member])
+            assert not list(temp_folder.iterdir())
+    assert records[0]["header"]["well"] == "WELL-C"
+    assert len(records[0]["data"]) == 40
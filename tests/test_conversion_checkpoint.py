@@ -0,0 +1,93 @@
+import orjson
+import pytest
+from dlisio import dlis
+from scanners.DLISLogicalFile import DLISLogicalFile
+from utils.ConversionCheckpoint import ConversionCheckpoint
+from utils.SerialiseJson import JsonSerializable
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture
+def logical_file(dlis_path):
+    with dlis.load(str(dlis_path)) as logical_files:
+        yield logical_files[0]
+
+
+def _count_frames(scanner, fail_after=None):
+    """
+    Counts the frames the scanner extracts, failing once `fail_after` frames were extracted.
+    """
+    extracted = []
+    extract_frame = scanner._extract_frame
+
+    def counted(frame):
+        if fail_after is not None and len(extracted) >= fail_after:
+            raise Interrupted(frame.name)
+        extracted.append(frame.name)
+        return extract_frame(frame)
+
+    scanner._extract_frame = counted
+    return extracted
+
+
+def _as_json(records):
+    return orjson.loads(JsonSerializable.to_json_bytes(records))
+
+
+def _checkpoint(tmp_path, dlis_path, logger, options=None):
+    return ConversionCheckpoint(tmp_path / "checkpoints", dlis_path, "LF0", logger, options=options)
+
+
+def test_resume_after_interruption(logical_file, dlis_path, tmp_path, logger):
+    expected = _as_json(DLISLogicalFile(logical_file, logger).scan_logical_file())
+
+    scanner = DLISLogicalFile(logical_file, logger)
+    _count_frames(scanner, fail_after=1)
+    records = []
+    with pytest.raises(Interrupted):
+        for record in scanner.iter_records(checkpoint=_checkpoint(tmp_path, dlis_path, logger)):
+            records.append(record)
+    assert len(records) == 1
+
+    checkpoint = _checkpoint(tmp_path, dlis_path, logger)
+    metadata, frames = checkpoint.load()
+    assert metadata is not None and list(frames) == [0]
+
+    scanner = DLISLogicalFile(logical_file, logger)
+    extracted = _count_frames(scanner)
+    resumed = list(scanner.iter_records(checkpoint=checkpoint))
+    assert extracted == ["FRAME1"]
+    assert _as_json(resumed) == expected
+
+    checkpoint.clear()
+    assert checkpoint.load() == (None, {})
+
+
+def test_corrupt_frame_is_extracted_again(logical_file, dlis_path, tmp_path, logger):
+    expected = _as_json(DLISLogicalFile(logical_file, logger).scan_logical_file(
+        checkpoint=_checkpoint(tmp_path, dlis_path, logger)))
+
+    checkpoint = _checkpoint(tmp_path, dlis_path, logger)
+    frame_path = tmp_path / "checkpoints" / checkpoint.key / "frame00000.json"
+    frame_path.write_bytes(frame_path.read_bytes().replace(b"FRAME0", b"FRAMEX"))
+
+    # The corrupt frame and every frame recorded after it are discarded
+    assert list(checkpoint.load()[1]) == []
+    scanner = DLISLogicalFile(logical_file, logger)
+    extracted = _count_frames(scanner)
+    assert _as_json(list(scanner.iter_records(checkpoint=checkpoint))) == expected
+    assert extracted == ["FRAME0", "FRAME1"]
+
+
+def test_other_options_start_over(dlis_path, tmp_path, logger):
+    assert _checkpoint(tmp_path, dlis_path, logger).key == _checkpoint(tmp_path, dlis_path, logger).key
+    assert _checkpoint(tmp_path, dlis_path, logger).key != \
+        _checkpoint(tmp_path, dlis_path, logger, options={"array_layout": "flat"}).key
+
+
+def test_frames_need_metadata(dlis_path, tmp_path, logger):
+    with pytest.raises(ValueError, match="metadata"):
+        _checkpoint(tmp_path, dlis_path, logger).save_frame(0, {"data": []})
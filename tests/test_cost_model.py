@@ -0,0 +1,22 @@
+from utils.CostModel import CostModel
+from utils.WellLogSniffer import WellLogSniffer
+
+
+def test_default_estimate():
+    estimate = CostModel().estimate("LAS", 2 * 1024 * 1024, values=1_000_000)
+    assert estimate == {"runtime_seconds": 0.2 + 0.5 * 2 + 1.5, "memory_mb": 150.0 + 4.0 * 2 + 60.0}
+    assert CostModel().estimate("UNKNOWN", 1024) is None
+
+
+def test_file_overrides_single_targets(tmp_path):
+    path = tmp_path / "cost_model.json"
+    CostModel({"DLIS": {"memory_mb": {"intercept": 10.0, "per_mb": 1.0, "per_mvalue": 0.0}}}).save(path)
+    model = CostModel.load(path)
+    assert model.estimate("DLIS", 1024 * 1024)["memory_mb"] == 11.0
+    assert model.coefficients["DLIS"]["runtime_seconds"] == CostModel.DEFAULT_COEFFICIENTS["DLIS"]["runtime_seconds"]
+    assert CostModel.load(tmp_path / "missing.json").coefficients == CostModel().coefficients
+
+
+def test_sniff_attaches_estimate(dlis_path):
+    report = WellLogSniffer.sniff(dlis_path, cost_model=CostModel())
+    assert report["estimate"] == CostModel().estimate("DLIS", report["file_size"], report["estimated_values"])
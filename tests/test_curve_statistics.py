@@ -0,0 +1,56 @@
+import numpy as np
+import orjson
+import pytest
+from utils.SerialiseJson import JsonSerializable
+from utils.curve_statistics import annotate_curves, compute_record_statistics, summary_rows
+
+
+def _record(columns, null=-999.25):
+    names = list(columns)
+    rows = [list(values) for values in zip(*columns.values())]
+    return {"header": {"null": null}, "curves": [{"name": name, "unit": "m" if name == "DEPT" else None}
+                                                 for name in names], "data": rows}
+
+
+def test_statistics_and_qc_flags():
+    rows = 30
+    spiky = [10.0 + (position % 3) * 0.1 for position in range(rows)]
+    spiky[15] = 100.0
+    stuck = [-999.25, -999.25] + [float(position) for position in range(14)] + [7.0] * 12 + [1.0, 2.0]
+    record = _record({"DEPT": [1000.0 + position for position in range(rows)], "GR": spiky, "CALI": stuck,
+                      "EMPTY": [-999.25] * rows})
+
+    statistics = compute_record_statistics(record, percentiles=(50,), spike_threshold=5.0, flatline_min_samples=10)
+    assert statistics["index_curve"] == "DEPT"
+    assert list(statistics["curves"]) == ["GR", "CALI", "EMPTY"]
+
+    gr = statistics["curves"]["GR"]
+    assert (gr["count"], gr["valid_count"], gr["null_fraction"]) == (30, 30, 0)
+    assert gr["max"] == 100.0 and gr["spike_count"] == 1 and gr["flatline_count"] == 0
+    assert gr["p50"] == pytest.approx(float(np.median(spiky)))
+
+    cali = statistics["curves"]["CALI"]
+    # Nulls are left out, including their leading run
+    assert cali["valid_count"] == 28 and cali["null_fraction"] == pytest.approx(2 / 30)
+    assert (cali["first_valid_index"], cali["last_valid_index"]) == (1002.0, 1029.0)
+    assert (cali["flatline_count"], cali["flatline_samples"]) == (1, 12)
+
+    # A curve without values gives nulls, not errors
+    empty = statistics["curves"]["EMPTY"]
+    assert empty["valid_count"] == 0 and empty["min"] is None and empty["first_valid_index"] is None
+    orjson.dumps(statistics)
+
+
+def test_curves_annotated_and_summarised(las_records, dlis_records):
+    statistics = compute_record_statistics(las_records[0])
+    annotate_curves(las_records[0], statistics)
+    written = orjson.loads(JsonSerializable.to_json_bytes(las_records))[0]
+    assert "statistics" not in written["curves"][0]  # The index curve
+    assert written["curves"][1]["statistics"]["p50"] == statistics["curves"]["GR"]["p50"]
+
+    frames = [compute_record_statistics(record) for record in dlis_records]
+    rows = summary_rows(frames + [None], {"output_file": "out.json", "well": "WELL-A", "input_file_format": "DLIS"})
+    # Array channels are left out
+    assert [(row["frame"], row["curve"], row["index_curve"]) for row in rows] == \
+        [("FRAME0", "GR", "DEPTH"), ("FRAME1", "NPHI", "TDEP")]
+    assert rows[0]["well"] == "WELL-A" and rows[0]["valid_count"] == 40
@@ -0,0 +1,83 @@
+import calendar
+import random
+from datetime import date, datetime, timezone
+import pytest
+from dateutil.parser import parse, ParserError
+from utils.DateUtils import DateUtils
+
+
+def _legacy_to_iso8601(date_input):
+    """
+    The conversion before the fast paths and the cache, which the current one must reproduce.
+    """
+    try:
+        if isinstance(date_input, datetime):
+            if date_input.tzinfo is None:
+                date_input = date_input.replace(tzinfo=timezone.utc)
+            return date_input.isoformat()
+        elif hasattr(date_input, "isoformat"):
+            return f"{date_input.isoformat()}T00:00:00Z"
+        elif isinstance(date_input, str):
+            try:
+                parsed_date = parse(date_input, default=datetime(1900, 1, 1))
+                return _legacy_to_iso8601(parsed_date)
+            except ParserError:
+                if "/" in date_input:
+                    parts = date_input.split("/")
+                    if len(parts) == 2:
+                        month, year = int(parts[0]), int(parts[1])
+                        if year < 100:
+                            year += 1900
+                        parsed_date = datetime(year, month, 1)
+                        return _legacy_to_iso8601(parsed_date)
+                raise
+        else:
+            raise TypeError("Input must be a string, datetime, or date object.")
+    except Exception as e:
+        return f"Error: {e}"
+
+
+CASES = [
+    "13/01/2020", "01/13/2020", "05/06/2020", "13/13/2020", "31/02/2020", "1/2/2020", "11/91", "2020-01-13",
+    "2020-01-13T10:20:30", "2020-01-13 10:20", "2020-13-01", "2020-02-30", "20200113", "20201301", "13-Jan-2020",
+    "13 JAN 2020", "13-January-2020", "13-Sept-2020", "13-Foo-2020", "32-Jan-2020", "0-Jan-2020", "00/01/2020",
+    "01/00/2020", "  2020-01-13 ", "19991231", "00000000", "0000-01-01", "2020-01-13T10:20:30Z", "", "abc",
+    "13-jan-2020", "1-MAR-1999", "12/31/1999", "31/12/1999", "2020-1-3", "13.01.2020", "Jan 13 2020", "99999999",
+    "13-Mar-0001", "29-Feb-2019", "29-Feb-2020", "13 Janu 2020", "13-mAy-2020", "13-June-2020", "1/1/0000",
+]
+
+
+def _random_cases(count, seed=1):
+    rnd = random.Random(seed)
+    months = [name for abbr in calendar.month_abbr[1:] for name in (abbr, abbr.upper())] + list(calendar.month_name[1:])
+    cases = []
+    for _ in range(count):
+        year, month, day = rnd.randint(1, 2100), rnd.randint(0, 14), rnd.randint(0, 33)
+        cases += [f"{month}/{day}/{year:04d}", f"{day}/{month}/{year:04d}", f"{year:04d}-{month:02d}-{day:02d}",
+                  f"{year:04d}{month:02d}{day:02d}", f"{day}-{rnd.choice(months)}-{year:04d}",
+                  f"{day:02d} {rnd.choice(months)} {year:04d}"]
+    return cases
+
+
+@pytest.mark.parametrize("source", [None, "las", "dlis"])
+def test_matches_legacy_on_known_layouts(source):
+    for case in CASES:
+        assert DateUtils.to_iso8601(case, source=source) == _legacy_to_iso8601(case), case
+
+
+def test_matches_legacy_on_random_dates():
+    # Alternating sources so the layout remembered for one source is tried on dates of another
+    for position, case in enumerate(_random_cases(2000)):
+        source = ("las", "dlis", None)[position % 3]
+        assert DateUtils.to_iso8601(case, source=source) == _legacy_to_iso8601(case), case
+
+
+def test_repeated_dates_are_stable():
+    first = [DateUtils.to_iso8601(case, source="las") for case in CASES]
+    assert [DateUtils.to_iso8601(case, source="las") for case in CASES] == first
+
+
+def test_date_and_datetime_inputs():
+    for value in (datetime(2020, 1, 13, 10, 20), datetime(2020, 1, 13, tzinfo=timezone.utc), date(2020, 1, 13)):
+        assert DateUtils.to_iso8601(value) == _legacy_to_iso8601(value)
+    assert DateUtils.to_iso8601(20200113).startswith("Error: ")
@@ -0,0 +1,105 @@
+import os
+import time
+from pathlib import Path
+import pytest
+from crawler.discovery import UploadDiscovery
+from utils.claims import ClaimManager, DONE, complete_unit
+
+
+def _tree(root, paths):
+    for path in paths:
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_bytes(b"~Version\n")
+    _settle(root)
+
+
+def _settle(root):
+    # Older than the settling delay, so unchanged directories are not listed again
+    old = time.time() - 60
+    for folder, _, _ in os.walk(root):
+        os.utime(folder, (old, old))
+
+
+def _names(root, paths):
+    return [str(Path(path).relative_to(root)) for path in paths]
+
+
+@pytest.fixture
+def uploads(tmp_path):
+    folder = tmp_path / "uploads"
+    folder.mkdir()
+    _tree(folder, ["b.las", "wellA/run1/x.dlis", "wellA/a.las", ".hidden.las", "c.las.profile",
+                   "archive/old.las"])
+    return folder
+
+
+def _discovery(uploads, logger, **options):
+    return UploadDiscovery(uploads, logger, excluded=[uploads / "archive"], ignored_suffixes=[".profile"], **options)
+
+
+def test_nested_files_reported_once_in_path_order(uploads, logger):
+    discovery = _discovery(uploads, logger)
+    assert _names(uploads, discovery.poll()) == ["b.las", "wellA/a.las", "wellA/run1/x.dlis"]
+    assert discovery.poll() == []
+    assert discovery.relative_folder(uploads / "wellA/run1/x.dlis") == Path("wellA/run1")
+
+    _tree(uploads, ["wellA/run1/y.las"])
+    assert _names(uploads, discovery.poll()) == ["wellA/run1/y.las"]
+
+
+def test_unchanged_directories_are_not_listed(uploads, logger, monkeypatch):
+    discovery = _discovery(uploads, logger)
+    discovery.poll()
+    listed = []
+    list_folder = discovery._list
+    monkeypatch.setattr(discovery, "_list", lambda path: listed.append(path) or list_folder(path))
+
+    discovery.poll()
+    assert listed == []
+    (uploads / "wellA" / "z.las").write_bytes(b"~Version\n")
+    assert _names(uploads, discovery.poll()) == ["wellA/z.las"]
+    assert listed == [str(uploads / "wellA")]
+
+
+def test_passes_are_bounded_by_a_cursor(uploads, logger, tmp_path):
+    state_file = tmp_path / "state.json"
+    discovery = _discovery(uploads, logger, state_file=state_file, max_files_per_pass=2)
+    assert _names(uploads, discovery.poll()) == ["b.las", "wellA/a.las"]
+    discovery.save()
+
+    # The cursor and the reported files survive a restart
+    resumed = _discovery(uploads, logger, state_file=state_file, max_files_per_pass=2)
+    assert _names(uploads, resumed.poll()) == ["wellA/run1/x.dlis"]
+    assert resumed.poll() == []
+
+
+def test_retried_and_redelivered_files(uploads, logger):
+    discovery = _discovery(uploads, logger)
+    discovery.poll()
+    discovery.retry(uploads / "b.las")
+    assert _names(uploads, discovery.poll()) == ["b.las"]
+
+    (uploads / "wellA" / "a.las").unlink()
+    discovery.poll()
+    _tree(uploads, ["wellA/a.las"])
+    assert _names(uploads, discovery.poll()) == ["wellA/a.las"]
+
+
+def test_claimed_inputs_archived_once_done(uploads, tmp_path, logger):
+    from crawler import watcher
+    claims = ClaimManager(tmp_path / "claims", "node1", 300, 60, logger, root=uploads)
+    archive = tmp_path / "archive"
+    done_file, held_file = uploads / "b.las", uploads / "wellA" / "a.las"
+    done_key, held_key = claims.try_claim(done_file), claims.try_claim(held_file)
+    for key, file in [(done_key, done_file), (held_key, held_file)]:
+        claims.set_units(key, file, ["file"])
+    archive_when_done = {done_file: archive, held_file: archive / "wellA", uploads / "gone.las": archive}
+
+    complete_unit(done_key, "file", logger, folder=tmp_path / "claims")
+    assert claims.status(done_file) == DONE
+    watcher._archive_converted(claims, archive_when_done)
+
+    # The held file waits for its conversions, the vanished one is forgotten
+    assert (archive / "b.las").exists() and not done_file.exists()
+    assert held_file.exists()
+    assert archive_when_done == {held_file: archive / "wellA"}
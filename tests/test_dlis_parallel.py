@@ -0,0 +1,57 @@
+import orjson
+import pytest
+from dlisio import dlis
+from scanners import DLISLogicalFile as logical_file_module
+from scanners.DLISLogicalFile import DLISLogicalFile
+from utils.SerialiseJson import JsonSerializable
+
+
+class RecordingLock:
+    def __init__(self):
+        self.acquired = 0
+
+    def __enter__(self):
+        self.acquired += 1
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def _as_json(records):
+    return orjson.loads(JsonSerializable.to_json_bytes(records))
+
+
+@pytest.fixture
+def logical_file(dlis_path):
+    with dlis.load(str(dlis_path)) as logical_files:
+        yield logical_files[1]
+
+
+def test_parallel_scan_matches_serial_scan(logical_file, dlis_path, logger):
+    expected = _as_json(DLISLogicalFile(logical_file, logger).scan_logical_file())
+    assert _as_json(DLISLogicalFile(logical_file, logger, parallelism=4, file_path=dlis_path).scan_logical_file()) \
+        == expected
+    assert _as_json(DLISLogicalFile(logical_file, logger, parallelism=4).scan_logical_file()) == expected
+
+
+def test_worker_threads_read_through_their_own_handles(logical_file, dlis_path, logger, monkeypatch):
+    opened = []
+    load = dlis.load
+    monkeypatch.setattr(logical_file_module.dlis, "load", lambda path: opened.append(load(path)) or opened[-1])
+
+    scanner = DLISLogicalFile(logical_file, logger, parallelism=2, file_path=dlis_path)
+    scanner._io_lock = RecordingLock()
+    records = scanner.scan_logical_file()
+
+    assert [record["curves"][0]["name"] for record in records] == ["DEPTH", "TDEP"]
+    assert 1 <= len(opened) <= 2  # At most one handle per worker thread
+    assert scanner._io_lock.acquired == 0
+    # The handles are closed once the scan ends
+    assert not scanner._opened_files
+
+
+def test_shared_handle_without_file_path(logical_file, logger):
+    scanner = DLISLogicalFile(logical_file, logger, parallelism=2)
+    scanner._io_lock = RecordingLock()
+    scanner.scan_logical_file()
+    assert scanner._io_lock.acquired == 6  # One read per channel of the two frames
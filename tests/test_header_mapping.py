@@ -0,0 +1,44 @@
+import json
+import lasio
+from mappings import HeaderMappingRegistry as registry_module
+from mappings.HeaderMappingRegistry import HeaderMappingRegistry
+from scanners.las_scanner import LasScanner
+
+
+def test_default_vendor_files_are_loaded():
+    assert registry_module.VENDOR_MAPPINGS_FOLDER.is_dir()
+    registry = HeaderMappingRegistry.load()
+    assert registry.is_mapped("WELL")
+    assert registry.is_mapped("WBN")
+    assert registry.resolve([("WBN", "WB-1")]) == ({"wellbore": "WB-1"}, {})
+
+
+def test_vendor_fields_follow_the_defaults(tmp_path):
+    (tmp_path / "b_vendor.json").write_text(json.dumps({"mapping": {"well": ["WELLNAME"], "spud": ["SPUD"]},
+                                                        "date_fields": ["spud"]}))
+    (tmp_path / "a_vendor.json").write_text(json.dumps({"mapping": {"well": ["WN", "WELLNAME"]}}))
+    registry = HeaderMappingRegistry.load(tmp_path)
+
+    assert registry.keys[-1] == "spud"
+    assert registry.is_date_field("spud")
+    mapped, unmapped = registry.resolve([("WELLNAME", "W-3"), ("WN", "W-2"), ("LOC", "x")])
+    assert mapped["well"] == "W-2"  # Files are read in name order
+    assert unmapped == {"LOC": "x"}
+    assert registry.resolve([("WN", "W-2"), ("WELL", "W-1")])[0]["well"] == "W-1"
+    assert registry.resolve([("WELL", None), ("WN", "W-2")], skip_none=True)[0]["well"] == "W-2"
+
+
+def test_las_header_order(las_path, logger):
+    las_file = lasio.read(str(las_path))
+    las_file.well.append(lasio.HeaderItem("XTRA", value="x"))
+    las_file.well.append(lasio.HeaderItem("source", value="vendor"))
+    header = LasScanner(las_path, logger)._extract_header(las_file)
+
+    keys = list(header)
+    assert keys[0] == "well"
+    # Unmapped LAS headers follow the first key, one named as a mapped key takes its place there
+    assert keys[1:8] == ["LOC", "PROV", "CNTY", "STAT", "UWI", "XTRA", "source"]
+    assert keys[8:11] == ["field", "country", "date"]
+    assert keys.count("source") == 1 and header["source"] == "vendor"
+    assert header["date"] == "2020-01-13T00:00:00+00:00"
+    assert header["name"] == "sample"
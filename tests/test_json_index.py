@@ -0,0 +1,38 @@
+import orjson
+import pytest
+from utils.SerialiseJson import JsonSerializable
+from utils.json_index import IndexedJsonReader, index_path_for, write_indexed_json
+
+
+def _as_json(records):
+    return orjson.loads(JsonSerializable.to_json_bytes(records))
+
+
+def test_index_sidecar_round_trip(dlis_records, tmp_path):
+    path = tmp_path / "sample.json"
+    write_indexed_json(dlis_records, path, block_rows=7)
+
+    # Same bytes as the plain writer
+    assert path.read_bytes() == JsonSerializable.to_json_bytes(dlis_records)
+    assert index_path_for(path).name == "sample.index.json"
+
+    expected = _as_json(dlis_records)
+    reader = IndexedJsonReader(path)
+    assert reader.record_count == 2
+    assert reader.read_section(0, "header") == expected[0]["header"]
+    assert reader.read_section(1, "curves") == expected[1]["curves"]
+    assert reader.read_rows(0) == expected[0]["data"]
+
+    # FRAME0 increases, FRAME1 decreases: both are filtered on the index interval
+    for record in (0, 1):
+        rows = reader.read_rows(record, 1005, 1010)
+        assert rows == [row for row in expected[record]["data"] if 1005 <= row[0] <= 1010]
+        assert rows
+
+
+def test_stale_sidecar_is_rejected(las_records, tmp_path):
+    path = tmp_path / "sample.json"
+    write_indexed_json(las_records, path)
+    path.write_bytes(path.read_bytes() + b"\n")
+    with pytest.raises(ValueError, match="does not match"):
+        IndexedJsonReader(path)
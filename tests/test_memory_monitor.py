@@ -0,0 +1,53 @@
+import threading
+import time
+import pytest
+from utils import MemoryMonitor as memory_monitor
+from utils.MemoryMonitor import MemoryLimitExceeded, MemoryMonitor
+
+pytestmark = pytest.mark.skipif(memory_monitor._current_rss_bytes() is None, reason="needs /proc")
+
+
+def test_peak_rss_is_recorded():
+    before = memory_monitor._current_rss_bytes() / (1024 * 1024)
+    with MemoryMonitor(interval=0.01) as monitor:
+        held = b"\x01" * (64 * 1024 * 1024)  # Written, so its pages are resident
+        time.sleep(0.05)
+    del held
+    usage = monitor.usage()
+    assert usage["peak_rss_mb"] >= before + 60
+    assert usage["major_page_faults"] >= 0
+    assert not monitor.limit_exceeded
+
+
+def test_soft_limit_stops_the_conversion():
+    # This process is already above 1 MB, so the limit is crossed on the first sample
+    with pytest.raises(MemoryLimitExceeded, match="soft limit of 1 MB"):
+        with MemoryMonitor(limit_mb=1, interval=0.01):
+            time.sleep(5)
+
+
+def test_limit_is_not_swallowed_by_except_exception():
+    stopped = False
+    try:
+        with MemoryMonitor(limit_mb=1, interval=0.01):
+            try:
+                time.sleep(5)
+            except Exception:
+                pass
+    except MemoryLimitExceeded:
+        stopped = True
+    assert stopped
+
+
+def test_limit_is_only_reported_outside_the_main_thread(logger):
+    monitors = []
+
+    def run():
+        with MemoryMonitor(limit_mb=1, interval=0.01, logger=logger) as monitor:
+            time.sleep(0.05)
+        monitors.append(monitor)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    assert monitors[0].limit_exceeded
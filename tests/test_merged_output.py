@@ -0,0 +1,104 @@
+import numpy as np
+import orjson
+import pytest
+from utils.merged_output import (MERGE_METHOD_LINEAR, MERGE_METHOD_NEAREST, extract_frame, merge_frames, resample,
+                                 write_merged_output)
+
+INDEX = np.array([0.0, 1.0, 2.0, 5.0, 6.0])
+MATRIX = np.array([[0.0, 10.0], [1.0, 20.0], [2.0, np.nan], [5.0, 50.0], [6.0, 60.0]])
+
+
+def test_linear_resampling():
+    grid = np.array([-1.0, 0.0, 0.5, 1.75, 3.0, 5.5, 6.0, 7.0])
+    values = resample(INDEX, MATRIX, grid, method=MERGE_METHOD_LINEAR, step=1.0)
+    np.testing.assert_allclose(values[:, 0], [np.nan, 0.0, 0.5, 1.75, np.nan, 5.5, 6.0, np.nan])
+    # Blending with a null sample gives null, a grid value on a sample keeps it
+    np.testing.assert_allclose(values[:, 1], [np.nan, 10.0, 15.0, np.nan, np.nan, 55.0, 60.0, np.nan])
+
+
+def test_linear_resampling_without_step_bridges_gaps():
+    values = resample(INDEX, MATRIX, np.array([3.5]), method=MERGE_METHOD_LINEAR)
+    np.testing.assert_allclose(values[:, 0], [3.5])
+
+
+def test_nearest_resampling():
+    grid = np.array([0.4, 0.6, 1.5, 3.5, 6.4, 6.6])
+    values = resample(INDEX, MATRIX, grid, method=MERGE_METHOD_NEAREST, step=1.0)
+    # Ties go to the lower sample; nothing is taken further than half a step away
+    np.testing.assert_allclose(values[:, 0], [0.0, 1.0, 1.0, np.nan, 6.0, np.nan])
+
+
+def test_resampling_empty_frame():
+    values = resample(np.array([]), np.empty((0, 2)), np.array([0.0, 1.0]))
+    assert values.shape == (2, 2) and np.isnan(values).all()
+
+
+def test_unknown_method_raises():
+    with pytest.raises(ValueError, match="Unknown merge method"):
+        resample(INDEX, MATRIX, INDEX, method="cubic")
+
+
+def test_extract_flips_decreasing_frames(dlis_records):
+    increasing, decreasing = (extract_frame(record) for record in dlis_records)
+    assert increasing["index_curve"]["name"] == "DEPTH" and not increasing["flipped"]
+    assert decreasing["index_curve"]["name"] == "TDEP" and decreasing["flipped"]
+    assert decreasing["direction"] == "DECREASING"
+    assert np.all(np.diff(decreasing["index"]) > 0)
+    # Array channels are left out
+    assert increasing["names"] == ["GR"] and decreasing["names"] == ["NPHI"]
+    assert increasing["step"] == decreasing["step"] == 0.5
+
+
+def test_merge_frames_on_common_grid(dlis_records):
+    frames = [extract_frame(record) for record in dlis_records]
+    merged = merge_frames(frames)
+
+    assert merged["index"] == {"start": 1000.0, "end": 1019.5, "step": 0.5, "rows": 40, "method": MERGE_METHOD_LINEAR}
+    assert [curve["name"] for curve in merged["curves"]] == ["DEPTH", "GR", "NPHI"]
+    assert [frame["flipped"] for frame in merged["frames"]] == [False, True]
+
+    data = merged["data"]
+    np.testing.assert_allclose(data[:, 0], 1000.0 + 0.5 * np.arange(40))
+    np.testing.assert_allclose(data[:, 1], frames[0]["matrix"][:, 0])
+    # FRAME1 starts at 1000.25: the first grid value has no sample, the others lie between two
+    nphi_index, nphi = frames[1]["index"], frames[1]["matrix"][:, 0]
+    assert np.isnan(data[0, 2])
+    np.testing.assert_allclose(data[1:, 2], (nphi[:-1] + nphi[1:]) / 2)
+    assert np.all(nphi_index[:-1] < data[1:, 0]) and np.all(data[1:, 0] < nphi_index[1:])
+
+
+def test_merge_frames_with_coarser_step(dlis_records):
+    merged = merge_frames([extract_frame(record) for record in dlis_records], method=MERGE_METHOD_NEAREST, step=2.0)
+    assert merged["index"]["rows"] == 10
+    np.testing.assert_allclose(merged["data"][:, 0], 1000.0 + 2.0 * np.arange(10))
+
+
+def test_merge_skips_frames_of_another_index_unit(dlis_records):
+    frames = [extract_frame(record) for record in dlis_records]
+    frames[1]["index_curve"] = {**frames[1]["index_curve"], "unit": "ft"}
+    merged = merge_frames(frames)
+    assert [frame["name"] for frame in merged["frames"]] == ["FRAME0"]
+    assert merged["skipped_frames"] == [{"name": "FRAME1", "index_type": frames[1]["index_type"], "index_unit": "ft"}]
+    assert merge_frames([None]) is None
+
+
+def test_write_merged_output(dlis_records, tmp_path):
+    frames = [extract_frame(record) for record in dlis_records]
+    path = write_merged_output(frames, dlis_records[0]["header"], tmp_path / "sampleLF0.manifest.json")
+    assert path.name == "sampleLF0.merged.json"
+
+    record = orjson.loads(path.read_bytes())[0]
+    assert record["header"]["well"] == "WELL-A"
+    assert (record["header"]["startIndex"], record["header"]["endIndex"], record["header"]["step"]) == (1000.0, 1019.5, 0.5)
+    assert record["merge"] == {"method": MERGE_METHOD_LINEAR, "rows": 40}
+    assert len(record["data"]) == 40 and record["data"][0][2] is None
+
+
+def test_grid_size_is_capped(dlis_records, monkeypatch):
+    from utils import merged_output
+    frames = [extract_frame(record) for record in dlis_records]
+    # The index and GR of FRAME0 fit; with NPHI of FRAME1 the same rows do not
+    monkeypatch.setattr(merged_output, "_MAX_GRID_VALUES", 40 * 2)
+    assert merge_frames(frames[:1])["data"].shape == (40, 2)
+    with pytest.raises(ValueError, match="40 rows by 3 columns"):
+        merge_frames(frames)
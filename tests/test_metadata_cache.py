@@ -0,0 +1,56 @@
+import orjson
+from types import SimpleNamespace
+import numpy as np
+from dlisio import dlis
+from scanners.DLISLogicalFile import DLISLogicalFile
+from scanners.DLISMetadataCache import DLISMetadataCache, fingerprint_objects
+from utils.SerialiseJson import JsonSerializable
+
+
+def _as_json(records):
+    return orjson.loads(JsonSerializable.to_json_bytes(records))
+
+
+def _object(fingerprint, **attributes):
+    attic = {key: SimpleNamespace(value=value, units="m") for key, value in attributes.items()}
+    return SimpleNamespace(fingerprint=fingerprint, attic=attic)
+
+
+def test_logical_files_share_metadata(dlis_path, logger):
+    cache = DLISMetadataCache()
+    with dlis.load(str(dlis_path)) as logical_files:
+        expected = [_as_json(DLISLogicalFile(logical_file, logger).scan_logical_file())
+                    for logical_file in logical_files]
+        scanners = [DLISLogicalFile(logical_file, logger, metadata_cache=cache) for logical_file in logical_files]
+        assert [_as_json(scanner.scan_logical_file()) for scanner in scanners] == expected
+
+    assert (scanners[0].metadata_cache_hits, scanners[0].metadata_cache_misses) == (0, 5)
+    # Only the origins of the second logical file differ from the first
+    assert (scanners[1].metadata_cache_hits, scanners[1].metadata_cache_misses) == (4, 1)
+
+
+def test_fingerprint_covers_values_and_kind():
+    values = np.arange(5000.0)
+    objects = [_object("T.PARAMETER-I.BHT-O.0-C.0", VALUES=values)]
+    assert fingerprint_objects("parameters", objects) == \
+        fingerprint_objects("parameters", [_object("T.PARAMETER-I.BHT-O.0-C.0", VALUES=values.copy())])
+    assert fingerprint_objects("parameters", objects) != fingerprint_objects("zones", objects)
+
+    # A change in the middle of a large array, which its repr elides
+    changed = values.copy()
+    changed[2500] = -1
+    assert fingerprint_objects("parameters", objects) != \
+        fingerprint_objects("parameters", [_object("T.PARAMETER-I.BHT-O.0-C.0", VALUES=changed)])
+
+
+def test_cached_outputs_are_copies_and_bounded():
+    cache = DLISMetadataCache(max_entries=1)
+    first = [_object("A")]
+    value, hit = cache.get_or_extract("tools", first, lambda: [{"name": "A"}])
+    assert not hit
+    value[0]["name"] = "changed"
+    assert cache.get_or_extract("tools", first, lambda: None) == ([{"name": "A"}], True)
+
+    cache.get_or_extract("tools", [_object("B")], lambda: [{"name": "B"}])
+    assert cache.get_or_extract("tools", first, lambda: [{"name": "again"}]) == ([{"name": "again"}], False)
+    assert (cache.hits, cache.misses) == (1, 3)
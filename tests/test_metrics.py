@@ -0,0 +1,67 @@
+import urllib.request
+import pytest
+from utils import metrics
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setitem(metrics.METRICS_CONFIG, "FOLDER", tmp_path)
+    return metrics._Registry("worker")
+
+
+def _samples(text, name):
+    return [line for line in text.splitlines() if line.startswith(name) and not line.startswith("#")]
+
+
+def test_counters_gauges_and_labels(registry):
+    registry.add("welllog_conversions_total", 1, {"status": "SUCCESS"})
+    registry.add("welllog_conversions_total", 2, {"status": "SUCCESS"})
+    registry.set("welllog_broker_queue_depth", 7, {})
+    text = registry.render()
+
+    assert "# TYPE welllog_conversions_total counter" in text
+    sample, = _samples(text, "welllog_conversions_total")
+    assert 'component="worker"' in sample and 'status="SUCCESS"' in sample
+    assert sample.endswith(" 3")
+    assert _samples(text, "welllog_broker_queue_depth")[0].endswith(" 7")
+    with pytest.raises(KeyError, match="Unknown metric"):
+        registry.add("welllog_unknown_total", 1, {})
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    for value in (0.3, 4, 5000):
+        registry.observe("welllog_conversion_duration_seconds", value, {"format": "LAS"})
+    samples = _samples(registry.render(), "welllog_conversion_duration_seconds")
+    buckets = {line.split('le="')[1].split('"')[0]: int(line.rsplit(" ", 1)[1])
+               for line in samples if "_bucket" in line}
+    assert buckets["0.5"] == 1 and buckets["5"] == 2 and buckets["3600"] == 2 and buckets["+Inf"] == 3
+    assert [line.rsplit(" ", 1)[1] for line in samples if "_count" in line] == ["3"]
+
+
+def test_textfiles_are_merged(registry, tmp_path):
+    registry.add("welllog_conversions_total", 1, {"status": "SUCCESS"})
+    registry.flush()
+    (tmp_path / "watcher_host_1.prom").write_text(
+        "# HELP welllog_conversions_total Completed conversions by status.\n"
+        "# TYPE welllog_conversions_total counter\n"
+        'welllog_conversions_total{component="watcher",status="FAILED"} 2\n', encoding="utf-8")
+
+    merged = metrics.collect_textfiles(tmp_path)
+    assert merged.count("# HELP welllog_conversions_total") == 1
+    assert merged.count("# TYPE welllog_conversions_total") == 1
+    assert len(_samples(merged, "welllog_conversions_total")) == 2
+
+    server = metrics.start_http_server(0, host="127.0.0.1")
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=10) as response:
+            assert response.read().decode("utf-8") == merged
+    finally:
+        server.shutdown()
+
+
+def test_size_bucket():
+    assert metrics.size_bucket(100) == "lt_1mb"
+    assert metrics.size_bucket(50 << 20) == "10mb_100mb"
+    assert metrics.size_bucket(2 << 30) == "gt_1gb"
+    assert metrics.size_bucket(None) == "unknown"
@@ -0,0 +1,42 @@
+import threading
+import pytest
+from utils.SerialiseJson import JsonSerializable
+from utils.calculate_checksum_and_size import calculate_json_checksum
+from utils.pipeline import prefetch_file, write_json_pipelined
+
+
+@pytest.mark.parametrize("records_fixture", ["las_records", "dlis_records"])
+def test_pipelined_output_matches_serial_writer(request, records_fixture, tmp_path, logger):
+    records = request.getfixturevalue(records_fixture)
+    output_path = tmp_path / "pipelined.json"
+    seen = []
+
+    checksum, size, count = write_json_pipelined(iter(records), output_path, logger, queue_size=1,
+                                                 on_record=lambda record: seen.append(record))
+    assert output_path.read_bytes() == JsonSerializable.to_json_bytes(records)
+    assert checksum == calculate_json_checksum(output_path)
+    assert size == output_path.stat().st_size
+    assert count == len(seen) == len(records)
+
+
+def test_pipelined_empty_output(tmp_path, logger):
+    output_path = tmp_path / "empty.json"
+    checksum, _, count = write_json_pipelined(iter([]), output_path, logger)
+    assert output_path.read_bytes() == JsonSerializable.to_json_bytes([])
+    assert checksum == calculate_json_checksum(output_path)
+    assert count == 0
+
+
+def test_extraction_error_stops_the_pipeline(las_records, tmp_path, logger):
+    def failing():
+        yield las_records[0]
+        raise RuntimeError("truncated frame")
+
+    with pytest.raises(RuntimeError, match="truncated frame"):
+        write_json_pipelined(failing(), tmp_path / "failed.json", logger)
+    # No stage thread is left waiting on a queue
+    assert not [thread for thread in threading.enumerate() if thread.name.startswith("pipeline")]
+
+
+def test_prefetch_missing_file(tmp_path, logger):
+    prefetch_file(tmp_path / "missing.las", logger=logger)
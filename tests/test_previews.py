@@ -0,0 +1,56 @@
+import numpy as np
+import orjson
+import pytest
+from utils.previews import (PREVIEW_METHOD_LTTB, PREVIEW_METHOD_MINMAX, build_record_preview, lttb,
+                            minmax_envelope, write_preview)
+
+
+def test_minmax_envelope_keeps_spikes():
+    index = np.arange(7.0)
+    matrix = np.array([[1.0], [9.0], [2.0], [np.nan], [np.nan], [np.nan], [-4.0]])
+    bin_index, minimums, maximums = minmax_envelope(index, matrix, 3)
+    np.testing.assert_array_equal(bin_index, [0.0, 3.0, 6.0])
+    np.testing.assert_array_equal(minimums[:, 0], [1.0, np.nan, -4.0])
+    np.testing.assert_array_equal(maximums[:, 0], [9.0, np.nan, -4.0])
+
+
+def test_lttb_keeps_ends_and_peaks():
+    index = np.arange(100.0)
+    flat = np.zeros(100)
+    flat[37] = 50.0
+    matrix = np.column_stack([flat, np.sin(index / 10)])
+    selected = lttb(index, matrix, 10)
+    assert selected.shape == (10, 2)
+    assert (selected[0] == 0).all() and (selected[-1] == 99).all()
+    assert 37 in selected[:, 0]
+    assert (np.diff(selected, axis=0) > 0).all()
+    # Few rows are all kept
+    np.testing.assert_array_equal(lttb(index[:5], matrix[:5], 10)[:, 0], np.arange(5))
+
+
+@pytest.mark.parametrize("method", [PREVIEW_METHOD_MINMAX, PREVIEW_METHOD_LTTB])
+def test_record_preview_levels(las_records, method):
+    preview = build_record_preview(las_records[0], levels=[100, 4, 10, 4], method=method)
+    assert preview["rows"] == 40
+    assert preview["index"]["name"] == "DEPT"
+    assert (preview["index"]["min"], preview["index"]["max"]) == (1000.0, 1019.5)
+    # Factors are sorted and deduplicated; 100 is more than the rows
+    assert [(level["factor"], level["rows"]) for level in preview["levels"]] == [(4, 10), (10, 4)]
+    assert set(preview["levels"][0]["curves"]) == {"GR", "RHOB"}
+
+
+def test_frame_previews_written_next_to_the_output(dlis_records, tmp_path):
+    previews = [build_record_preview(record, levels=[10]) for record in dlis_records]
+    preview_path = write_preview(previews + [None], tmp_path / "sampleLF0.json", PREVIEW_METHOD_MINMAX, [10])
+    assert preview_path.name == "sampleLF0.preview.json"
+
+    document = orjson.loads(preview_path.read_bytes())
+    assert [record["frame"] for record in document["records"]] == ["FRAME0", "FRAME1"]
+    frame1 = document["records"][1]
+    # Array channels are left out
+    assert frame1["index"]["name"] == "TDEP" and list(frame1["levels"][0]["curves"]) == ["NPHI"]
+
+
+def test_unknown_preview_method_raises(las_records):
+    with pytest.raises(ValueError, match="Unknown preview method"):
+        build_record_preview(las_records[0], levels=[10], method="average")
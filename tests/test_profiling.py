@@ -0,0 +1,30 @@
+from contextlib import nullcontext
+from utils.profiling import PROFILE_MARKER_SUFFIX, profile_conversion, should_profile
+
+
+def test_selection(tmp_path, monkeypatch):
+    path = tmp_path / "main.las"
+    assert should_profile(path) is None
+    assert should_profile(path, enabled=True) == "enabled"
+
+    monkeypatch.setattr("utils.profiling.random.random", lambda: 0.05)
+    assert should_profile(path, sample_every=10) == "sampled"
+    assert should_profile(path, sample_every=20) is None
+
+    (tmp_path / f"main.las{PROFILE_MARKER_SUFFIX}").touch()
+    assert should_profile(path) == "marker"
+
+
+def test_unselected_conversion_is_not_profiled(tmp_path, logger):
+    assert isinstance(profile_conversion(tmp_path / "main.las", str(tmp_path / "task.log"), logger), nullcontext)
+
+
+def test_reports_written_next_to_the_log(tmp_path, logger):
+    with profile_conversion(tmp_path / "main.las", str(tmp_path / "task.log"), logger, enabled=True, top=5,
+                            report_suffix="_LF0"):
+        sorted(str(number) for number in range(10000))
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "task_LF0.alloc.txt", "task_LF0.prof", "task_LF0.profile.txt"]
+    assert "cumulative" in (tmp_path / "task_LF0.profile.txt").read_text(encoding="utf-8")
+    assert (tmp_path / "task_LF0.alloc.txt").read_text(encoding="utf-8").startswith("Peak traced memory")
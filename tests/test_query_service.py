@@ -0,0 +1,131 @@
+import csv
+import threading
+import numpy as np
+import orjson
+import pytest
+from service.catalog import OutputCatalog
+from service.columnar import ColumnarCache, slice_by_index
+from utils.SerialiseJson import JsonSerializable
+from utils.json_index import write_indexed_json
+
+
+def _write(path, records):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(JsonSerializable.to_json_bytes(records))
+    return path
+
+
+def _as_json(records):
+    return orjson.loads(JsonSerializable.to_json_bytes(records))
+
+
+@pytest.fixture
+def processed(tmp_path, las_records, dlis_records):
+    folder = tmp_path / "processed"
+    # Mirrored input tree: two outputs with the same name, without a well in their header
+    las_records[0]["header"]["well"] = ""
+    _write(folder / "wellA" / "main.json", las_records)
+    las_records[0]["data"] = [[row[0], row[1] * 2, row[2]] for row in las_records[0]["data"]]
+    _write(folder / "wellB" / "main.json", las_records)
+    (folder / "dlis").mkdir()
+    write_indexed_json(dlis_records, folder / "dlis" / "sampleLF0.json")
+    return folder
+
+
+@pytest.fixture
+def catalog(tmp_path, processed, logger):
+    summary = tmp_path / "summary"
+    summary.mkdir()
+    with open(summary / "las_scanned_files.csv", "w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=["file_name", "output_file", "well"])
+        writer.writeheader()
+        writer.writerow({"file_name": "main.las", "output_file": processed / "wellA" / "main.json", "well": "A-1"})
+        writer.writerow({"file_name": "main.las", "output_file": processed / "wellB" / "main.json", "well": "B-1"})
+    return OutputCatalog(processed, summary, tmp_path / "cache", lru_size=2, refresh_seconds=0, logger=logger)
+
+
+def test_wells_from_headers_and_summary(catalog):
+    assert catalog.wells() == {"A-1": ["wellA/main.json"], "B-1": ["wellB/main.json"],
+                               "WELL-A": ["dlis/sampleLF0.json"]}
+    curves = catalog.curves("WELL-A")
+    assert [(entry["frame_index"], entry["curves"][0]) for entry in curves] == [(0, "DEPTH"), (1, "TDEP")]
+
+
+def test_curve_range_of_las_outputs(catalog, processed):
+    rows = _as_json(orjson.loads((processed / "wellB" / "main.json").read_bytes()))[0]["data"]
+    result, = catalog.curve_range("B-1", "GR", 1005, 1010)
+    assert result["index_curve"] == "DEPT"
+    assert result["index"] == [row[0] for row in rows if 1005 <= row[0] <= 1010]
+    assert result["values"] == [row[1] for row in rows if 1005 <= row[0] <= 1010]
+
+
+def test_curve_range_uses_the_frame_index(catalog, dlis_records):
+    # FRAME1 is indexed by TDEP, recorded upwards
+    result, = catalog.curve_range("WELL-A", "NPHI", 1010, 1005)
+    rows = _as_json(dlis_records)[1]["data"]
+    assert result["index_curve"] == "TDEP"
+    assert result["index"] == [row[0] for row in rows if 1005 <= row[0] <= 1010]
+    assert result["values"] == pytest.approx([row[1] for row in rows if 1005 <= row[0] <= 1010])
+    assert catalog.curve_range("WELL-A", "MISSING") == []
+
+
+def test_changed_output_gets_a_new_cache(catalog, processed, tmp_path, las_records):
+    catalog.curve_range("A-1", "GR")
+    before = {path.name for path in (tmp_path / "cache").iterdir()}
+
+    las_records[0]["data"] = las_records[0]["data"][:10]
+    _write(processed / "wellA" / "main.json", las_records)
+    result, = catalog.curve_range("A-1", "GR")
+    assert len(result["values"]) == 10
+
+    after = {path.name for path in (tmp_path / "cache").iterdir()}
+    assert len(after) == len(before) == 1 and after != before
+
+
+def test_cold_build_does_not_block_open_outputs(processed, tmp_path, logger):
+    cache = ColumnarCache(tmp_path / "cache", lru_size=4, logger=logger)
+    warm = cache.get(processed / "wellA" / "main.json")
+
+    started, release = threading.Event(), threading.Event()
+    build = cache._build
+
+    def slow_build(path, cache_dir):
+        started.set()
+        release.wait(10)
+        build(path, cache_dir)
+
+    cache._build = slow_build
+    cold = threading.Thread(target=cache.get, args=(processed / "wellB" / "main.json",))
+    cold.start()
+    try:
+        assert started.wait(10)
+        assert cache.get(processed / "wellA" / "main.json") is warm
+    finally:
+        release.set()
+        cold.join()
+    assert len(list((tmp_path / "cache").iterdir())) == 2
+
+
+def test_concurrent_requests_build_once(processed, tmp_path, logger):
+    cache = ColumnarCache(tmp_path / "cache", lru_size=4, logger=logger)
+    builds = []
+    build = cache._build
+    cache._build = lambda path, cache_dir: builds.append(path) or build(path, cache_dir)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(processed / "dlis" / "sampleLF0.json")))
+               for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(builds) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_slice_by_index():
+    increasing = np.arange(10.0)
+    assert slice_by_index(increasing, 2, 4) == slice(2, 5)
+    assert slice_by_index(increasing[::-1], 4, 2) == slice(5, 8)
+    assert slice_by_index(increasing, None, None) == slice(0, 10)
+    assert slice_by_index(np.array([]), 0, 1) == slice(0, 0)
@@ -0,0 +1,63 @@
+import os
+import time
+from worker.retention import RetentionPolicy, purge_folder, purge_subfolders
+
+
+def _file(path, age_seconds=0):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"{}")
+    modified = time.time() - age_seconds
+    os.utime(path, (modified, modified))
+    return path
+
+
+def test_purge_by_age_then_count(tmp_path, logger):
+    expired = _file(tmp_path / "expired", age_seconds=7200)
+    oldest, older, newest = (_file(tmp_path / name, age_seconds=age) for name, age in
+                             [("oldest", 300), ("older", 200), ("newest", 100)])
+    _file(tmp_path / "subfolder" / "kept", age_seconds=7200)
+
+    assert purge_folder(tmp_path, ttl_seconds=3600, max_files=2, logger=logger) == 2
+    assert not expired.exists() and not oldest.exists()
+    assert older.exists() and newest.exists()
+    assert (tmp_path / "subfolder" / "kept").exists()  # Sub-directories are left untouched
+    assert purge_folder(tmp_path / "missing", 3600, 2, logger) == 0
+
+
+def test_zero_disables_the_limits(tmp_path, logger):
+    _file(tmp_path / "a", age_seconds=7200)
+    _file(tmp_path / "b", age_seconds=7200)
+    assert purge_folder(tmp_path, ttl_seconds=0, max_files=0, logger=logger) == 0
+    assert purge_subfolders(tmp_path, ttl_seconds=0, logger=logger) == 0
+
+
+def test_purge_subfolders_by_newest_file(tmp_path, logger):
+    _file(tmp_path / "abandoned" / "frame00000.json", age_seconds=7200)
+    _file(tmp_path / "active" / "frame00000.json", age_seconds=7200)
+    _file(tmp_path / "active" / "frame00001.json", age_seconds=10)
+    assert purge_subfolders(tmp_path, ttl_seconds=3600, logger=logger) == 1
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["active"]
+
+
+def test_policy_runs_once_per_interval(tmp_path, logger):
+    _file(tmp_path / "expired", age_seconds=7200)
+    cleanups = []
+
+    def failing():
+        raise OSError("claims folder unavailable")
+
+    policy = RetentionPolicy([tmp_path], ttl_seconds=3600, max_files=0, interval_seconds=3600, logger=logger,
+                             cleanups={"checkpoints": lambda: cleanups.append(1) or 3, "claims": failing})
+    # A failing clean-up does not stop the others
+    assert policy.run_if_due() == 4
+    _file(tmp_path / "expired", age_seconds=7200)
+    assert policy.run_if_due() == 0
+    assert cleanups == [1]
+
+
+def test_task_results_are_slim():
+    from worker.tasks import _summarise_result
+    result = {"task_id": "t1", "status": "SUCCESS", "file_name": "a.las", "output_file": "a.json",
+              "message": "done", "well": "A", "Curve Names": "DEPT, GR", "output_file_checksum": "abc"}
+    assert _summarise_result(result) == {"task_id": "t1", "status": "SUCCESS", "file_name": "a.las",
+                                         "output_file": "a.json", "message": "done"}
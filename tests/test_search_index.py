@@ -0,0 +1,102 @@
+import pytest
+from search.index import SearchIndex, TERM_MNEMONIC, TERM_UNIT, TERM_WELL, document_from_output, document_from_result
+from utils.SerialiseJson import JsonSerializable
+from utils.sharded_output import SHARDING_ROWS, write_sharded_output
+
+RESULTS = [
+    {"output_file": "/out/a.json", "file_name": "a.las", "input_file_format": "LAS", "well": "W-1",
+     "field": "FIELD X", "operator": "ACME", "date": "2020-01-15T00:00:00+00:00",
+     "curve_units": [["DEPT", "m"], ["DT", "us/ft"], ["RHOB", "g/cc"]]},
+    {"output_file": "/out/b.json", "file_name": "b.dlis", "input_file_format": "DLIS", "well": "W-2; W-2A",
+     "field": "FIELD X", "operator": "Other", "date": "2021-06-01T00:00:00+00:00",
+     "curve_units": [["TDEP", "m"], ["DTC", "us/ft"], ["GR", None]]},
+    # Summaries recorded before curve units were, with header values missing
+    {"output_file": "/out/c.json", "file_name": "c.las", "input_file_format": "LAS", "well": "W-3",
+     "field": "None", "operator": None, "date": "nan", "Curve Names": "DEPT, RHOB, NPHI"},
+]
+
+
+@pytest.fixture
+def index(tmp_path, logger):
+    with SearchIndex(tmp_path / "index" / "search.sqlite", logger=logger) as search_index:
+        search_index.add_documents([document_from_result(result) for result in RESULTS])
+        yield search_index
+
+
+def _files(outputs):
+    return [output["output_file"] for output in outputs]
+
+
+def test_documents_from_results():
+    document = document_from_result(RESULTS[1])
+    assert document["well"] == ["W-2", "W-2A"]
+    assert document["curves"] == [("TDEP", "m"), ("DTC", "us/ft"), ("GR", None)]
+    legacy = document_from_result(RESULTS[2])
+    assert legacy["curves"] == [("DEPT", None), ("RHOB", None), ("NPHI", None)]
+    assert legacy["field"] == legacy["operator"] == legacy["date"] == []
+
+
+def test_every_mnemonic_and_unit_is_required(index):
+    assert _files(index.search(mnemonics=["RHOB"])) == ["/out/a.json", "/out/c.json"]
+    assert _files(index.search(mnemonics=["rhob", "DT"])) == ["/out/a.json"]
+    assert _files(index.search(mnemonics=["DT*"])) == ["/out/a.json", "/out/b.json"]
+    assert _files(index.search(mnemonics=["DT?"])) == ["/out/b.json"]
+    assert _files(index.search(units=["US/FT", "g/cc"])) == ["/out/a.json"]
+    assert index.search(mnemonics=["CALI"]) == []
+
+
+def test_any_header_value_matches(index):
+    assert _files(index.search(wells=["W-1", "W-2A"])) == ["/out/a.json", "/out/b.json"]
+    assert _files(index.search(fields=["field x"], operators=["acme"])) == ["/out/a.json"]
+    assert _files(index.search(wells=["W-*"], mnemonics=["NPHI"])) == ["/out/c.json"]
+    output = index.search(wells=["w-2"])[0]
+    assert (output["well"], output["field"], output["date"], output["curve_count"]) == ("W-2; W-2A", "FIELD X",
+                                                                                        "2021-06-01", 3)
+
+
+def test_dates_and_ranges(index):
+    assert _files(index.search(dates=["2020-01-15"])) == ["/out/a.json"]
+    assert _files(index.search(dates=["2021-*"])) == ["/out/b.json"]
+    assert _files(index.search(date_from="2020-06-01")) == ["/out/b.json"]
+    assert _files(index.search(date_from="2020-01-01", date_to="2021-06-01T12:00:00")) == ["/out/a.json", "/out/b.json"]
+    assert _files(index.search(date_to="2019-12-31")) == []
+
+
+def test_limit_and_terms(index):
+    assert len(index.search(limit=2)) == 2
+    assert index.terms(TERM_MNEMONIC, "DT*") == [("dt", 1), ("dtc", 1)]
+    assert index.terms(TERM_UNIT) == [("g/cc", 1), ("m", 2), ("us/ft", 2)]
+    assert index.terms(TERM_WELL, limit=1) == [("w-1", 1)]
+
+
+def test_reindexing_replaces_terms(index):
+    index.add_documents([document_from_result({**RESULTS[0], "curve_units": [["GR", "gAPI"]]})])
+    assert index.search(mnemonics=["DT"]) == []
+    assert _files(index.search(mnemonics=["GR"])) == ["/out/a.json", "/out/b.json"]
+    index.remove("/out/a.json")
+    assert _files(index.search()) == ["/out/b.json", "/out/c.json"]
+    assert index.terms(TERM_UNIT, "gapi") == []
+
+
+def test_rebuild_from_outputs(tmp_path, index, las_records, dlis_records, logger):
+    processed = tmp_path / "processed"
+    (processed / "run1").mkdir(parents=True)
+    (processed / "run1" / "sample.json").write_bytes(JsonSerializable.to_json_bytes(las_records))
+    manifest_path, _ = write_sharded_output(dlis_records, processed, "sampleLF0", SHARDING_ROWS, 15, logger,
+                                            index_block_rows=5)
+
+    document = document_from_output(manifest_path)
+    assert document["input_file_format"] == "DLIS"
+    assert {"DEPTH", "GR", "TDEP", "NPHI"} <= {name for name, _ in document["curves"]}
+
+    assert index.rebuild(processed) == 2
+    assert _files(index.search(wells=["WELL-A"])) == [str(manifest_path.resolve())]
+    assert _files(index.search(mnemonics=["DEPT", "GR", "RHOB"], fields=["FIELD-Y"])) == \
+        [str((processed / "run1" / "sample.json").resolve())]
+    assert _files(index.search(dates=["2020-01-15"])) == ["/out/a.json", str(manifest_path.resolve())]
+
+    # Outputs removed from the folder leave the index on the next rebuild; others stay
+    (processed / "run1" / "sample.json").unlink()
+    assert index.rebuild(processed) == 1
+    assert index.search(wells=["WELL-B"]) == []
+    assert len(index.search()) == 4
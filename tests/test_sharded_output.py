@@ -0,0 +1,64 @@
+import orjson
+import pytest
+from dlisio import dlis
+from scanners.DLISLogicalFile import ARRAY_LAYOUT_FLAT
+from scanners.dlis_scanner import DLISScanner
+from utils.SerialiseJson import JsonSerializable
+from utils.json_index import IndexedJsonReader
+from utils.output_files import load_output_records
+from utils.sharded_output import SHARDING_FRAME, SHARDING_ROWS, split_records, write_sharded_output
+
+
+def _as_json(records):
+    return orjson.loads(JsonSerializable.to_json_bytes(records))
+
+
+def _part_files(folder):
+    return sorted(path.name for path in folder.glob("*.part*.json"))
+
+
+@pytest.mark.parametrize("mode, rows_per_part, part_count", [(SHARDING_FRAME, 0, 2), (SHARDING_ROWS, 15, 6)])
+def test_sharded_round_trip(dlis_records, tmp_path, logger, mode, rows_per_part, part_count):
+    manifest_path, manifest = write_sharded_output(dlis_records, tmp_path, "sample", mode, rows_per_part, logger)
+    assert len(manifest["parts"]) == part_count
+    assert [frame["row_count"] for frame in manifest["frames"]] == [40, 40]
+    assert load_output_records(manifest_path) == _as_json(dlis_records)
+
+
+def test_sharded_round_trip_flat_arrays(dlis_path, tmp_path, logger):
+    with dlis.load(str(dlis_path)) as logical_files:
+        records = DLISScanner(dlis_path, logical_files[0], logger, array_layout=ARRAY_LAYOUT_FLAT).scan()
+    assert "arrays" in records[0]
+
+    manifest_path, _ = write_sharded_output(records, tmp_path, "sample", SHARDING_ROWS, 15, logger)
+    assert load_output_records(manifest_path) == _as_json(records)
+
+
+def test_rerun_removes_stale_parts(dlis_records, tmp_path, logger):
+    write_sharded_output(dlis_records, tmp_path, "sample", SHARDING_ROWS, 5, logger, index_block_rows=4)
+    assert len(_part_files(tmp_path)) == 32  # 16 parts and their index sidecars
+
+    # Another output whose name starts the same is left alone
+    (tmp_path / "sample2.part00000.json").write_bytes(b"[]")
+
+    manifest_path, manifest = write_sharded_output(dlis_records, tmp_path, "sample", SHARDING_FRAME, 0, logger)
+    assert _part_files(tmp_path) == ["sample.part00000.json", "sample.part00001.json", "sample2.part00000.json"]
+    assert load_output_records(manifest_path) == _as_json(dlis_records)
+
+
+def test_unknown_mode_raises(dlis_records, tmp_path, logger):
+    with pytest.raises(ValueError, match="Unknown sharding mode"):
+        write_sharded_output(dlis_records, tmp_path, "sample", "columns", 10, logger)
+    with pytest.raises(ValueError, match="Unknown sharding mode"):
+        list(split_records(dlis_records, "none", 10))
+    assert not list(tmp_path.iterdir())
+
+
+def test_index_sidecar_of_parts(las_records, tmp_path, logger):
+    manifest_path, manifest = write_sharded_output(las_records, tmp_path, "sample", SHARDING_ROWS, 16, logger,
+                                                   index_block_rows=5)
+    rows = []
+    for part in manifest["parts"]:
+        reader = IndexedJsonReader(tmp_path / part["file"])
+        rows += reader.read_rows(0, 1004, 1016)
+    assert rows == [row for row in _as_json(las_records)[0]["data"] if 1004 <= row[0] <= 1016]
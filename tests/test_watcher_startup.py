@@ -0,0 +1,23 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_watcher_does_not_import_the_scanners(tmp_path):
+    # A fresh interpreter, since other tests have already imported the worker side
+    script = ("import sys, crawler.watcher\n"
+              "print(','.join(sorted(name for name in ('dlisio', 'lasio', 'pandas', 'worker.tasks', 'scanners')"
+              " if name in sys.modules)))")
+    completed = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True,
+                               timeout=60, env={"PATH": "", "METRICS_FOLDER": str(tmp_path)})
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.strip() == ""
+
+
+def test_task_names_are_registered():
+    from crawler import watcher
+    from worker import app, tasks  # noqa: F401 - registers the tasks
+    assert watcher.CONVERT_TASK_NAME in app.tasks
+    assert watcher.CONVERT_BATCH_TASK_NAME in app.tasks
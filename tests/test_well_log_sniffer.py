@@ -0,0 +1,77 @@
+from mappings.WellLogsFormat import WellLogFormat
+from utils.WellLogSniffer import WellLogSniffer
+
+
+def _copy(source, target, data=None, suffix=b""):
+    target.write_bytes((source.read_bytes() if data is None else data) + suffix)
+    return target
+
+
+def test_detect_format(las_path, dlis_path):
+    assert WellLogSniffer.detect_format(las_path.read_bytes()[:256]) == WellLogFormat.LAS
+    assert WellLogSniffer.detect_format(dlis_path.read_bytes()[:256]) == WellLogFormat.DLIS
+    assert WellLogSniffer.detect_format(b"\x00" * 256) == WellLogFormat.UNKNOWN
+
+
+def test_accepts_las(las_path):
+    report = WellLogSniffer.sniff(las_path)
+    assert report["valid"], report["errors"]
+    assert report["format"] == "LAS"
+    assert report["curve_count"] == 3
+    assert report["estimated_rows"] == 40
+
+
+def test_accepts_las_with_bom(las_path, tmp_path):
+    path = _copy(None, tmp_path / "bom.las", data=b"\xef\xbb\xbf" + las_path.read_bytes())
+    assert WellLogSniffer.detect_format(path.read_bytes()[:256]) == WellLogFormat.LAS
+    report = WellLogSniffer.sniff(path)
+    assert report["valid"], report["errors"]
+    assert report["version"] == "2.0"
+    assert report["estimated_rows"] == 40
+
+
+def test_accepts_dlis(dlis_path):
+    report = WellLogSniffer.sniff(dlis_path)
+    assert report["valid"], report["errors"]
+    assert report["format"] == "DLIS"
+    assert report["logical_file_count"] == 2
+    assert report["frame_count"] == 4
+    assert report["truncated"] is False
+
+
+def test_rejects_unknown_file(tmp_path):
+    path = _copy(None, tmp_path / "notes.las", data=b"just some text\n" * 100)
+    report = WellLogSniffer.sniff(path)
+    assert not report["valid"]
+    assert report["format"] == "UNKNOWN"
+
+
+def test_rejects_truncated_dlis(dlis_path, tmp_path):
+    data = dlis_path.read_bytes()
+    path = _copy(None, tmp_path / "truncated.dlis", data=data[:len(data) - 100])
+    report = WellLogSniffer.sniff(path)
+    assert report["format"] == "DLIS"
+    assert not report["valid"]
+    assert report["errors"]
+
+
+def test_rejects_trailing_garbage(dlis_path, tmp_path):
+    path = _copy(dlis_path, tmp_path / "garbage.dlis", suffix=b"\xde\xad\xbe\xef" * 64)
+    assert not WellLogSniffer.sniff(path)["valid"]
+
+
+def test_accepts_zero_padding(dlis_path, tmp_path):
+    # Tape copies pad the last block with zeros, possibly more than one read chunk
+    path = _copy(dlis_path, tmp_path / "padded.dlis", suffix=b"\x00" * (300 * 1024))
+    report = WellLogSniffer.sniff(path)
+    assert report["valid"], report["errors"]
+    assert report["frame_count"] == 4
+
+
+def test_bounded_scan_extrapolates(dlis_path):
+    full = WellLogSniffer.sniff(dlis_path)
+    bounded = WellLogSniffer.sniff(dlis_path, max_scan_bytes=4096)
+    assert bounded["valid"], bounded["errors"]
+    assert bounded["truncated"] is True
+    assert bounded["estimated_values"] > 0
+    assert bounded["visible_record_count"] < full["visible_record_count"]
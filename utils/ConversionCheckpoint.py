@@ -0,0 +1,169 @@
+"""
+    Checkpoints of a DLIS logical file conversion, so a retried task resumes where the previous
+    attempt stopped instead of re-reading the whole logical file.
+
+    A checkpoint lives in `{checkpoint_folder}/{key}` where the key hashes the input path, size,
+    modification time, logical file ID and the options that change the records. It holds:
+    |_metadata.json               header, parameters, equipments, zones and tools
+    |_frameNNNNN.json             frame metadata, curves and data of each completed frame
+    |_state.json                  checksum of every completed file and a hash chain over them
+
+    Files are written to a temporary name and renamed, and a frame only counts as completed once
+    the state file lists it. On load, files whose checksum or chain link does not match are
+    discarded together with everything recorded after them.
+"""
+import hashlib
+import os
+import shutil
+from pathlib import Path
+import orjson
+from utils.SerialiseJson import JsonSerializable
+
+_METADATA_FILE = "metadata.json"
+_STATE_FILE = "state.json"
+
+
+def _digest(data):
+    return hashlib.blake2b(data).hexdigest()
+
+
+def _chain(previous, checksum):
+    return _digest(f"{previous}:{checksum}".encode())
+
+
+class ConversionCheckpoint:
+    """
+    Stores and restores the metadata and completed frames of one logical file conversion.
+    """
+
+    def __init__(self, checkpoint_folder, filepath, logical_file_id, logger, options=None):
+        """
+        Initialize the ConversionCheckpoint.
+
+        Args:
+            checkpoint_folder (str or Path): Folder holding all checkpoints.
+            filepath (str or Path): Input DLIS file.
+            logical_file_id (str): ID of the logical file being converted.
+            logger: Logger instance.
+            options (dict, optional): Conversion options that change the records.
+        """
+        filepath = Path(filepath).resolve()
+        stat = os.stat(filepath)
+        fingerprint = orjson.dumps({
+            "path": str(filepath),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "logical_file_id": str(logical_file_id),
+            "options": options or {},
+        }, option=orjson.OPT_SORT_KEYS)
+
+        self._key = hashlib.blake2b(fingerprint, digest_size=16).hexdigest()
+        self._folder = Path(checkpoint_folder) / self._key
+        self._logger = logger
+        self._state = {"metadata": None, "frames": []}
+
+    @property
+    def key(self):
+        return self._key
+
+    def _write(self, name, data):
+        self._folder.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._folder / f"{name}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self._folder / name)
+
+    def _read(self, name, checksum):
+        """
+        Returns the decoded file, or None if it is missing or does not match its checksum.
+        """
+        try:
+            with open(self._folder / name, "rb") as file:
+                data = file.read()
+        except OSError:
+            return None
+        if _digest(data) != checksum:
+            return None
+        return orjson.loads(data)
+
+    def _save_state(self):
+        self._write(_STATE_FILE, orjson.dumps(self._state))
+
+    def load(self):
+        """
+        Loads and verifies an existing checkpoint.
+
+        Returns:
+            tuple: (metadata or None, dict mapping frame index to the stored frame output)
+        """
+        try:
+            with open(self._folder / _STATE_FILE, "rb") as file:
+                state = orjson.loads(file.read())
+        except (OSError, orjson.JSONDecodeError):
+            return None, {}
+
+        metadata = None
+        if state.get("metadata"):
+            metadata = self._read(_METADATA_FILE, state["metadata"]["checksum"])
+
+        frames = {}
+        verified = []
+        previous = state["metadata"]["chain"] if metadata is not None else None
+        if previous is not None:
+            for entry in state.get("frames", []):
+                frame_output = self._read(entry["file"], entry["checksum"])
+                if frame_output is None or _chain(previous, entry["checksum"]) != entry["chain"]:
+                    self._logger.warning(f"Discarding checkpoint {self._key} from frame {entry['frame_index']}: "
+                                         f"checksum mismatch")
+                    break
+                frames[entry["frame_index"]] = frame_output
+                verified.append(entry)
+                previous = entry["chain"]
+
+        self._state = {"metadata": state["metadata"] if metadata is not None else None, "frames": verified}
+        if metadata is not None:
+            self._logger.info(f"Resuming from checkpoint {self._key}: {len(frames)} completed frames")
+        return metadata, frames
+
+    def save_metadata(self, metadata):
+        """
+        Stores the logical file metadata. Starts a new hash chain, dropping any recorded frames.
+        """
+        data = orjson.dumps(JsonSerializable.to_json(metadata))
+        checksum = _digest(data)
+        self._write(_METADATA_FILE, data)
+        self._state = {"metadata": {"checksum": checksum, "chain": _chain("", checksum)}, "frames": []}
+        self._save_state()
+
+    def save_frame(self, frame_index, frame_output):
+        """
+        Stores a completed frame and links it into the hash chain.
+
+        Args:
+            frame_index (int): Position of the frame in the logical file.
+            frame_output (dict): Frame metadata, curves and data of the frame.
+        """
+        if self._state["metadata"] is None:
+            raise ValueError("Checkpoint metadata must be saved before frames")
+
+        name = f"frame{frame_index:05d}.json"
+        data = orjson.dumps(JsonSerializable.to_json(frame_output))
+        checksum = _digest(data)
+        self._write(name, data)
+
+        previous = self._state["frames"][-1]["chain"] if self._state["frames"] else self._state["metadata"]["chain"]
+        self._state["frames"].append({
+            "frame_index": frame_index,
+            "file": name,
+            "checksum": checksum,
+            "chain": _chain(previous, checksum),
+        })
+        self._save_state()
+
+    def clear(self):
+        """
+        Deletes the checkpoint once the output has been written.
+        """
+        shutil.rmtree(self._folder, ignore_errors=True)
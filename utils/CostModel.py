@@ -0,0 +1,89 @@
+import json
+import os
+from mappings.WellLogsFormat import WellLogFormat
+
+
+class CostModel:
+    """
+    Linear cost model used to estimate the runtime and memory footprint of a conversion
+    before the file is enqueued.
+
+    For each format the model is:
+        runtime_seconds = intercept + per_mb * size_mb + per_mvalue * values_millions
+        memory_mb       = intercept + per_mb * size_mb + per_mvalue * values_millions
+
+    The default coefficients are rough figures for a single worker process. They can be
+    replaced per format and target by a JSON file in the layout written by `save`.
+    """
+
+    DEFAULT_COEFFICIENTS = {
+        WellLogFormat.LAS.value: {
+            "runtime_seconds": {"intercept": 0.2, "per_mb": 0.5, "per_mvalue": 1.5},
+            "memory_mb": {"intercept": 150.0, "per_mb": 4.0, "per_mvalue": 60.0},
+        },
+        WellLogFormat.DLIS.value: {
+            "runtime_seconds": {"intercept": 0.5, "per_mb": 0.8, "per_mvalue": 2.0},
+            "memory_mb": {"intercept": 200.0, "per_mb": 6.0, "per_mvalue": 80.0},
+        },
+    }
+
+    def __init__(self, coefficients=None):
+        """
+        Initialize the CostModel.
+
+        Args:
+            coefficients (dict, optional): Coefficients keyed by format value and target.
+                Missing formats fall back to the defaults.
+        """
+        self._coefficients = {fmt: {target: dict(values) for target, values in targets.items()}
+                              for fmt, targets in self.DEFAULT_COEFFICIENTS.items()}
+        for fmt, targets in (coefficients or {}).items():
+            self._coefficients.setdefault(fmt, {}).update(targets)
+
+    @property
+    def coefficients(self):
+        return self._coefficients
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads coefficients from a JSON file. Returns the default model if the file does not exist.
+        """
+        if path and os.path.exists(path):
+            with open(path, "r") as file:
+                return cls(json.load(file))
+        return cls()
+
+    def save(self, path):
+        """
+        Saves the coefficients to a JSON file.
+        """
+        with open(path, "w") as file:
+            json.dump(self._coefficients, file, indent=2)
+
+    def estimate(self, file_format, file_size, values=0):
+        """
+        Estimates the runtime and memory needed to convert a file.
+
+        Args:
+            file_format (str): Format value (LAS or DLIS).
+            file_size (int): Input file size in bytes.
+            values (int, optional): Estimated number of sample values in the file.
+
+        Returns:
+            dict: Estimated runtime in seconds and memory in MB, or None for unknown formats.
+        """
+        targets = self._coefficients.get(file_format)
+        if not targets:
+            return None
+
+        size_mb = file_size / (1024 * 1024)
+        values_millions = values / 1e6
+
+        estimate = {}
+        for target, coefficients in targets.items():
+            estimate[target] = round(
+                coefficients.get("intercept", 0.0)
+                + coefficients.get("per_mb", 0.0) * size_mb
+                + coefficients.get("per_mvalue", 0.0) * values_millions, 3)
+        return estimate
@@ -1,14 +1,76 @@
+import re
 from datetime import datetime, timezone
-from dateutil.parser import parse, ParserError
+from functools import lru_cache
+from dateutil.parser import parse, parserinfo, ParserError
+
+_PARSER_INFO = parserinfo()
+
+# Fast paths for the date layouts common in LAS and DLIS headers. Each returns the same
+# datetime as `dateutil.parser.parse(..., default=datetime(1900, 1, 1))`, or None to defer to it.
+
+
+def _iso(match):
+    year, month, day, hour, minute, second = match.groups()
+    return datetime(int(year), int(month), int(day), int(hour or 0), int(minute or 0), int(second or 0))
+
+
+def _numeric_day_month(match):
+    # dateutil reads the first number as the month unless it cannot be one
+    first, second, year = (int(group) for group in match.groups())
+    month, day = (second, first) if first > 12 else (first, second)
+    return datetime(year, month, day)
+
+
+def _day_month_name(match):
+    day, month_name, year = match.groups()
+    month = _PARSER_INFO.month(month_name)
+    return datetime(int(year), month, int(day)) if month else None
+
+
+def _compact(match):
+    year, month, day = (int(group) for group in match.groups())
+    return datetime(year, month, day)
+
+
+# Years are matched from 1000 on: dateutil reads some zero-padded years ("12 May 0075") as 2075
+_FAST_PATHS = (
+    (re.compile(r"([1-9]\d{3})-(\d{2})-(\d{2})(?:[T ](\d{2}):(\d{2})(?::(\d{2}))?)?"), _iso),
+    (re.compile(r"(\d{1,2})/(\d{1,2})/([1-9]\d{3})"), _numeric_day_month),
+    (re.compile(r"(\d{1,2})[- ]([A-Za-z]{3,9})[- ]([1-9]\d{3})"), _day_month_name),
+    (re.compile(r"([1-9]\d{3})(\d{2})(\d{2})"), _compact),
+)
+
+# Index of the fast path that last matched, per source (e.g. "las", "dlis"); tried first
+_source_hints = {}
+
+
+def _fast_parse(date_string, source):
+    hint = _source_hints.get(source, 0)
+    for position in (hint, *(index for index in range(len(_FAST_PATHS)) if index != hint)):
+        pattern, build = _FAST_PATHS[position]
+        match = pattern.fullmatch(date_string)
+        if match is None:
+            continue
+        try:
+            parsed_date = build(match)
+        except ValueError:
+            return None  # Out of range values: dateutil decides (and reports the error)
+        if parsed_date is not None:
+            _source_hints[source] = position
+        return parsed_date
+    return None
+
 
 class DateUtils:
     @staticmethod
-    def to_iso8601(date_input):
+    def to_iso8601(date_input, source=None):
         """
         Convert a datetime, date, or string to ISO 8601 format.
         Handles ambiguous cases like "11/91" as MM/YY format.
         Args:
             date_input (str, datetime, date): The date to convert.
+            source (str, optional): Origin of the value (e.g. "las", "dlis"), used to try the
+                date layout last seen from that source first.
         Returns:
             str: The ISO 8601 formatted string.
         """
@@ -21,23 +83,39 @@ class DateUtils:
             elif hasattr(date_input, "isoformat"):  # For date objects
                 return f"{date_input.isoformat()}T00:00:00Z"
             elif isinstance(date_input, str):
-                # Try parsing the string
-                try:
-                    # Try parsing the string
-                    parsed_date = parse(date_input, default=datetime(1900, 1, 1))
-                    return DateUtils.to_iso8601(parsed_date)
-                except ParserError:
-                    # Handle ambiguous cases like "MM/YY"
-                    if "/" in date_input:
-                        parts = date_input.split("/")
-                        if len(parts) == 2:  # Assume MM/YY
-                            month, year = int(parts[0]), int(parts[1])
-                            if year < 100:  # Convert YY to YYYY (assuming 20th century)
-                                year += 1900
-                            parsed_date = datetime(year, month, 1)
-                            return DateUtils.to_iso8601(parsed_date)
-                    raise  # Re-raise if parsing still fails
+                return DateUtils._string_to_iso8601(date_input, source)
             else:
                 raise TypeError("Input must be a string, datetime, or date object.")
         except Exception as e:
-            return f"Error: {e}"  # Return the error message for debugging
\ No newline at end of file
+            return f"Error: {e}"  # Return the error message for debugging
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _string_to_iso8601(date_input, source=None):
+        """
+        Converts a date string, memoised since header dates repeat across files. Common layouts
+        are parsed by precompiled patterns; anything else goes through dateutil.
+        """
+        try:
+            parsed_date = _fast_parse(date_input.strip(), source)
+            if parsed_date is None:
+                parsed_date = DateUtils._parse_free_form(date_input)
+            return DateUtils.to_iso8601(parsed_date)
+        except Exception as e:
+            return f"Error: {e}"
+
+    @staticmethod
+    def _parse_free_form(date_input):
+        try:
+            # Try parsing the string
+            return parse(date_input, default=datetime(1900, 1, 1))
+        except ParserError:
+            # Handle ambiguous cases like "MM/YY"
+            if "/" in date_input:
+                parts = date_input.split("/")
+                if len(parts) == 2:  # Assume MM/YY
+                    month, year = int(parts[0]), int(parts[1])
+                    if year < 100:  # Convert YY to YYYY (assuming 20th century)
+                        year += 1900
+                    return datetime(year, month, 1)
+            raise  # Re-raise if parsing still fails
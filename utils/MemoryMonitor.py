@@ -0,0 +1,141 @@
+import os
+import signal
+import threading
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class MemoryLimitExceeded(BaseException):
+    """
+    Raised in the task's thread when its process crosses the soft memory ceiling.
+
+    Derives from BaseException so the `except Exception` blocks of the scanners and processors
+    do not swallow it and the conversion stops.
+    """
+
+
+def _current_rss_bytes():
+    """
+    Returns the resident set size of this process, or None where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _major_page_faults():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_majflt if resource else None
+
+
+class MemoryMonitor:
+    """
+    Samples the process RSS while a task runs, recording its peak and the major page faults it
+    caused, and enforces a soft memory ceiling.
+
+    When the RSS crosses `limit_mb`, the sampling thread sends SIGUSR2 to the process and the
+    handler raises MemoryLimitExceeded in the main thread, which unwinds the conversion cleanly.
+    Python runs signal handlers between bytecodes, so the exception surfaces once a running
+    native call (e.g. a dlisio read) returns. The handler can only be installed from the main
+    thread; elsewhere, and where SIGUSR2 does not exist, the ceiling is only reported.
+    """
+
+    def __init__(self, limit_mb=0, interval=0.2, logger=None):
+        """
+        Initialize the MemoryMonitor.
+
+        Args:
+            limit_mb (int, optional): Soft memory ceiling in MB (0 disables it).
+            interval (float, optional): Seconds between RSS samples.
+            logger: Logger instance.
+        """
+        self._limit_bytes = limit_mb * 1024 * 1024 if limit_mb else 0
+        self._interval = interval
+        self._logger = logger
+        self._stop = threading.Event()
+        self._thread = None
+        self._previous_handler = None
+        self._enforced = False
+        self._start_faults = None
+        self._end_faults = None
+        self._stopping = False
+        self.peak_rss = None
+        self.limit_exceeded = False
+
+    def _handle_signal(self, signum, frame):
+        # A signal still pending when the task has already finished is ignored
+        if self.limit_exceeded and not self._stopping:
+            raise MemoryLimitExceeded(f"Memory use {self.peak_rss / (1024 * 1024):.0f} MB exceeded the soft limit "
+                                      f"of {self._limit_bytes / (1024 * 1024):.0f} MB")
+
+    def _sample(self):
+        while not self._stop.wait(self._interval):
+            self._record()
+
+    def _record(self):
+        rss = _current_rss_bytes()
+        if rss is None:
+            return
+        self.peak_rss = max(self.peak_rss or 0, rss)
+
+        if self._limit_bytes and rss > self._limit_bytes and not self.limit_exceeded:
+            self.limit_exceeded = True
+            if self._logger:
+                self._logger.error(f"Memory use {rss / (1024 * 1024):.0f} MB exceeded the soft limit "
+                                   f"of {self._limit_bytes / (1024 * 1024):.0f} MB")
+            if self._enforced:
+                os.kill(os.getpid(), signal.SIGUSR2)
+
+    def start(self):
+        self._start_faults = _major_page_faults()
+
+        can_signal = hasattr(signal, "SIGUSR2") and threading.current_thread() is threading.main_thread()
+        if self._limit_bytes and can_signal:
+            self._previous_handler = signal.signal(signal.SIGUSR2, self._handle_signal)
+            self._enforced = True
+        elif self._limit_bytes and self._logger:
+            self._logger.warning("Soft memory limit cannot be enforced outside the main thread; it is only reported")
+
+        # A process already above the ceiling is stopped right away
+        self._record()
+
+        if _current_rss_bytes() is not None:
+            self._thread = threading.Thread(target=self._sample, name="memory-monitor", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping = True
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._record()
+        self._end_faults = _major_page_faults()
+
+        if self._enforced:
+            signal.signal(signal.SIGUSR2, self._previous_handler)
+            self._enforced = False
+
+    def usage(self):
+        """
+        Returns:
+            dict: Peak RSS in MB and the major page faults taken while the monitor ran.
+        """
+        faults = None
+        if self._start_faults is not None and self._end_faults is not None:
+            faults = self._end_faults - self._start_faults
+        return {
+            "peak_rss_mb": round(self.peak_rss / (1024 * 1024), 1) if self.peak_rss else None,
+            "major_page_faults": faults,
+        }
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
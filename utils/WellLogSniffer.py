@@ -0,0 +1,424 @@
+"""
+    Cheap pre-flight inspection of well log files.
+
+    The sniffer works from the header bytes and a quick structural scan, without handing the
+    file to lasio or dlisio. It is meant to run on the watcher before a task is enqueued so that
+    corrupt or unrelated files can be rejected early and the cost of a conversion can be estimated.
+
+    DLIS envelope (RP66 V1):
+    |_Storage Unit Label (80 bytes, optional)
+    |_Visible Record: length (2 bytes) | 0xFF | 0x01
+        |_Logical Record Segment: length (2 bytes) | attributes (1 byte) | type (1 byte) | body
+"""
+import os
+import re
+import struct
+from mappings.WellLogsFormat import WellLogFormat
+
+# DLIS storage unit label layout
+_SUL_LENGTH = 80
+_TIF_MARKER_LENGTH = 12
+
+# Visible record and logical record segment headers
+_VR_HEADER = struct.Struct(">HBB")
+_LRSH = struct.Struct(">HBB")
+_VR_MIN_LENGTH = 20
+_LRS_MIN_LENGTH = 16
+
+# Logical record segment attribute bits
+_SEG_EXPLICIT = 0x80
+_SEG_PREDECESSOR = 0x40
+_SEG_ENCRYPTED = 0x10
+
+# Logical record types of interest
+_EFLR_FILE_HEADER = 0
+_EFLR_FRAME = 4
+_IFLR_FDATA = 0
+
+# FDATA bodies start with the OBNAME of their frame: origin (up to 4 bytes), copy (1 byte),
+# identifier length (1 byte) and identifier (up to 255 bytes)
+_OBNAME_MAX_BYTES = 4 + 1 + 1 + 255
+
+# Trailing padding is checked in chunks rather than read at once
+_PADDING_CHUNK_BYTES = 64 * 1024
+
+# LAS header parsing
+_LAS_HEAD_BYTES = 64 * 1024
+_LAS_MAX_HEADER_BYTES = 4 * 1024 * 1024
+_LAS_SAMPLE_BYTES = 64 * 1024
+_LAS_HEADER_LINE = re.compile(r"^\s*([^.\s]+)\s*\.(\S*)\s+(.*?)\s*:")
+_UTF8_BOM = b"\xef\xbb\xbf"
+
+
+def _strip_bom(data):
+    # Checked on the raw bytes: decoded as latin-1 the UTF-8 BOM is three characters
+    return data[len(_UTF8_BOM):] if data.startswith(_UTF8_BOM) else data
+
+
+class WellLogSniffer:
+    """
+    Identifies LAS and DLIS files from their header bytes and reports basic structure.
+    """
+
+    @classmethod
+    def detect_format(cls, header):
+        """
+        Detects the format from the first bytes of a file.
+
+        Args:
+            header (bytes): Leading bytes of the file (256 bytes are enough).
+
+        Returns:
+            WellLogFormat: LAS, DLIS or UNKNOWN.
+        """
+        if cls._looks_like_las(header):
+            return WellLogFormat.LAS
+        if cls._looks_like_dlis(header):
+            return WellLogFormat.DLIS
+        return WellLogFormat.UNKNOWN
+
+    @classmethod
+    def sniff(cls, filepath, cost_model=None, max_scan_bytes=None):
+        """
+        Sniffs a file and returns a report describing its format and structure.
+
+        Args:
+            filepath (str or Path): Path to the file.
+            cost_model (CostModel, optional): Model used to attach a runtime/memory estimate.
+            max_scan_bytes (int, optional): Upper bound of bytes walked in the DLIS envelope scan.
+                Counts are extrapolated when the scan stops early. None scans the whole envelope.
+
+        Returns:
+            dict: Sniff report. `valid` is False when the file should not be enqueued.
+        """
+        report = {
+            "format": WellLogFormat.UNKNOWN.value,
+            "valid": False,
+            "file_size": 0,
+            "errors": [],
+        }
+
+        try:
+            report["file_size"] = os.path.getsize(filepath)
+            with open(filepath, "rb") as file:
+                header = file.read(256)
+
+            file_format = cls.detect_format(header)
+            report["format"] = file_format.value
+
+            if file_format == WellLogFormat.LAS:
+                report.update(cls._sniff_las(filepath, report["file_size"]))
+            elif file_format == WellLogFormat.DLIS:
+                report.update(cls._sniff_dlis(filepath, report["file_size"], max_scan_bytes))
+            else:
+                report["errors"].append("Not a LAS or DLIS file")
+        except Exception as e:
+            report["valid"] = False
+            report["errors"].append(f"Error sniffing file: {e}")
+
+        if cost_model is not None and report["valid"]:
+            report["estimate"] = cost_model.estimate(report["format"], report["file_size"],
+                                                     report.get("estimated_values", 0))
+
+        return report
+
+    # ------------------------------------------------------------------ LAS
+
+    @staticmethod
+    def _looks_like_las(header):
+        text = _strip_bom(header).decode("ascii", errors="ignore")
+        for line in text.splitlines():
+            stripped = line.strip()
+            if not stripped or stripped.startswith("#"):
+                continue
+            return stripped.upper().startswith("~V")
+        return False
+
+    @classmethod
+    def _sniff_las(cls, filepath, file_size):
+        """
+        Parses the LAS header sections and samples the ~A section to estimate the row count.
+        """
+        result = {
+            "version": None,
+            "wrap": None,
+            "curve_count": 0,
+            "estimated_rows": 0,
+            "estimated_values": 0,
+        }
+        errors = []
+
+        section = None
+        data_offset = None
+        offset = 0
+
+        with open(filepath, "rb") as file:
+            for raw_line in file:
+                line = _strip_bom(raw_line).decode("latin-1")
+                line_offset = offset
+                offset += len(raw_line)
+
+                stripped = line.strip()
+                if not stripped or stripped.startswith("#"):
+                    continue
+
+                if stripped.startswith("~"):
+                    section = stripped[1:2].upper()
+                    if section == "A":
+                        data_offset = offset
+                        break
+                    continue
+
+                if section == "V":
+                    match = _LAS_HEADER_LINE.match(line)
+                    if match:
+                        mnemonic, value = match.group(1).upper(), match.group(3).strip()
+                        if mnemonic == "VERS":
+                            result["version"] = value
+                        elif mnemonic == "WRAP":
+                            result["wrap"] = value.upper() in ("YES", "Y", "TRUE")
+                elif section == "C":
+                    result["curve_count"] += 1
+
+                if line_offset > _LAS_MAX_HEADER_BYTES:
+                    errors.append(f"No ~A section within the first {_LAS_MAX_HEADER_BYTES} bytes")
+                    break
+
+            if data_offset is not None and result["curve_count"]:
+                rows, values = cls._estimate_las_rows(file, data_offset, file_size, result["curve_count"])
+                result["estimated_rows"] = rows
+                result["estimated_values"] = values
+
+        if result["version"] is None:
+            errors.append("Missing VERS in ~V section")
+        if result["curve_count"] == 0:
+            errors.append("No curves defined in ~C section")
+        if data_offset is None and not errors:
+            errors.append("Missing ~A section")
+
+        result["valid"] = not errors
+        result["errors"] = errors
+        return result
+
+    @staticmethod
+    def _estimate_las_rows(file, data_offset, file_size, curve_count):
+        """
+        Counts values in a sample of the ~A section and extrapolates to the remaining bytes.
+        Works for wrapped and unwrapped files since rows are derived from values per curve.
+        """
+        file.seek(data_offset)
+        sample = file.read(_LAS_SAMPLE_BYTES)
+        data_bytes = file_size - data_offset
+
+        if not sample:
+            return 0, 0
+
+        # Drop the trailing partial line so only complete lines are counted
+        if len(sample) < data_bytes:
+            cut = sample.rfind(b"\n")
+            if cut > 0:
+                sample = sample[:cut + 1]
+
+        sampled_values = len(sample.split())
+        values = sampled_values if len(sample) >= data_bytes else int(sampled_values * data_bytes / len(sample))
+        return values // curve_count, values
+
+    # ----------------------------------------------------------------- DLIS
+
+    @staticmethod
+    def _parse_sul(header):
+        """
+        Parses a storage unit label at the start of the header. Returns None if there is none.
+        """
+        if len(header) < _SUL_LENGTH:
+            return None
+
+        version = header[4:9].decode("ascii", errors="replace")
+        structure = header[9:15].decode("ascii", errors="replace")
+        if not version.startswith("V1.") or structure != "RECORD":
+            return None
+
+        max_record_length = header[15:20].decode("ascii", errors="replace").strip()
+        return {
+            "sequence_number": header[0:4].decode("ascii", errors="replace").strip(),
+            "version": version,
+            "structure": structure,
+            "max_record_length": int(max_record_length) if max_record_length.isdigit() else None,
+            "storage_set_identifier": header[20:80].decode("ascii", errors="replace").strip(),
+        }
+
+    @staticmethod
+    def _is_visible_record_header(data):
+        if len(data) < _VR_HEADER.size:
+            return False
+        length, pad, version = _VR_HEADER.unpack_from(data)
+        return pad == 0xFF and version == 0x01 and length >= _VR_MIN_LENGTH
+
+    @classmethod
+    def _looks_like_dlis(cls, header):
+        if cls._parse_sul(header) is not None:
+            return True
+        # Tape image format wraps the SUL in a 12 byte marker
+        if cls._parse_sul(header[_TIF_MARKER_LENGTH:]) is not None:
+            return True
+        # Files without a SUL start directly with a visible record
+        return cls._is_visible_record_header(header)
+
+    @classmethod
+    def _sniff_dlis(cls, filepath, file_size, max_scan_bytes):
+        """
+        Validates the SUL and walks the visible record envelope, counting logical files (FILE-HEADER
+        records), FRAME sets and the distinct frames that carry FDATA.
+        """
+        result = {
+            "sul": None,
+            "tape_image": False,
+            "visible_record_count": 0,
+            "logical_file_count": 0,
+            "frame_set_count": 0,
+            "frame_count": 0,
+            "fdata_record_count": 0,
+            "estimated_values": 0,
+            "truncated": False,
+        }
+        errors = []
+
+        with open(filepath, "rb", buffering=64 * 1024) as file:
+            header = file.read(_SUL_LENGTH + _TIF_MARKER_LENGTH)
+
+            result["sul"] = cls._parse_sul(header)
+            if result["sul"] is not None:
+                offset = _SUL_LENGTH
+            elif cls._parse_sul(header[_TIF_MARKER_LENGTH:]) is not None:
+                result["sul"] = cls._parse_sul(header[_TIF_MARKER_LENGTH:])
+                result["tape_image"] = True
+            else:
+                offset = 0
+
+            if result["tape_image"]:
+                # Tape image markers interleave with visible records; only the SUL is validated
+                result["valid"] = True
+                result["errors"] = errors
+                result["logical_file_count"] = None
+                result["frame_count"] = None
+                result["estimated_values"] = file_size // 4
+                return result
+
+            frames = set()
+            fdata_bytes = 0
+            scan_limit = file_size if max_scan_bytes is None else min(file_size, offset + max_scan_bytes)
+
+            while offset < scan_limit:
+                file.seek(offset)
+                vr_header = file.read(_VR_HEADER.size)
+
+                if len(vr_header) < _VR_HEADER.size or not any(vr_header):
+                    # Trailing padding at the end of the file is tolerated
+                    if not cls._is_zero_padding(file):
+                        errors.append(f"Unexpected trailing bytes at offset {offset}")
+                    offset = file_size
+                    break
+
+                if not cls._is_visible_record_header(vr_header):
+                    errors.append(f"Invalid visible record header at offset {offset}")
+                    break
+
+                vr_length = _VR_HEADER.unpack(vr_header)[0]
+                if offset + vr_length > file_size:
+                    errors.append(f"Visible record at offset {offset} extends past the end of the file")
+                    break
+
+                result["visible_record_count"] += 1
+                segment_offset = offset + _VR_HEADER.size
+                vr_end = offset + vr_length
+
+                while segment_offset < vr_end:
+                    file.seek(segment_offset)
+                    lrsh = file.read(_LRSH.size)
+                    if len(lrsh) < _LRSH.size:
+                        errors.append(f"Truncated segment header at offset {segment_offset}")
+                        break
+
+                    segment_length, attributes, record_type = _LRSH.unpack(lrsh)
+                    if segment_length < _LRS_MIN_LENGTH or segment_offset + segment_length > vr_end:
+                        errors.append(f"Invalid segment length {segment_length} at offset {segment_offset}")
+                        break
+
+                    first_segment = not attributes & _SEG_PREDECESSOR
+                    explicit = attributes & _SEG_EXPLICIT
+
+                    if first_segment and explicit:
+                        if record_type == _EFLR_FILE_HEADER:
+                            result["logical_file_count"] += 1
+                            result["frame_count"] += len(frames)
+                            frames = set()
+                        elif record_type == _EFLR_FRAME:
+                            result["frame_set_count"] += 1
+                    elif not explicit and record_type == _IFLR_FDATA:
+                        fdata_bytes += segment_length - _LRSH.size
+                        if first_segment:
+                            result["fdata_record_count"] += 1
+                            if not attributes & _SEG_ENCRYPTED:
+                                frame_name = cls._read_obname(
+                                    file.read(min(segment_length - _LRSH.size, _OBNAME_MAX_BYTES)))
+                                if frame_name is not None:
+                                    frames.add(frame_name)
+
+                    segment_offset += segment_length
+
+                if errors:
+                    break
+                offset = vr_end
+
+            result["frame_count"] += len(frames)
+
+            if not errors and offset < file_size:
+                # Scan stopped at max_scan_bytes: extrapolate the data volume
+                result["truncated"] = True
+                scale = file_size / max(offset, 1)
+                result["fdata_record_count"] = int(result["fdata_record_count"] * scale)
+                fdata_bytes = int(fdata_bytes * scale)
+
+        if result["visible_record_count"] == 0 and not errors:
+            errors.append("No visible records found")
+        if result["logical_file_count"] == 0 and not errors and not result["truncated"]:
+            errors.append("No logical files (FILE-HEADER records) found")
+
+        # FDATA bodies are dominated by 4 byte samples
+        result["estimated_values"] = fdata_bytes // 4
+        result["valid"] = not errors
+        result["errors"] = errors
+        return result
+
+    @staticmethod
+    def _is_zero_padding(file):
+        """
+        Checks that the rest of the file from the current position holds only zero bytes.
+        """
+        while True:
+            chunk = file.read(_PADDING_CHUNK_BYTES)
+            if not chunk:
+                return True
+            if chunk.count(0) != len(chunk):
+                return False
+
+    @staticmethod
+    def _read_obname(body):
+        """
+        Reads the OBNAME (origin, copy, identifier) that starts every FDATA record body.
+        """
+        try:
+            first = body[0]
+            if first & 0x80 == 0:
+                origin, position = first, 1
+            elif first & 0xC0 == 0x80:
+                origin, position = ((first & 0x3F) << 8) | body[1], 2
+            else:
+                origin, position = struct.unpack(">I", body[0:4])[0] & 0x3FFFFFFF, 4
+
+            copy = body[position]
+            length = body[position + 1]
+            identifier = body[position + 2:position + 2 + length].decode("ascii", errors="replace")
+            return origin, copy, identifier
+        except (IndexError, struct.error):
+            return None
@@ -0,0 +1,124 @@
+"""
+    Offloading of large array channels (waveforms, images) to binary blob files.
+
+    Array channels with at least `min_elements` elements per sample are moved out of the JSON
+    records, which keep a reference in the curve definition:
+    |_"layout": "blob"
+    |_"blob": {"file", "format", "dtype", "shape", "offset", "length"}
+
+    `offset` is the byte position of the first value and `length` the number of bytes, so any
+    channel can be opened without a copy with `np.memmap(file, dtype, "r", offset, shape)`.
+    Values are stored little-endian and row-major. Two formats are written:
+    |_npy    one {name}.frameNNNNN.{curve}.npy file per channel, also readable with `np.load`
+    |_raw    a single {name}.blobs.bin file with every channel, each aligned to 64 bytes
+"""
+import re
+import numpy as np
+from pathlib import Path
+
+BLOB_FORMAT_NPY = "npy"
+BLOB_FORMAT_RAW = "raw"
+BLOB_LAYOUT = "blob"
+
+RAW_BLOB_SUFFIX = ".blobs.bin"
+_RAW_ALIGNMENT = 64
+_UNSAFE_CHARACTERS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def _little_endian(values):
+    dtype = values.dtype.newbyteorder("<") if values.dtype.byteorder == ">" else values.dtype
+    return np.ascontiguousarray(values, dtype=dtype)
+
+
+def _npy_blob_name(base_name, frame_index, curve_name):
+    return f"{base_name}.frame{frame_index:05d}.{_UNSAFE_CHARACTERS.sub('_', str(curve_name))}.npy"
+
+
+def offload_array_channels(records, output_folder, base_name, min_elements, blob_format, logger):
+    """
+    Moves the flattened array channels of the records with at least `min_elements` elements per
+    sample to blob files, replacing them with references in their curve definitions.
+
+    Args:
+        records (list): Records produced by a scanner; modified in place.
+        output_folder (Path): Folder of the JSON output, where the blobs are written.
+        base_name (str): Output name without extension, e.g. `{stem}{logical_file_id}`.
+        min_elements (int): Elements per sample from which a channel is offloaded.
+        blob_format (str): `npy` or `raw`.
+        logger: Logger instance.
+
+    Returns:
+        list: Paths of the blob files written.
+    """
+    if blob_format not in (BLOB_FORMAT_NPY, BLOB_FORMAT_RAW):
+        raise ValueError(f"Unknown blob format: {blob_format}")
+
+    output_folder = Path(output_folder)
+    raw_path = output_folder / f"{base_name}{RAW_BLOB_SUFFIX}"
+    raw_file = None
+    blob_paths = []
+
+    try:
+        for frame_index, record in enumerate(records):
+            arrays = record.get("arrays")
+            if not arrays:
+                continue
+
+            for curve in record.get("curves", []):
+                values = arrays.get(curve.get("name"))
+                if values is None or "shape" not in curve or curve.get("dimensions", 1) < min_elements:
+                    continue
+                values = np.asarray(values)
+                if values.dtype.kind not in "biuf":
+                    continue  # Only numeric channels have a fixed size binary layout
+                values = _little_endian(values)
+
+                if blob_format == BLOB_FORMAT_NPY:
+                    blob_path = output_folder / _npy_blob_name(base_name, frame_index, curve["name"])
+                    np.save(blob_path, values.reshape(curve["shape"]))
+                    offset = blob_path.stat().st_size - values.nbytes  # Data follows the .npy header
+                    blob_paths.append(blob_path)
+                else:
+                    if raw_file is None:
+                        raw_file = open(raw_path, "wb")
+                        blob_paths.append(raw_path)
+                    raw_file.write(b"\0" * (-raw_file.tell() % _RAW_ALIGNMENT))
+                    offset = raw_file.tell()
+                    raw_file.write(values.tobytes())
+                    blob_path = raw_path
+
+                curve["layout"] = BLOB_LAYOUT
+                curve["blob"] = {
+                    "file": blob_path.name,
+                    "format": blob_format,
+                    "dtype": values.dtype.str,
+                    "shape": curve["shape"],
+                    "offset": offset,
+                    "length": values.nbytes,
+                }
+                del arrays[curve["name"]]
+                logger.info(f"Offloaded channel {curve['name']} of frame {frame_index} to {blob_path.name}")
+
+            if not arrays:
+                del record["arrays"]
+    finally:
+        if raw_file is not None:
+            raw_file.close()
+
+    return blob_paths
+
+
+def load_blob(json_path, curve):
+    """
+    Opens the blob of an offloaded curve as a read-only memory map.
+
+    Args:
+        json_path (str or Path): JSON output (or part) holding the curve definition.
+        curve (dict): Curve definition with a `blob` reference.
+
+    Returns:
+        np.memmap: Values with shape `[rows, *dimensions]`.
+    """
+    blob = curve["blob"]
+    return np.memmap(Path(json_path).parent / blob["file"], dtype=np.dtype(blob["dtype"]), mode="r",
+                     offset=blob["offset"], shape=tuple(blob["shape"]))
@@ -0,0 +1,364 @@
+"""
+    Lease-based claiming of input files, so watchers and workers on several nodes can share one
+    uploads folder and every file is converted by exactly one node.
+
+    The protocol only needs a shared filesystem with atomic exclusive create and rename (local
+    filesystems, NFSv3+, SMB). For each input file, identified by its path relative to the
+    uploads folder, size and modification time, the claims folder holds:
+    |_{key}.claim          the lease: created with O_CREAT | O_EXCL by the node that wins the file,
+    |                      with the node ID and the conversion units (logical files) it submitted.
+    |                      Its owner touches it every HEARTBEAT_SECONDS.
+    |_{key}.{unit}.unit    written by the worker when a unit finished, whatever its status
+    |_{key}.done           written when every unit finished; the claim is then removed
+    Done markers, and unit files left by claims that were taken over, are removed after
+    DONE_TTL_SECONDS by the watcher's retention policy.
+
+    A claim not touched for LEASE_SECONDS belongs to a dead node. Any node can take it over by
+    renaming it away (only one rename succeeds) and creating a new claim, after which the file
+    is converted again. Conversions are idempotent, so a file is processed at least once and,
+    as long as its node lives, exactly once.
+"""
+import hashlib
+import os
+import socket
+import threading
+import time
+import uuid
+import orjson
+from pathlib import Path
+from utils.env import env_bool, env_int, env_str
+
+CLAIMS_CONFIG = {
+    "ENABLED": env_bool("CLAIMS_ENABLED", False),
+    # Must be on the volume shared by all nodes
+    "FOLDER": Path(env_str("CLAIMS_FOLDER", str(Path(__file__).resolve().parent.parent / "uploads" / ".claims"))),
+    # Must be unique per node
+    "NODE_ID": env_str("NODE_ID", socket.gethostname()),
+    "LEASE_SECONDS": env_int("CLAIM_LEASE_SECONDS", 300),
+    "HEARTBEAT_SECONDS": env_int("CLAIM_HEARTBEAT_SECONDS", 60),
+    # Done markers older than this are removed; a file still in the uploads folder after that is
+    # converted again if it is reported again (0 keeps them)
+    "DONE_TTL_SECONDS": env_int("CLAIM_DONE_TTL_SECONDS", 30 * 24 * 3600),
+}
+
+CLAIM_SUFFIX = ".claim"
+DONE_SUFFIX = ".done"
+UNIT_SUFFIX = ".unit"
+
+# Unit of a file converted as a whole (LAS); DLIS files have one unit per logical file and
+# archives one per member (and logical file)
+FILE_UNIT = "file"
+
+FREE = "free"
+HELD = "held"
+DONE = "done"
+
+
+def claim_key(filepath, root=None):
+    """
+    Identifies an input file by its path relative to `root`, size and modification time, which are
+    the same on every node mounting the shared volume (wherever it is mounted); a replaced file
+    gets a new key. Without `root`, or for files outside it, the file name is used instead.
+    """
+    stat = os.stat(filepath)
+    name = Path(filepath).name
+    if root is not None:
+        try:
+            name = Path(filepath).resolve().relative_to(Path(root).resolve()).as_posix()
+        except ValueError:
+            pass
+    fingerprint = f"{name}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.blake2b(fingerprint.encode(), digest_size=16).hexdigest()
+
+
+def conversion_unit(logical_file_id=None, archive_member=None):
+    """
+    Names a conversion unit: a DLIS logical file or a whole LAS file, prefixed by the archive
+    member holding it for inputs read from archives.
+    """
+    unit = str(logical_file_id) if logical_file_id else FILE_UNIT
+    return f"{archive_member}:{unit}" if archive_member else unit
+
+
+def _unit_name(key, unit):
+    return f"{key}.{hashlib.blake2b(str(unit).encode(), digest_size=8).hexdigest()}{UNIT_SUFFIX}"
+
+
+def _create_exclusive(path, data=b""):
+    """
+    Creates `path` only if it does not exist. Returns False if it already exists.
+    """
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+    except FileExistsError:
+        return False
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+    return True
+
+
+def _read_claim(path):
+    try:
+        with open(path, "rb") as file:
+            return orjson.loads(file.read())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+
+def _remove(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def finish_claim(folder, key):
+    """
+    Marks a file as converted and releases its claim.
+    """
+    folder = Path(folder)
+    _create_exclusive(folder / f"{key}{DONE_SUFFIX}")
+    _remove(folder / f"{key}{CLAIM_SUFFIX}")
+    for unit_path in folder.glob(f"{key}.*{UNIT_SUFFIX}"):
+        _remove(unit_path)
+
+
+def complete_unit(key, unit, logger, folder=None):
+    """
+    Records that a conversion unit of a claimed file finished. The worker finishing the last
+    unit marks the file as done.
+
+    Args:
+        key (str): Claim key passed with the task.
+        unit (str): Unit name returned by `conversion_unit`.
+        logger: Logger instance.
+        folder (str or Path, optional): Claims folder (default: CLAIMS_FOLDER).
+    """
+    folder = Path(folder or CLAIMS_CONFIG["FOLDER"])
+    try:
+        (folder / _unit_name(key, unit)).touch()
+
+        claim = _read_claim(folder / f"{key}{CLAIM_SUFFIX}")
+        if claim is None or claim.get("units") is None:
+            return  # Reclaimed by another node, or the units are not recorded yet
+        if all((folder / _unit_name(key, pending)).exists() for pending in claim["units"]):
+            finish_claim(folder, key)
+            logger.info(f"All units of claimed file {claim.get('file')} finished")
+    except OSError as e:
+        logger.error(f"Error completing claim {key} unit {unit}: {e}")
+
+
+class ClaimManager:
+    """
+    Claims input files for this node and keeps its leases alive from a heartbeat thread.
+    """
+
+    def __init__(self, folder, node_id, lease_seconds, heartbeat_seconds, logger, root=None):
+        """
+        Initialize the ClaimManager.
+
+        Args:
+            folder (str or Path): Claims folder on the shared volume.
+            node_id (str): Unique ID of this node.
+            lease_seconds (int): Age after which a claim that is not touched is considered dead.
+            heartbeat_seconds (int): Interval between lease renewals; well below `lease_seconds`.
+            logger: Logger instance.
+            root (str or Path, optional): Uploads folder; claim keys use paths relative to it.
+        """
+        self._folder = Path(folder)
+        self._root = root
+        self._folder.mkdir(parents=True, exist_ok=True)
+        self._node_id = node_id
+        self._lease_seconds = lease_seconds
+        self._heartbeat_seconds = heartbeat_seconds
+        self._logger = logger
+        self._held = {}  # key -> claim path
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _claim_path(self, key):
+        return self._folder / f"{key}{CLAIM_SUFFIX}"
+
+    def _claim_data(self, filepath, units=None):
+        return orjson.dumps({"node": self._node_id, "file": Path(filepath).name,
+                             "claimed_at": time.time(), "units": units})
+
+    def _is_stale(self, path):
+        try:
+            return time.time() - os.stat(path).st_mtime > self._lease_seconds
+        except FileNotFoundError:
+            return False
+
+    def status(self, filepath):
+        """
+        Returns `done` when the file was converted, `held` while a live claim exists and `free`
+        when it can be claimed (no claim, or one whose lease expired).
+        """
+        key = claim_key(filepath, self._root)
+        if (self._folder / f"{key}{DONE_SUFFIX}").exists():
+            return DONE
+        claim_path = self._claim_path(key)
+        if claim_path.exists() and not self._is_stale(claim_path):
+            return HELD
+        return FREE
+
+    def try_claim(self, filepath):
+        """
+        Claims a file for this node, taking over an expired claim.
+
+        Returns:
+            str: The claim key, or None if the file is done or held by a live claim.
+        """
+        key = claim_key(filepath, self._root)
+        if (self._folder / f"{key}{DONE_SUFFIX}").exists():
+            return None
+        claim_path = self._claim_path(key)
+
+        if not _create_exclusive(claim_path, self._claim_data(filepath)):
+            if not self._is_stale(claim_path) or not self._take_over(claim_path, filepath):
+                return None
+            # Units finished for the previous owner are converted again
+            for unit_path in self._folder.glob(f"{key}.*{UNIT_SUFFIX}"):
+                _remove(unit_path)
+            if not _create_exclusive(claim_path, self._claim_data(filepath)):
+                return None
+
+        with self._lock:
+            self._held[key] = claim_path
+        return key
+
+    def _take_over(self, claim_path, filepath):
+        """
+        Moves an expired claim out of the way. Only one node's rename succeeds; if the claim was
+        renewed or replaced between the check and the rename, it is put back.
+        """
+        moved_path = claim_path.with_name(f"{claim_path.name}.{self._node_id}.{uuid.uuid4().hex}")
+        try:
+            os.rename(claim_path, moved_path)
+        except FileNotFoundError:
+            return False
+
+        try:
+            previous = _read_claim(moved_path) or {}
+            if not self._is_stale(moved_path):
+                try:
+                    os.link(moved_path, claim_path)  # Fails if a new claim exists meanwhile
+                except OSError:
+                    pass
+                return False
+            self._logger.warning(f"Reclaiming {filepath} from node {previous.get('node')}: "
+                                 f"lease expired after {self._lease_seconds}s")
+            return True
+        finally:
+            _remove(moved_path)
+
+    def set_units(self, key, filepath, units):
+        """
+        Records the conversion units submitted for a claimed file, before their tasks are sent.
+        A file without units is done right away.
+        """
+        if not units:
+            self.finish(key)
+            return
+        claim_path = self._claim_path(key)
+        tmp_path = claim_path.with_name(f"{claim_path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(self._claim_data(filepath, units=[str(unit) for unit in units]))
+        os.replace(tmp_path, claim_path)
+
+    def finish(self, key):
+        """
+        Marks a claimed file as done, e.g. when it was rejected before any conversion.
+        """
+        finish_claim(self._folder, key)
+        with self._lock:
+            self._held.pop(key, None)
+
+    def adopt(self):
+        """
+        Takes back the claims of this node left by a previous watcher run, whose tasks may still
+        be waiting in this node's broker.
+        """
+        for claim_path in self._folder.glob(f"*{CLAIM_SUFFIX}"):
+            claim = _read_claim(claim_path)
+            if claim and claim.get("node") == self._node_id:
+                with self._lock:
+                    self._held[claim_path.name[:-len(CLAIM_SUFFIX)]] = claim_path
+        if self._held:
+            self._logger.info(f"Adopted {len(self._held)} claims of node {self._node_id}")
+
+    def heartbeat(self):
+        """
+        Renews the leases of this node's claims and forgets the finished ones.
+        """
+        with self._lock:
+            held = list(self._held.items())
+        for key, claim_path in held:
+            try:
+                claim = _read_claim(claim_path)
+                if claim is None or claim.get("node") != self._node_id:
+                    raise FileNotFoundError(claim_path)
+                os.utime(claim_path)
+            except OSError:
+                # Finished, or taken over after a missed heartbeat
+                with self._lock:
+                    self._held.pop(key, None)
+
+    def purge(self, ttl_seconds):
+        """
+        Removes done markers older than `ttl_seconds`, and unit files as old whose claim is gone
+        (the claim was taken over, or its node died before the units were recorded).
+
+        Returns:
+            int: Number of files removed.
+        """
+        if ttl_seconds <= 0:
+            return 0
+        cutoff = time.time() - ttl_seconds
+        removed = 0
+        for path in list(self._folder.glob(f"*{DONE_SUFFIX}")) + list(self._folder.glob(f"*{UNIT_SUFFIX}")):
+            try:
+                if os.stat(path).st_mtime >= cutoff:
+                    continue
+                if path.name.endswith(UNIT_SUFFIX) and self._claim_path(path.name.split(".", 1)[0]).exists():
+                    continue
+                _remove(path)
+                removed += 1
+            except FileNotFoundError:
+                continue  # Removed by another node
+        if removed:
+            self._logger.info(f"Removed {removed} expired done and unit files from {self._folder}")
+        return removed
+
+    def _heartbeat_periodically(self):
+        while True:
+            time.sleep(self._heartbeat_seconds)
+            try:
+                self.heartbeat()
+            except Exception as e:
+                self._logger.error(f"Error renewing claims: {e}")
+
+    def start_heartbeat(self):
+        """
+        Renews the leases from a daemon thread, so long waits in the watcher loop never let them expire.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._heartbeat_periodically, name="claims-heartbeat", daemon=True)
+            self._thread.start()
+        return self
+
+
+def create_claim_manager(logger, root=None):
+    """
+    Returns the ClaimManager configured by CLAIMS_CONFIG, or None when claims are disabled.
+
+    Args:
+        logger: Logger instance.
+        root (str or Path, optional): Uploads folder; claim keys use paths relative to it.
+    """
+    if not CLAIMS_CONFIG["ENABLED"]:
+        return None
+    return ClaimManager(CLAIMS_CONFIG["FOLDER"], node_id=CLAIMS_CONFIG["NODE_ID"],
+                        lease_seconds=CLAIMS_CONFIG["LEASE_SECONDS"],
+                        heartbeat_seconds=CLAIMS_CONFIG["HEARTBEAT_SECONDS"], logger=logger, root=root)
@@ -0,0 +1,474 @@
+"""
+    Reading of well logs delivered inside compressed files and archives, without unpacking them
+    into the upload folder.
+
+    Containers are recognised by their magic bytes, whatever their name:
+    |_zip               one member per LAS / DLIS file in the archive
+    |_tar, tar.gz       (also tar.zst) one member per regular file
+    |_gz, zst           a single compressed file (e.g. `.las.gz`, `.dlis.zst`), whose member is the
+                        file name without the compression suffix
+
+    A container is read in one pass, decompressing every member once (see `iter_member_streams`).
+    LAS members are decompressed as a stream straight into the parser; lasio seeks back once,
+    which rewinds the decompressor, and members of streams that cannot seek (tar.zst, zst) are
+    spooled in memory first. DLIS members need random access, so they are decompressed to a
+    temporary file in MEMBER_TEMP_FOLDER that is removed after the conversion.
+    MEMBER_TEMP_FOLDER is the system temp folder by default; it can point to a RAM-backed tmpfs
+    such as /dev/shm, in which case members that do not fit (checked against their uncompressed
+    size, or on ENOSPC when several tasks fill it at once) continue in the system temp folder.
+
+    The `zstandard` package is only needed for zstd containers and is imported on first use.
+"""
+import errno
+import gzip
+import io
+import os
+import struct
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path, PurePosixPath
+from utils.env import env_str
+
+CONTAINERS_CONFIG = {
+    # Where DLIS members are decompressed; members larger than its free space use the system temp folder
+    "MEMBER_TEMP_FOLDER": env_str("MEMBER_TEMP_FOLDER", tempfile.gettempdir()),
+}
+
+CONTAINER_ZIP = "zip"
+CONTAINER_TAR = "tar"
+CONTAINER_TAR_ZSTD = "tar.zst"
+CONTAINER_GZIP = "gz"
+CONTAINER_ZSTD = "zst"
+
+_ZIP_MAGIC = (b"PK\x03\x04", b"PK\x05\x06")
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_TAR_MAGIC_OFFSET = 257
+_TAR_MAGIC = b"ustar"
+
+# Longest suffixes first, so `x.tar.gz` loses `.tar.gz` and not only `.gz`
+_CONTAINER_SUFFIXES = (".tar.gz", ".tar.zst", ".tgz", ".tzst", ".tar", ".zip", ".gz", ".zst", ".zstd")
+
+# Members of non-seekable streams held in memory up to this size before spilling to MEMBER_TEMP_FOLDER
+_SPOOL_MAX_BYTES = 64 * 1024 * 1024
+_COPY_BUFFER_BYTES = 1024 * 1024
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("Reading .zst inputs requires the zstandard package (pip install zstandard)") from e
+    return zstandard
+
+
+def _is_tar(header):
+    return header[_TAR_MAGIC_OFFSET:_TAR_MAGIC_OFFSET + len(_TAR_MAGIC)] == _TAR_MAGIC
+
+
+def _zstd_reader(file):
+    return _zstandard().ZstdDecompressor().stream_reader(file, read_across_frames=True)
+
+
+def _gzip_size(filepath):
+    """
+    Estimates the uncompressed size of a gzip file from its ISIZE trailer, which holds the size
+    modulo 4 GiB (of the last member only, for concatenated gzip files).
+    """
+    compressed_size = os.path.getsize(filepath)
+    with open(filepath, "rb") as file:
+        file.seek(-4, os.SEEK_END)
+        size = struct.unpack("<I", file.read(4))[0]
+    # Well logs compress well: a trailer far below the compressed size wrapped around 4 GiB
+    while size + (1 << 20) < compressed_size:
+        size += 1 << 32
+    return size
+
+
+def _zstd_size(filepath):
+    """
+    Returns the uncompressed size recorded in the first zstd frame header, or None if it is not recorded.
+    """
+    with open(filepath, "rb") as file:
+        header = file.read(18)  # Longest frame header
+    try:
+        size = _zstandard().frame_content_size(header)
+    except _zstandard().ZstdError:
+        return None
+    return size if size >= 0 else None
+
+
+def container_type(filepath):
+    """
+    Identifies a container from its magic bytes.
+
+    Args:
+        filepath (str or Path): File to inspect.
+
+    Returns:
+        str: `zip`, `tar` (plain or gzip-compressed), `tar.zst`, `gz` or `zst`, or None for any
+        other file.
+    """
+    with open(filepath, "rb") as file:
+        header = file.read(_TAR_MAGIC_OFFSET + len(_TAR_MAGIC))
+
+    if header.startswith(_ZIP_MAGIC):
+        return CONTAINER_ZIP
+    if _is_tar(header):
+        return CONTAINER_TAR
+    if header.startswith(_GZIP_MAGIC):
+        with gzip.open(filepath, "rb") as file:
+            return CONTAINER_TAR if _is_tar(file.read(512)) else CONTAINER_GZIP
+    if header.startswith(_ZSTD_MAGIC):
+        with open(filepath, "rb") as file, _zstd_reader(file) as reader:
+            return CONTAINER_TAR_ZSTD if _is_tar(reader.read(512)) else CONTAINER_ZSTD
+    return None
+
+
+def container_stem(filepath):
+    """
+    Returns the name of a container without its container suffixes, e.g. `run1` for `run1.tar.gz`.
+    """
+    name = Path(filepath).name
+    for suffix in _CONTAINER_SUFFIXES:
+        if name.lower().endswith(suffix) and len(name) > len(suffix):
+            return name[:-len(suffix)]
+    return Path(name).stem
+
+
+def _is_member(name):
+    # Directories, hidden files and macOS resource forks are not inputs
+    parts = PurePosixPath(name).parts
+    return bool(parts) and not name.endswith("/") and parts[0] != "__MACOSX" \
+        and not any(part.startswith(".") for part in parts)
+
+
+def list_members(filepath):
+    """
+    Lists the members of a container.
+
+    Args:
+        filepath (str or Path): Container file.
+
+    Returns:
+        list: `(member name, uncompressed size or None)` tuples, in archive order.
+    """
+    kind = container_type(filepath)
+    if kind == CONTAINER_ZIP:
+        with zipfile.ZipFile(filepath) as archive:
+            return [(info.filename, info.file_size) for info in archive.infolist()
+                    if not info.is_dir() and _is_member(info.filename)]
+    if kind in (CONTAINER_TAR, CONTAINER_TAR_ZSTD):
+        with _open_tar(filepath, kind) as archive:
+            return [(info.name, info.size) for info in archive if info.isfile() and _is_member(info.name)]
+    if kind in (CONTAINER_GZIP, CONTAINER_ZSTD):
+        return [(container_stem(filepath), None)]
+    raise ValueError(f"Not a container: {filepath}")
+
+
+@contextmanager
+def _open_tar(filepath, kind):
+    if kind == CONTAINER_TAR:
+        # Random access mode, so member streams can seek
+        with tarfile.open(filepath, "r:*") as archive:
+            yield archive
+    else:
+        with open(filepath, "rb") as file, _zstd_reader(file) as reader, \
+                tarfile.open(fileobj=reader, mode="r|") as archive:
+            yield archive
+
+
+@contextmanager
+def open_member(filepath, member):
+    """
+    Opens a member of a container as a binary stream, decompressed as it is read.
+
+    Args:
+        filepath (str or Path): Container file.
+        member (str): Member name, as returned by `list_members`.
+
+    Yields:
+        tuple: (binary file-like object, uncompressed size or None)
+    """
+    kind = container_type(filepath)
+    if kind == CONTAINER_ZIP:
+        with zipfile.ZipFile(filepath) as archive, archive.open(member) as stream:
+            yield stream, archive.getinfo(member).file_size
+    elif kind in (CONTAINER_TAR, CONTAINER_TAR_ZSTD):
+        with _open_tar(filepath, kind) as archive:
+            # Stream mode archives can only be read in order, so the member is looked up by scanning
+            for info in archive:
+                if info.name == member and info.isfile():
+                    with archive.extractfile(info) as stream:
+                        yield stream, info.size
+                    return
+            raise KeyError(f"No member {member} in {filepath}")
+    elif kind == CONTAINER_GZIP:
+        with gzip.open(filepath, "rb") as stream:
+            yield stream, _gzip_size(filepath)
+    elif kind == CONTAINER_ZSTD:
+        with open(filepath, "rb") as file, _zstd_reader(file) as stream:
+            yield stream, _zstd_size(filepath)
+    else:
+        raise ValueError(f"Not a container: {filepath}")
+
+
+def iter_member_headers(filepath, size=256):
+    """
+    Yields the first `size` decompressed bytes of every member, e.g. to identify their formats,
+    reading a tar archive only once.
+
+    Yields:
+        tuple: (member name, uncompressed size or None, header bytes)
+    """
+    kind = container_type(filepath)
+    if kind in (CONTAINER_TAR, CONTAINER_TAR_ZSTD):
+        with _open_tar(filepath, kind) as archive:
+            for info in archive:
+                if info.isfile() and _is_member(info.name):
+                    with archive.extractfile(info) as stream:
+                        yield info.name, info.size, stream.read(size)
+        return
+    for member, member_size in list_members(filepath):
+        with open_member(filepath, member) as (stream, _):
+            yield member, member_size, stream.read(size)
+
+
+def _is_seekable(stream):
+    try:
+        return stream.seekable()
+    except (AttributeError, ValueError):
+        return False
+
+
+def peek_member(stream, size=256):
+    """
+    Reads the first bytes of a member stream, e.g. to identify its format, without consuming them.
+
+    Args:
+        stream: Binary member stream, as yielded by `open_member` or `iter_member_streams`.
+        size (int): Number of bytes to read (fewer when the stream cannot seek and buffers less).
+
+    Returns:
+        tuple: (header bytes, stream to read the member from, positioned at its start)
+    """
+    if _is_seekable(stream):
+        header = stream.read(size)
+        stream.seek(0)
+        return header, stream
+    if not hasattr(stream, "peek"):
+        stream = io.BufferedReader(stream, buffer_size=max(size, io.DEFAULT_BUFFER_SIZE))
+    return stream.peek(size)[:size], stream
+
+
+@contextmanager
+def member_text(stream, size=None, encoding="utf-8"):
+    """
+    Wraps a binary member stream as a seekable text stream, for parsers that read text files
+    (lasio). Streams that cannot seek are spooled in memory, and to MEMBER_TEMP_FOLDER beyond
+    `_SPOOL_MAX_BYTES`.
+
+    Yields:
+        tuple: (text file-like object, uncompressed size or None)
+    """
+    if _is_seekable(stream):
+        with io.TextIOWrapper(stream, encoding=encoding) as text:
+            yield text, size
+        return
+
+    with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_BYTES,
+                                       dir=CONTAINERS_CONFIG["MEMBER_TEMP_FOLDER"]) as spool:
+        shutil.copyfileobj(stream, spool, _COPY_BUFFER_BYTES)
+        spool.seek(0)
+        with io.TextIOWrapper(spool, encoding=encoding) as text:
+            yield text, size if size is not None else spool.tell()
+
+
+@contextmanager
+def open_member_text(filepath, member, encoding="utf-8"):
+    """
+    Opens a member as a seekable text stream, for parsers that read text files (lasio).
+
+    Yields:
+        tuple: (text file-like object, uncompressed size or None)
+    """
+    with open_member(filepath, member) as (stream, size), member_text(stream, size, encoding) as opened:
+        yield opened
+
+
+def _temp_folders(size):
+    """
+    Returns the folders to decompress a member of `size` bytes into, in order of preference.
+    """
+    folder = CONTAINERS_CONFIG["MEMBER_TEMP_FOLDER"]
+    system_folder = tempfile.gettempdir()
+    if os.path.realpath(folder) == os.path.realpath(system_folder):
+        return [system_folder]
+    if size is not None:
+        try:
+            if shutil.disk_usage(folder).free <= size:
+                return [system_folder]
+        except OSError:
+            return [system_folder]
+    return [folder, system_folder]
+
+
+def _copy_to_temp(stream, size, suffix):
+    """
+    Copies a member stream to a temporary file. When a folder runs out of space (other tasks may
+    fill it after the free space check), what was written moves to the next folder and the copy
+    continues there.
+
+    Returns:
+        str: Path of the temporary file.
+    """
+    folders = _temp_folders(size)
+    chunk = b""
+    partial_path = None
+    for position, folder in enumerate(folders):
+        fd, temp_path = tempfile.mkstemp(prefix="member_", suffix=suffix, dir=folder)
+        try:
+            # Unbuffered, so the bytes not written when the folder fills up are still in `chunk`
+            with os.fdopen(fd, "wb", buffering=0) as temp_file:
+                if partial_path is not None:
+                    with open(partial_path, "rb") as partial_file:
+                        shutil.copyfileobj(partial_file, temp_file, _COPY_BUFFER_BYTES)
+                    os.unlink(partial_path)
+                    partial_path = None
+                while True:
+                    if not chunk:
+                        chunk = stream.read(_COPY_BUFFER_BYTES)
+                        if not chunk:
+                            return temp_path
+                    chunk = chunk[temp_file.write(chunk):]
+        except OSError as e:
+            if e.errno != errno.ENOSPC or position == len(folders) - 1 or partial_path is not None:
+                os.unlink(temp_path)
+                raise
+            partial_path = temp_path
+        except BaseException:
+            os.unlink(temp_path)
+            if partial_path is not None:
+                os.unlink(partial_path)
+            raise
+
+
+@contextmanager
+def member_temp_file(stream, member, size=None, filepath=None, logger=None):
+    """
+    Decompresses a member stream to a temporary file, for readers that need random access
+    (dlisio). The file is removed when the context exits.
+
+    Args:
+        stream: Binary member stream.
+        member (str): Member name, whose suffix the temporary file keeps.
+        size (int, optional): Uncompressed size, to choose the folder it fits in.
+        filepath (str or Path, optional): Container file, for the log message.
+        logger (optional): Logger instance.
+
+    Yields:
+        Path: The temporary file.
+    """
+    temp_path = _copy_to_temp(stream, size, suffix=PurePosixPath(member).suffix)
+    if logger:
+        logger.info(f"Decompressed {member} from {filepath} to {temp_path} ({os.path.getsize(temp_path)} bytes)")
+    try:
+        yield Path(temp_path)
+    finally:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+
+
+@contextmanager
+def materialize_member(filepath, member, logger=None):
+    """
+    Decompresses a member to a temporary file, for readers that need random access (dlisio).
+    The file is removed when the context exits.
+
+    Args:
+        filepath (str or Path): Container file.
+        member (str): Member name.
+        logger (optional): Logger instance.
+
+    Yields:
+        Path: The temporary file.
+    """
+    with open_member(filepath, member) as (stream, size):
+        temp_path = _copy_to_temp(stream, size, suffix=PurePosixPath(member).suffix)
+
+    if logger:
+        logger.info(f"Decompressed {member} from {filepath} to {temp_path} ({os.path.getsize(temp_path)} bytes)")
+    try:
+        yield Path(temp_path)
+    finally:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+
+
+def iter_member_streams(filepath, members=None):
+    """
+    Opens the members of a container one at a time, in archive order, reading the container
+    once: tar streams are not rescanned from the start for every member. Each stream is closed
+    before the next member is opened and when the iteration ends or is abandoned.
+
+    Args:
+        filepath (str or Path): Container file.
+        members (iterable, optional): Names of the members to open (default: all members).
+
+    Yields:
+        tuple: (member name, binary stream decompressed as it is read, uncompressed size or None)
+    """
+    wanted = set(members) if members is not None else None
+    kind = container_type(filepath)
+
+    def _selected(name):
+        return _is_member(name) and (wanted is None or name in wanted)
+
+    if kind in (CONTAINER_TAR, CONTAINER_TAR_ZSTD):
+        with _open_tar(filepath, kind) as archive:
+            for info in archive:
+                if info.isfile() and _selected(info.name):
+                    with archive.extractfile(info) as stream:
+                        yield info.name, stream, info.size
+    elif kind == CONTAINER_ZIP:
+        with zipfile.ZipFile(filepath) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and _selected(info.filename):
+                    with archive.open(info) as stream:
+                        yield info.filename, stream, info.file_size
+    elif kind in (CONTAINER_GZIP, CONTAINER_ZSTD):
+        member = container_stem(filepath)
+        if wanted is None or member in wanted:
+            with open_member(filepath, member) as (stream, size):
+                yield member, stream, size
+    else:
+        raise ValueError(f"Not a container: {filepath}")
+
+
+def member_output_stem(filepath, member):
+    """
+    Returns the output path of a member, relative to the container's output folder and without
+    extension: archive members go to a folder named after the archive, mirroring their paths in
+    it, while a single compressed file keeps its own name.
+
+    Args:
+        filepath (str or Path): Container file.
+        member (str): Member name.
+
+    Returns:
+        PurePosixPath: e.g. `run1/wellA/main` for member `wellA/main.las` of `run1.zip`.
+    """
+    # Absolute and parent references in member names never leave the output folder
+    parts = [part for part in PurePosixPath(member).parts if part not in ("/", "..", ".")]
+    member_path = PurePosixPath(*parts) if parts else PurePosixPath(container_stem(filepath))
+    stem = member_path.with_name(PurePosixPath(member_path.name).stem)
+    if container_type(filepath) in (CONTAINER_GZIP, CONTAINER_ZSTD):
+        return PurePosixPath(stem.name)
+    return PurePosixPath(container_stem(filepath)) / stem
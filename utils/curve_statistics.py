@@ -0,0 +1,183 @@
+"""
+    Per-curve statistics and QC metrics, computed during the conversion from the arrays the
+    scanners hold, so curves can be screened across all outputs without reading bulk data.
+
+    For every scalar curve of a record (LAS file or DLIS frame), except the index:
+    |_count, valid_count, null_fraction
+    |_min, max, mean, std and the configured percentiles (p10, p50, p90 by default)
+    |_first_valid_index, last_valid_index   index values of the first and last non-null samples
+    |_spike_count       samples above or below both neighbours by more than `spike_threshold`
+    |                   robust standard deviations of the curve's sample-to-sample differences
+    |_flatline_count    runs of at least `flatline_min_samples` identical consecutive values,
+    |_flatline_samples  and the samples they cover (stuck tools, constant fill values)
+
+    All curves of a record are processed at once as the columns of one matrix.
+"""
+import warnings
+import numpy as np
+from scanners.ScanRecord import ScanRecord
+
+# Scale of the median absolute deviation that estimates a normal standard deviation
+_MAD_SCALE = 1.4826
+
+
+def _value(number):
+    """
+    Converts a NumPy number to a Python one, NaN to None.
+    """
+    number = number.item() if hasattr(number, "item") else number
+    if isinstance(number, float) and np.isnan(number):
+        return None
+    return number
+
+
+def _spike_counts(matrix, spike_threshold):
+    """
+    Counts, per column, the samples that stand out from both neighbours in the same direction.
+    """
+    if len(matrix) < 3:
+        return np.zeros(matrix.shape[1], dtype=np.int64)
+
+    differences = np.diff(matrix, axis=0)
+    scale = _MAD_SCALE * np.nanmedian(np.abs(differences), axis=0)
+    # Curves with mostly repeated values have a zero MAD: fall back to the standard deviation
+    scale = np.where(scale > 0, scale, np.nanstd(differences, axis=0))
+
+    rise, fall = differences[:-1], -differences[1:]  # sample minus previous, sample minus next
+    jump = np.fmin(np.abs(rise), np.abs(fall))
+    spikes = (np.sign(rise) == np.sign(fall)) & (jump > spike_threshold * scale)
+    spikes &= scale > 0
+    return spikes.sum(axis=0)
+
+
+def _flatline_runs(matrix, flatline_min_samples):
+    """
+    Counts, per column, the runs of identical consecutive values of at least `flatline_min_samples`
+    samples and the samples they cover.
+    """
+    columns = matrix.shape[1]
+    if len(matrix) < 2 or flatline_min_samples < 2:
+        return np.zeros(columns, dtype=np.int64), np.zeros(columns, dtype=np.int64)
+
+    # NaN never equals NaN, so runs of nulls are not flatlines
+    repeated = (matrix[1:] == matrix[:-1]).T
+    edges = np.diff(np.pad(repeated.astype(np.int8), ((0, 0), (1, 1))), axis=1)
+    # Starts and ends come out column by column, in order, so they pair up
+    start_columns, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    samples = ends - starts + 1
+    long_runs = samples >= flatline_min_samples
+
+    run_counts = np.bincount(start_columns[long_runs], minlength=columns)
+    run_samples = np.bincount(start_columns[long_runs], weights=samples[long_runs], minlength=columns)
+    return run_counts, run_samples.astype(np.int64)
+
+
+def compute_record_statistics(record, percentiles=(10, 50, 90), spike_threshold=5.0, flatline_min_samples=10):
+    """
+    Computes the statistics of the scalar curves of a record.
+
+    Args:
+        record (dict): Record produced by a scanner (a ScanRecord carries its arrays).
+        percentiles (iterable, optional): Percentiles reported as `p{q}`.
+        spike_threshold (float, optional): Jump, in robust standard deviations of the differences,
+            from which a sample is a spike.
+        flatline_min_samples (int, optional): Identical consecutive samples from which a run is a flatline.
+
+    Returns:
+        dict: Frame name, index curve, curve name -> unit and curve name -> statistics, or None
+        when the record has no numeric index.
+    """
+    split = ScanRecord.index_and_matrix(record)
+    if split is None:
+        return None
+    index_curve, index, names, matrix = split
+    rows = len(index)
+    percentiles = sorted(set(percentiles))
+
+    valid = ~np.isnan(matrix)
+    valid_counts = valid.sum(axis=0)
+    has_valid = valid_counts > 0
+    first_rows = np.where(has_valid, valid.argmax(axis=0), 0)
+    last_rows = np.where(has_valid, rows - 1 - valid[::-1].argmax(axis=0), 0)
+
+    # Curves without any value give NaN (reported as null) instead of warnings
+    with warnings.catch_warnings(), np.errstate(invalid="ignore", divide="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+        minimums = np.nanmin(matrix, axis=0) if rows else np.full(len(names), np.nan)
+        maximums = np.nanmax(matrix, axis=0) if rows else np.full(len(names), np.nan)
+        means = np.nanmean(matrix, axis=0) if rows else np.full(len(names), np.nan)
+        deviations = np.nanstd(matrix, axis=0) if rows else np.full(len(names), np.nan)
+        quantiles = (np.nanpercentile(matrix, percentiles, axis=0) if rows and percentiles
+                     else np.full((len(percentiles), len(names)), np.nan))
+        spike_counts = _spike_counts(matrix, spike_threshold)
+    flatline_counts, flatline_samples = _flatline_runs(matrix, flatline_min_samples)
+
+    curves = {}
+    for position, name in enumerate(names):
+        statistics = {
+            "count": rows,
+            "valid_count": int(valid_counts[position]),
+            "null_fraction": 1 - valid_counts[position] / rows if rows else None,
+            "min": minimums[position],
+            "max": maximums[position],
+            "mean": means[position],
+            "std": deviations[position],
+        }
+        statistics.update({f"p{percentile:g}": quantiles[rank, position] for rank, percentile in enumerate(percentiles)})
+        statistics.update({
+            "first_valid_index": index[first_rows[position]] if has_valid[position] else None,
+            "last_valid_index": index[last_rows[position]] if has_valid[position] else None,
+            "spike_count": spike_counts[position],
+            "flatline_count": flatline_counts[position],
+            "flatline_samples": flatline_samples[position],
+        })
+        curves[name] = {key: _value(value) for key, value in statistics.items()}
+
+    units = {curve.get("name"): curve.get("unit") for curve in record.get("curves", [])}
+    return {"frame": ScanRecord.frame_name(record), "index_curve": index_curve["name"],
+            "units": {name: units.get(name) for name in names}, "curves": curves}
+
+
+def annotate_curves(record, record_statistics):
+    """
+    Adds the statistics of each curve to its definition in the record, under `statistics`.
+    """
+    if not record_statistics:
+        return
+    for curve in record.get("curves", []):
+        statistics = record_statistics["curves"].get(curve.get("name"))
+        if statistics is not None:
+            curve["statistics"] = statistics
+
+
+def summary_rows(records_statistics, result):
+    """
+    Flattens the statistics of a conversion into one summary row per curve and record.
+
+    Args:
+        records_statistics (list): Results of `compute_record_statistics` (None skipped).
+        result (dict): Result metadata of the conversion (output file, well, field).
+
+    Returns:
+        list: Rows for the curve statistics summary.
+    """
+    rows = []
+    for record_statistics in records_statistics:
+        if not record_statistics:
+            continue
+        for curve_name, statistics in record_statistics["curves"].items():
+            rows.append({
+                "output_file": result.get("output_file"),
+                "file_name": result.get("file_name"),
+                "input_file_format": result.get("input_file_format"),
+                "well": result.get("well"),
+                "field": result.get("field"),
+                "frame": record_statistics["frame"],
+                "curve": curve_name,
+                "unit": record_statistics["units"].get(curve_name),
+                "index_curve": record_statistics["index_curve"],
+                **statistics,
+            })
+    return rows
+
@@ -0,0 +1,67 @@
+import os
+
+
+def env_str(name, default=None):
+    """
+    Reads a string setting from the environment.
+
+    Args:
+        name (str): Environment variable name.
+        default (str, optional): Value used when the variable is unset or empty.
+
+    Returns:
+        str: The configured value or the default.
+    """
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip()
+
+
+def env_int(name, default):
+    """
+    Reads an integer setting from the environment, falling back to the default on bad input.
+    """
+    value = env_str(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def env_float(name, default):
+    """
+    Reads a float setting from the environment, falling back to the default on bad input.
+    """
+    value = env_str(name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+def env_bool(name, default=False):
+    """
+    Reads a boolean setting from the environment. Accepts 1/0, true/false, yes/no, on/off.
+    """
+    value = env_str(name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+def env_int_list(name, default):
+    """
+    Reads a comma-separated list of integers from the environment, falling back to the default on bad input.
+    """
+    value = env_str(name)
+    if value is None:
+        return default
+    try:
+        return [int(item) for item in value.split(",") if item.strip()]
+    except ValueError:
+        return default
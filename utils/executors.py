@@ -0,0 +1,41 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class InlineExecutor:
+    """
+    Executor with the `concurrent.futures` interface that runs each call immediately in the
+    calling thread. Used when parallelism is disabled so callers keep a single code path.
+    """
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+    def map(self, fn, *iterables):
+        return [fn(*args) for args in zip(*iterables)]
+
+    def shutdown(self, wait=True):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+def create_executor(parallelism, thread_name_prefix="worker"):
+    """
+    Returns a thread pool for parallelism above 1, otherwise an inline executor.
+
+    Args:
+        parallelism (int): Maximum number of concurrent calls.
+        thread_name_prefix (str, optional): Prefix for the pool's thread names.
+    """
+    if parallelism and parallelism > 1:
+        return ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix=thread_name_prefix)
+    return InlineExecutor()
@@ -0,0 +1,233 @@
+"""
+    Writing and reading JSON Well Log files with a byte-offset index sidecar.
+
+    The writer produces exactly the same bytes as `JsonSerializable.to_json_bytes` (orjson with
+    two space indentation) but assembles the document record by record, so it knows where every
+    section starts. The sidecar records, for each record (frame):
+    |_offset/length of each top level section (header, parameters, curves, data, ...)
+    |_row blocks: offset/length of every `block_rows` rows of `data` and their index range
+
+    A reader can then seek to a section or to the row blocks covering an index interval and
+    decode only those bytes.
+"""
+import os
+import orjson
+from pathlib import Path
+from utils.SerialiseJson import JsonSerializable
+
+_INDENT = b"  "
+_INDEX_SUFFIX = ".index.json"
+
+
+def index_path_for(json_path):
+    """
+    Returns the sidecar path for a JSON output, e.g. `well.json` -> `well.index.json`.
+    """
+    json_path = Path(json_path)
+    return json_path.with_name(f"{json_path.stem}{_INDEX_SUFFIX}")
+
+
+def encode_indented(value, depth):
+    """
+    Encodes a value as orjson does with OPT_INDENT_2 when nested `depth` levels deep.
+    JSON strings never contain raw newlines, so re-indenting is a plain byte replacement.
+    """
+    encoded = orjson.dumps(value, option=orjson.OPT_INDENT_2)
+    return encoded.replace(b"\n", b"\n" + _INDENT * depth) if depth else encoded
+
+
+def _row_index_value(row):
+    value = row[0] if row else None
+    return value[0] if isinstance(value, list) and value else value
+
+
+class IndexedJsonWriter:
+    """
+    Streams records into a JSON Well Log document and builds the byte-offset index.
+    """
+
+    def __init__(self, path, block_rows=1000):
+        """
+        Initialize the IndexedJsonWriter.
+
+        Args:
+            path (str or Path): Output JSON file.
+            block_rows (int, optional): Rows per indexed block of the `data` section.
+        """
+        self._path = Path(path)
+        self._block_rows = max(int(block_rows), 1)
+        self._file = open(self._path, "wb")
+        self._position = 0
+        self._records = []
+
+    def _write(self, chunk):
+        self._file.write(chunk)
+        self._position += len(chunk)
+
+    def write_record(self, record):
+        """
+        Appends one record (frame) to the document.
+        """
+        record = JsonSerializable.to_json(record)
+
+        self._write(b"[\n" if not self._records else b",\n")
+        self._write(_INDENT)
+
+        record_index = {"offset": self._position, "sections": {}, "row_count": 0, "blocks": []}
+
+        if not record:
+            self._write(b"{}")
+        else:
+            self._write(b"{\n")
+            keys = list(record.keys())
+            for position, key in enumerate(keys):
+                self._write(_INDENT * 2 + orjson.dumps(key) + b": ")
+                section_offset = self._position
+
+                if key == "data" and isinstance(record[key], list):
+                    self._write_rows(record[key], record_index)
+                else:
+                    self._write(encode_indented(record[key], 2))
+
+                record_index["sections"][key] = {"offset": section_offset, "length": self._position - section_offset}
+                self._write(b",\n" if position < len(keys) - 1 else b"\n")
+            self._write(_INDENT + b"}")
+
+        record_index["length"] = self._position - record_index["offset"]
+        self._records.append(record_index)
+
+    def _write_rows(self, rows, record_index):
+        """
+        Writes the `data` array row by row, recording a block every `block_rows` rows.
+        """
+        record_index["row_count"] = len(rows)
+        if not rows:
+            self._write(b"[]")
+            return
+
+        self._write(b"[\n")
+        for block_start in range(0, len(rows), self._block_rows):
+            block = rows[block_start:block_start + self._block_rows]
+            if block_start:
+                self._write(b",\n")
+
+            block_offset = self._position
+            self._write(b",\n".join(_INDENT * 3 + encode_indented(row, 3) for row in block))
+
+            record_index["blocks"].append({
+                "row_start": block_start,
+                "row_count": len(block),
+                "offset": block_offset,
+                "length": self._position - block_offset,
+                "index_start": _row_index_value(block[0]),
+                "index_end": _row_index_value(block[-1]),
+            })
+        self._write(b"\n" + _INDENT * 2 + b"]")
+
+    def close(self):
+        """
+        Finishes the document and writes the sidecar.
+
+        Returns:
+            dict: The index written to the sidecar.
+        """
+        self._write(b"\n]" if self._records else b"[]")
+        self._file.close()
+
+        index = {
+            "file": self._path.name,
+            "size": self._position,
+            "block_rows": self._block_rows,
+            "records": self._records,
+        }
+        with open(index_path_for(self._path), "wb") as index_file:
+            index_file.write(orjson.dumps(index))
+        return index
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+        return False
+
+
+def write_indexed_json(records, path, block_rows=1000):
+    """
+    Writes records to `path` and its index sidecar.
+
+    Returns:
+        dict: The index written to the sidecar.
+    """
+    writer = IndexedJsonWriter(path, block_rows=block_rows)
+    for record in records:
+        writer.write_record(record)
+    return writer.close()
+
+
+class IndexedJsonReader:
+    """
+    Reads sections and index ranges of a JSON output using its sidecar.
+    """
+
+    def __init__(self, json_path, index_path=None):
+        self._json_path = Path(json_path)
+        with open(index_path or index_path_for(self._json_path), "rb") as index_file:
+            self._index = orjson.loads(index_file.read())
+
+        if self._index.get("size") != os.path.getsize(self._json_path):
+            raise ValueError(f"Index sidecar does not match {self._json_path}")
+
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def record_count(self):
+        return len(self._index["records"])
+
+    def _read(self, file, offset, length):
+        file.seek(offset)
+        return file.read(length)
+
+    def read_section(self, record, section):
+        """
+        Decodes a single top level section (e.g. `header` or `curves`) of a record.
+        """
+        location = self._index["records"][record]["sections"][section]
+        with open(self._json_path, "rb") as file:
+            return orjson.loads(self._read(file, location["offset"], location["length"]))
+
+    def read_rows(self, record=0, start=None, stop=None):
+        """
+        Decodes the rows of a record whose index (first column) lies within [start, stop].
+        Only the row blocks overlapping the interval are read. Works for increasing and
+        decreasing indexes; None on either side leaves the interval open.
+
+        Returns:
+            list: Matching data rows.
+        """
+        low = float("-inf") if start is None else start
+        high = float("inf") if stop is None else stop
+        if low > high:
+            low, high = high, low
+
+        rows = []
+        with open(self._json_path, "rb") as file:
+            for block in self._index["records"][record]["blocks"]:
+                bounds = [value for value in (block["index_start"], block["index_end"]) if value is not None]
+                if bounds and (max(bounds) < low or min(bounds) > high):
+                    continue
+
+                block_rows = orjson.loads(b"[" + self._read(file, block["offset"], block["length"]) + b"]")
+                for row in block_rows:
+                    value = _row_index_value(row)
+                    if value is None:
+                        if start is None and stop is None:
+                            rows.append(row)
+                    elif low <= value <= high:
+                        rows.append(row)
+        return rows
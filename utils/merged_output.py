@@ -0,0 +1,249 @@
+"""
+    Merged output of a DLIS logical file: the scalar curves of all its frames aligned on one
+    common index, so consumers get a single table instead of one per frame.
+
+    `{name}.merged.json` holds one record with:
+    |_header    the logical file header, with the start, end and step of the common index
+    |_frames    the frames merged (direction, spacing, rows, whether they were flipped) and the
+    |           frames left out (another index type or unit than the first frame)
+    |_curves    the index curve, then the scalar curves of every frame with their frame; names
+    |           repeated across frames are prefixed with the frame name (`FRAME1.GR`)
+    |_data      one row per index value of the common grid, null where a frame has no sample
+
+    Frames recorded upwards (decreasing index) are flipped, so the common index always increases.
+    The grid spans all frames with the finest frame spacing unless a step is given, and every
+    frame is resampled onto it in one vectorized pass over all its curves:
+    |_linear    interpolation between the two surrounding samples, not across gaps longer than
+    |           1.5 frame steps
+    |_nearest   the closest sample within half a frame step (values are never blended)
+    Array channels are not merged.
+"""
+import numpy as np
+import orjson
+from pathlib import Path
+from scanners.ScanRecord import ScanRecord
+from utils.output_files import output_name
+
+MERGE_METHOD_LINEAR = "linear"
+MERGE_METHOD_NEAREST = "nearest"
+MERGED_SUFFIX = ".merged.json"
+
+# Grids are capped (rows times columns, index included) so a tiny step over a long interval, or
+# a long interval over many curves, cannot exhaust memory: 50M float64 values are 400 MB
+_MAX_GRID_VALUES = 50_000_000
+
+
+def _frame_attribute(record, attribute):
+    frame = record.get("frame") or {}
+    attributes = frame.get("attributes") or []
+    objects = frame.get("objects") or {}
+    if attribute not in attributes or not objects:
+        return None
+    # Objects are keyed by name, with one value per attribute
+    values = next(iter(objects.values()))
+    position = attributes.index(attribute)
+    return values[position] if position < len(values) else None
+
+
+def _frame_step(index, spacing):
+    if isinstance(spacing, (int, float)) and spacing:
+        return abs(float(spacing))
+    steps = np.abs(np.diff(index))
+    steps = steps[steps > 0]
+    return float(np.median(steps)) if len(steps) else None
+
+
+def extract_frame(record):
+    """
+    Takes the index and scalar curves of a record, oriented by increasing index.
+
+    Args:
+        record (dict): DLIS frame record produced by a scanner (a ScanRecord carries its arrays).
+
+    Returns:
+        dict: Frame name, index curve, index type, index and matrix of shape (rows, curves)
+        sorted by increasing index, curve definitions, direction, step and whether the frame was
+        flipped, or None when the record has no numeric index.
+    """
+    split = ScanRecord.index_and_matrix(record)
+    if split is None:
+        return None
+    index_curve, index, names, matrix = split
+
+    rows = ~np.isnan(index)
+    index, matrix = index[rows], matrix[rows]
+
+    direction = _frame_attribute(record, "direction")
+    spacing = _frame_attribute(record, "spacing")
+    if isinstance(direction, str) and direction.upper() in ("INCREASING", "DECREASING"):
+        decreasing = direction.upper() == "DECREASING"
+    elif isinstance(spacing, (int, float)) and spacing:
+        decreasing = spacing < 0
+    else:
+        decreasing = len(index) > 1 and index[-1] < index[0]
+
+    if decreasing:
+        index, matrix = index[::-1], matrix[::-1]
+    if len(index) > 1 and np.any(np.diff(index) < 0):
+        # Irregular frames: sort, keeping the recorded order of equal index values
+        order = np.argsort(index, kind="stable")
+        index, matrix = index[order], matrix[order]
+
+    definitions = {curve.get("name"): curve for curve in record.get("curves", [])}
+    return {
+        "frame": ScanRecord.frame_name(record),
+        "index_curve": index_curve,
+        "index_type": _frame_attribute(record, "index_type"),
+        "index": np.ascontiguousarray(index),
+        "names": names,
+        "curves": [definitions[name] for name in names],
+        "matrix": matrix,
+        "direction": "DECREASING" if decreasing else "INCREASING",
+        "step": _frame_step(index, spacing),
+        "flipped": bool(decreasing),
+    }
+
+
+def resample(index, matrix, grid, method=MERGE_METHOD_LINEAR, step=None):
+    """
+    Resamples all curves of a frame onto a grid at once.
+
+    Args:
+        index (np.ndarray): Increasing index values, shape (rows,).
+        matrix (np.ndarray): Curve values, shape (rows, curves).
+        grid (np.ndarray): Increasing index values to resample onto.
+        method (str, optional): `linear` or `nearest`.
+        step (float, optional): Frame sampling step, bounding gaps and nearest-sample distances.
+
+    Returns:
+        np.ndarray: Values of shape (len(grid), curves), NaN outside the frame and its gaps.
+    """
+    if method not in (MERGE_METHOD_LINEAR, MERGE_METHOD_NEAREST):
+        raise ValueError(f"Unknown merge method: {method}")
+    if not len(index):
+        return np.full((len(grid), matrix.shape[1]), np.nan)
+
+    last = len(index) - 1
+    right = np.clip(np.searchsorted(index, grid), 0, last)  # First sample at or after the grid value
+    left = np.clip(right - 1, 0, last)
+
+    if method == MERGE_METHOD_NEAREST:
+        nearest = np.where(np.abs(index[left] - grid) <= np.abs(index[right] - grid), left, right)
+        values = matrix[nearest]
+        if step:
+            values[np.abs(index[nearest] - grid) > step / 2] = np.nan
+        return values
+
+    span = index[right] - index[left]
+    weight = np.divide(grid - index[left], span, out=np.zeros_like(grid), where=span > 0)
+    values = matrix[left] * (1 - weight)[:, None] + matrix[right] * weight[:, None]
+    # Grid values on a sample take it as is, even when its neighbour is null
+    exact = index[right] == grid
+    values[exact] = matrix[right[exact]]
+    outside = (grid < index[0]) | (grid > index[-1])
+    if step:
+        outside |= ~exact & (span > 1.5 * step)
+    values[outside] = np.nan
+    return values
+
+
+def merge_frames(frames, method=MERGE_METHOD_LINEAR, step=None):
+    """
+    Aligns frames on a common increasing index. Frames are merged when their index type and unit
+    match the first frame with a numeric index.
+
+    Args:
+        frames (list): Results of `extract_frame` (None skipped).
+        method (str, optional): `linear` or `nearest`.
+        step (float, optional): Step of the common index; the finest frame step when not given.
+
+    Returns:
+        dict: The merged record (header excepted), or None when no frame has index values.
+    """
+    frames = [frame for frame in frames if frame is not None]
+    if not frames:
+        return None
+
+    reference = frames[0]
+    merged, skipped = [], []
+    for frame in frames:
+        if frame["index_type"] == reference["index_type"] \
+                and frame["index_curve"].get("unit") == reference["index_curve"].get("unit"):
+            merged.append(frame)
+        else:
+            skipped.append({"name": frame["frame"], "index_type": frame["index_type"],
+                            "index_unit": frame["index_curve"].get("unit")})
+
+    merged = [frame for frame in merged if len(frame["index"])]
+    if not merged:
+        return None
+
+    start = min(frame["index"][0] for frame in merged)
+    end = max(frame["index"][-1] for frame in merged)
+    if not step:
+        steps = [frame["step"] for frame in merged if frame["step"]]
+        step = min(steps) if steps else None
+    # Whole steps only, with a tolerance for index values that are not exact binary fractions
+    rows = int(np.floor((end - start) / step + 1e-9)) + 1 if step else 1
+    columns = 1 + sum(len(frame["names"]) for frame in merged)
+    if rows * columns > _MAX_GRID_VALUES:
+        raise ValueError(f"Common index of {rows} rows by {columns} columns exceeds {_MAX_GRID_VALUES} values "
+                         f"(step {step})")
+    # Multiples of the step from the start, so the grid does not drift as additions would
+    grid = start + step * np.arange(rows) if step else np.array([start])
+
+    counts = {}
+    for frame in merged:
+        for name in frame["names"]:
+            counts[name] = counts.get(name, 0) + 1
+
+    index_curve = {key: value for key, value in reference["index_curve"].items() if key != "statistics"}
+    curves, blocks = [index_curve], [grid[:, None]]
+    for frame in merged:
+        for name, definition in zip(frame["names"], frame["curves"]):
+            curve = {key: value for key, value in definition.items() if key != "statistics"}
+            curve["name"] = name if counts[name] == 1 and name != index_curve.get("name") else f"{frame['frame']}.{name}"
+            curve["frame"] = frame["frame"]
+            curves.append(curve)
+        blocks.append(resample(frame["index"], frame["matrix"], grid, method=method, step=frame["step"]))
+
+    return {
+        "index": {"start": float(grid[0]), "end": float(grid[-1]), "step": step, "rows": rows, "method": method},
+        "frames": [{"name": frame["frame"], "index_curve": frame["index_curve"].get("name"),
+                    "direction": frame["direction"], "step": frame["step"], "rows": len(frame["index"]),
+                    "flipped": frame["flipped"]} for frame in merged],
+        "skipped_frames": skipped,
+        "curves": curves,
+        "data": np.ascontiguousarray(np.hstack(blocks)),
+    }
+
+
+def write_merged_output(frames, header, output_path, method=MERGE_METHOD_LINEAR, step=None):
+    """
+    Writes the merged output of a logical file next to its output.
+
+    Args:
+        frames (list): Results of `extract_frame`, one per frame record.
+        header (dict): Header of the logical file.
+        output_path (str or Path): Primary output (`{name}.json` or `{name}.manifest.json`).
+        method (str, optional): `linear` or `nearest`.
+        step (float, optional): Step of the common index; the finest frame step when not given.
+
+    Returns:
+        Path: The merged file, or None when no frame could be merged.
+    """
+    merged = merge_frames(frames, method=method, step=step)
+    if merged is None:
+        return None
+
+    output_path = Path(output_path)
+    merged_path = output_path.with_name(f"{output_name(output_path)}{MERGED_SUFFIX}")
+    index = merged.pop("index")
+    record = {
+        "header": {**(header or {}), "startIndex": index["start"], "endIndex": index["end"],
+                   "step": index["step"], "null": None},
+        "merge": {"method": index["method"], "rows": index["rows"]},
+        **merged,
+    }
+    merged_path.write_bytes(orjson.dumps([record], option=orjson.OPT_SERIALIZE_NUMPY))
+    return merged_path
@@ -0,0 +1,317 @@
+"""
+    Prometheus metrics of the watcher and the workers.
+
+    Every process keeps its metrics in memory and periodically writes them in the Prometheus
+    text format to `{METRICS_FOLDER}/{component}_{host}_{pid}.prom`, which node-exporter's
+    textfile collector can pick up. Samples carry `component`, `host` and `pid` labels so files
+    of different processes never collide. With METRICS_PORT set, the watcher also serves all
+    files of the folder merged into one scrape at `/metrics`.
+
+    Celery prefork children get their own registry: the registry is created lazily per process.
+"""
+import atexit
+import math
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from utils.env import env_bool, env_float, env_int, env_str
+
+METRICS_CONFIG = {
+    "ENABLED": env_bool("METRICS_ENABLED", True),
+    # Must be shared by the watcher and the workers for the merged endpoint (logs is mounted in both)
+    "FOLDER": Path(env_str("METRICS_FOLDER", str(Path(__file__).resolve().parent.parent / "logs" / "metrics"))),
+    "FLUSH_SECONDS": env_float("METRICS_FLUSH_SECONDS", 15),
+    # Files not updated for this long belong to exited processes and are deleted
+    "STALE_SECONDS": env_int("METRICS_STALE_SECONDS", 3600),
+    # Port of the merged /metrics endpoint served by the watcher (0 disables it)
+    "PORT": env_int("METRICS_PORT", 0),
+}
+
+_DURATION_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+_SUMMARY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+# name: (type, help, histogram buckets)
+METRICS = {
+    "welllog_files_detected_total": ("counter", "Files detected in the upload folder.", None),
+    "welllog_files_enqueued_total": ("counter", "Files (or DLIS logical files) submitted for conversion.", None),
+    "welllog_files_rejected_total": ("counter", "Files rejected before enqueueing.", None),
+    "welllog_claims_total": ("counter", "Claims of input files on the shared uploads folder by result.", None),
+    "welllog_broker_queue_depth": ("gauge", "Messages waiting in the filesystem broker.", None),
+    "welllog_tasks_in_flight": ("gauge", "Conversion tasks currently running.", None),
+    "welllog_conversions_total": ("counter", "Completed conversions by status.", None),
+    "welllog_conversion_duration_seconds": ("histogram", "Conversion duration by format and input size.",
+                                            _DURATION_BUCKETS),
+    "welllog_memory_limit_exceeded_total": ("counter", "Conversions stopped at the soft memory limit.", None),
+    "welllog_metadata_cache_total": ("counter", "DLIS metadata cache lookups by result.", None),
+    "welllog_input_bytes_total": ("counter", "Bytes of input files converted.", None),
+    "welllog_output_bytes_total": ("counter", "Bytes of JSON output written.", None),
+    "welllog_summary_write_duration_seconds": ("histogram", "Duration of summary CSV updates.", _SUMMARY_BUCKETS),
+    "welllog_summary_write_failures_total": ("counter", "Failed summary CSV updates.", None),
+    "welllog_search_index_failures_total": ("counter", "Failed search index updates.", None),
+}
+
+_SIZE_BUCKETS = ((1 << 20, "lt_1mb"), (10 << 20, "1mb_10mb"), (100 << 20, "10mb_100mb"), (1 << 30, "100mb_1gb"))
+
+
+def size_bucket(size):
+    """
+    Returns a coarse label for an input size, used to keep histogram label values bounded.
+    """
+    if not isinstance(size, (int, float)):
+        return "unknown"
+    for limit, label in _SIZE_BUCKETS:
+        if size < limit:
+            return label
+    return "gt_1gb"
+
+
+def _format_value(value):
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+class _Registry:
+    """
+    Metric values of one process, written to its textfile by a background thread.
+    """
+
+    def __init__(self, component):
+        self.pid = os.getpid()
+        self._base_labels = (("component", component), ("host", socket.gethostname()), ("pid", str(self.pid)))
+        self._path = METRICS_CONFIG["FOLDER"] / f"{component}_{socket.gethostname()}_{self.pid}.prom"
+        self._values = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+        METRICS_CONFIG["FOLDER"].mkdir(parents=True, exist_ok=True)
+        _purge_stale_files()
+        threading.Thread(target=self._flush_periodically, name="metrics-flush", daemon=True).start()
+        atexit.register(self.flush)
+
+    def _key(self, name, labels):
+        if name not in METRICS:
+            raise KeyError(f"Unknown metric: {name}")
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def add(self, name, value, labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def set(self, name, value, labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def observe(self, name, value, labels):
+        key = self._key(name, labels)
+        buckets = METRICS[name][2]
+        with self._lock:
+            # [cumulative bucket counts, sum, count]
+            histogram = self._histograms.setdefault(key, [[0] * len(buckets), 0.0, 0])
+            for position, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram[0][position] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def render(self):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        with self._lock:
+            values = dict(self._values)
+            histograms = {key: (list(counts), total, count) for key, (counts, total, count) in self._histograms.items()}
+
+        lines = []
+        for name, (metric_type, help_text, buckets) in METRICS.items():
+            samples = []
+            for (metric_name, labels), value in values.items():
+                if metric_name == name:
+                    samples.append(f"{name}{_format_labels(self._base_labels + labels)} {_format_value(value)}")
+            for (metric_name, labels), (counts, total, count) in histograms.items():
+                if metric_name != name:
+                    continue
+                for bound, bucket_count in zip(buckets + (math.inf,), counts + [count]):
+                    bucket_labels = self._base_labels + labels + (("le", _format_value(bound)),)
+                    samples.append(f"{name}_bucket{_format_labels(bucket_labels)} {bucket_count}")
+                samples.append(f"{name}_sum{_format_labels(self._base_labels + labels)} {_format_value(total)}")
+                samples.append(f"{name}_count{_format_labels(self._base_labels + labels)} {count}")
+            if samples:
+                lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"] + samples)
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def flush(self):
+        """
+        Writes the textfile atomically, so the collector never reads a partial file.
+        """
+        try:
+            tmp_path = self._path.with_name(self._path.name + ".tmp")
+            tmp_path.write_text(self.render(), encoding="utf-8")
+            os.replace(tmp_path, self._path)
+        except OSError:
+            pass  # Metrics must never break a conversion
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(METRICS_CONFIG["FLUSH_SECONDS"])
+            self.flush()
+
+
+_registry = None
+_component = "process"
+_registry_lock = threading.Lock()
+
+
+def configure(component):
+    """
+    Sets the component name (e.g. `watcher`, `worker`) used in the textfile name and labels.
+    """
+    global _component
+    _component = component
+
+
+def _get_registry():
+    global _registry
+    if not METRICS_CONFIG["ENABLED"]:
+        return None
+    if _registry is None or _registry.pid != os.getpid():
+        with _registry_lock:
+            if _registry is None or _registry.pid != os.getpid():
+                _registry = _Registry(_component)
+    return _registry
+
+
+def inc(name, value=1, **labels):
+    """
+    Increments a counter or a gauge.
+    """
+    registry = _get_registry()
+    if registry is not None:
+        registry.add(name, value, labels)
+
+
+def set_gauge(name, value, **labels):
+    registry = _get_registry()
+    if registry is not None:
+        registry.set(name, value, labels)
+
+
+def observe(name, value, **labels):
+    """
+    Records a value in a histogram.
+    """
+    registry = _get_registry()
+    if registry is not None:
+        registry.observe(name, value, labels)
+
+
+@contextmanager
+def timer(name, **labels):
+    """
+    Records the duration of the block in a histogram, whether or not it raises.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started, **labels)
+
+
+@contextmanager
+def in_flight(name="welllog_tasks_in_flight", **labels):
+    """
+    Increments a gauge for the duration of the block.
+    """
+    inc(name, 1, **labels)
+    try:
+        yield
+    finally:
+        inc(name, -1, **labels)
+
+
+def flush():
+    registry = _get_registry()
+    if registry is not None:
+        registry.flush()
+
+
+def _purge_stale_files():
+    now = time.time()
+    for path in METRICS_CONFIG["FOLDER"].glob("*.prom"):
+        try:
+            if now - path.stat().st_mtime > METRICS_CONFIG["STALE_SECONDS"]:
+                path.unlink()
+        except OSError:
+            continue
+
+
+def collect_textfiles(folder=None):
+    """
+    Merges the textfiles of all processes into one exposition, with each metric family's
+    HELP and TYPE lines written once.
+    """
+    families = {}
+    for path in sorted(Path(folder or METRICS_CONFIG["FOLDER"]).glob("*.prom")):
+        try:
+            content = path.read_text(encoding="utf-8")
+        except OSError:
+            continue
+        family = None
+        for line in content.splitlines():
+            if line.startswith("# HELP "):
+                family = line.split(" ", 3)[2]
+                families.setdefault(family, {"meta": [], "samples": []})
+                if not families[family]["meta"]:
+                    families[family]["meta"].append(line)
+            elif line.startswith("# TYPE "):
+                if len(families[family]["meta"]) == 1:
+                    families[family]["meta"].append(line)
+            elif line and family is not None:
+                families[family]["samples"].append(line)
+
+    lines = []
+    for family in families.values():
+        lines.extend(family["meta"] + family["samples"])
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = collect_textfiles().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes are too frequent to log
+
+
+def start_http_server(port, host="0.0.0.0"):
+    """
+    Serves the merged textfiles at `/metrics` from a daemon thread.
+
+    Returns:
+        ThreadingHTTPServer: The running server.
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsRequestHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
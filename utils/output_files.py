@@ -0,0 +1,79 @@
+"""
+    Naming conventions of the files written to the processed folder.
+
+    A conversion writes one primary output per logical file:
+    |_{name}.json                 single JSON Well Log document
+    |_{name}.manifest.json        sharded output, pointing to {name}.partNNNNN.json parts
+    and optional companion files next to it:
+    |_{name}.index.json           byte-offset index sidecar
+    |_{name}.preview.json         decimated preview levels of the scalar curves
+    |_{name}.merged.json          frames of a DLIS logical file merged on a common index
+    |_{name}.frameNNNNN.{curve}.npy / {name}.blobs.bin
+                                  array channels offloaded to blob files
+"""
+import re
+import orjson
+from pathlib import Path
+
+MANIFEST_SUFFIX = ".manifest.json"
+_PART_PATTERN = re.compile(r"\.part\d{5}(\.index)?\.json$")
+_COMPANION_SUFFIXES = (".index.json", ".preview.json", ".merged.json")
+
+
+def is_primary_output(path):
+    """
+    Returns True for a single JSON output or a manifest, False for parts and companion files.
+    """
+    name = Path(path).name
+    if not name.endswith(".json"):
+        return False
+    if name.endswith(MANIFEST_SUFFIX):
+        return True
+    if _PART_PATTERN.search(name):
+        return False
+    return not name.endswith(_COMPANION_SUFFIXES)
+
+
+def output_name(path):
+    """
+    Returns the output name without the `.json` / `.manifest.json` suffix.
+    """
+    name = Path(path).name
+    if name.endswith(MANIFEST_SUFFIX):
+        return name[:-len(MANIFEST_SUFFIX)]
+    return name[:-len(".json")] if name.endswith(".json") else name
+
+
+def load_output_records(path):
+    """
+    Loads the records (frames) of a primary output. Sharded outputs are reassembled from their
+    parts, concatenating the row blocks that belong to the same frame.
+
+    Returns:
+        list: Records as written by the converter.
+    """
+    path = Path(path)
+    with open(path, "rb") as file:
+        document = orjson.loads(file.read())
+
+    if not path.name.endswith(MANIFEST_SUFFIX):
+        return document
+
+    records = {}
+    for part in document.get("parts", []):
+        with open(path.parent / part["file"], "rb") as part_file:
+            part_record = orjson.loads(part_file.read())[0]
+
+        frame_index = part["frame_index"]
+        if frame_index not in records:
+            records[frame_index] = part_record
+        else:
+            records[frame_index]["data"].extend(part_record.get("data", []))
+            # Flattened array channels were sliced along with the rows
+            for curve, part_curve in zip(records[frame_index]["curves"], part_record.get("curves", [])):
+                values = part_record.get("arrays", {}).get(curve["name"])
+                if values is not None:
+                    records[frame_index]["arrays"][curve["name"]].extend(values)
+                    curve["shape"][0] += part_curve["shape"][0]
+
+    return [records[frame_index] for frame_index in sorted(records)]
@@ -0,0 +1,179 @@
+"""
+    Pipelined writing of JSON Well Log outputs.
+
+    A conversion is split into stages connected by bounded queues, each running in its own thread:
+    |_extract     iterates the scanner's records (frame N+1 is extracted ...)
+    |_serialize   encodes each record for the file and for the checksum (... while frame N is serialized ...)
+    |_write       appends the encoded records to the output file (... and frame N-1 is written ...)
+    |_hash        feeds the normalised encoding to the checksum (... and hashed)
+
+    dlisio, orjson, file writes and hashlib release the GIL for most of their work, so the
+    stages overlap. The queues hold at most `queue_size` records, which bounds the memory held
+    in flight.
+
+    The file is byte-identical to `JsonSerializable.to_json_bytes(records)` and the checksum
+    equal to `calculate_json_checksum` of it, without reading the file back.
+"""
+import hashlib
+import os
+import queue
+import threading
+import orjson
+from pathlib import Path
+from utils.SerialiseJson import JsonSerializable
+from utils.json_index import encode_indented
+
+_END = object()
+_POLL_SECONDS = 0.1
+
+
+class _Stop(Exception):
+    """
+    Raised in a stage when another stage failed.
+    """
+
+
+class _Pipeline:
+
+    def __init__(self, queue_size):
+        self._queue_size = max(int(queue_size), 1)
+        self._failed = threading.Event()
+        self._errors = []
+        self._threads = []
+
+    def queue(self):
+        return queue.Queue(maxsize=self._queue_size)
+
+    def put(self, target, item):
+        while True:
+            if self._failed.is_set():
+                raise _Stop()
+            try:
+                target.put(item, timeout=_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    def get(self, source):
+        while True:
+            if self._failed.is_set():
+                raise _Stop()
+            try:
+                return source.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+
+    def stage(self, name, target):
+        def run():
+            try:
+                target()
+            except _Stop:
+                pass
+            except BaseException as e:
+                self._errors.append(e)
+                self._failed.set()
+
+        thread = threading.Thread(target=run, name=f"pipeline-{name}", daemon=True)
+        self._threads.append(thread)
+        thread.start()
+
+    def join(self):
+        try:
+            for thread in self._threads:
+                thread.join()
+        except BaseException:
+            # e.g. MemoryLimitExceeded raised in the main thread: stop the stages too
+            self._failed.set()
+            raise
+        if self._errors:
+            raise self._errors[0]
+
+
+def write_json_pipelined(records, output_path, logger, queue_size=2, on_record=None, algorithm="blake2b"):
+    """
+    Serializes, writes and hashes records while the next ones are still being produced.
+
+    Args:
+        records (iterable): Records to write, e.g. a scanner's `iter_records()` generator.
+        output_path (str or Path): Output JSON file.
+        logger: Logger instance.
+        queue_size (int, optional): Records buffered between two stages.
+        on_record (callable, optional): Called with each record in the extract stage, e.g. to
+            collect headers and curve names.
+        algorithm (str, optional): Hash algorithm of the checksum (default: 'blake2b').
+
+    Returns:
+        tuple: (checksum, output size in bytes, number of records)
+    """
+    output_path = Path(output_path)
+    pipeline = _Pipeline(queue_size)
+    to_serialize = pipeline.queue()
+    to_write = pipeline.queue()
+    to_hash = pipeline.queue()
+    outcome = {"records": 0, "size": 0, "checksum": None}
+
+    def extract():
+        for record in records:
+            if on_record is not None:
+                on_record(record)
+            pipeline.put(to_serialize, record)
+            outcome["records"] += 1
+        pipeline.put(to_serialize, _END)
+
+    def serialize():
+        while (record := pipeline.get(to_serialize)) is not _END:
+            record = JsonSerializable.to_json(record)
+            pipeline.put(to_write, encode_indented(record, 1))
+            pipeline.put(to_hash, orjson.dumps(record, option=orjson.OPT_SORT_KEYS))
+        pipeline.put(to_write, _END)
+        pipeline.put(to_hash, _END)
+
+    def write():
+        written = 0
+        with open(output_path, "wb") as output_file:
+            while (encoded := pipeline.get(to_write)) is not _END:
+                chunk = (b"[\n  " if not written else b",\n  ") + encoded
+                output_file.write(chunk)
+                outcome["size"] += len(chunk)
+                written += 1
+            closing = b"\n]" if written else b"[]"
+            output_file.write(closing)
+            outcome["size"] += len(closing)
+
+    def hash_records():
+        # Same bytes as orjson.dumps(records, option=OPT_SORT_KEYS), one record at a time
+        hash_func = hashlib.new(algorithm)
+        separator = b"["
+        while (normalised := pipeline.get(to_hash)) is not _END:
+            hash_func.update(separator + normalised)
+            separator = b","
+        hash_func.update(b"[]" if separator == b"[" else b"]")
+        outcome["checksum"] = hash_func.hexdigest()
+
+    pipeline.stage("extract", extract)
+    pipeline.stage("serialize", serialize)
+    pipeline.stage("write", write)
+    pipeline.stage("hash", hash_records)
+    pipeline.join()
+
+    logger.info(f"Pipelined {outcome['records']} records into {output_path} ({outcome['size']} bytes)")
+    return outcome["checksum"], outcome["size"], outcome["records"]
+
+
+def prefetch_file(filepath, logger=None):
+    """
+    Asks the kernel to read a file into the page cache in the background, so the conversion
+    that opens it next does not wait on the disk (or the NAS). A no-op where posix_fadvise is
+    not available.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(filepath, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        if logger:
+            logger.debug(f"Could not prefetch {filepath}: {e}")
@@ -0,0 +1,178 @@
+"""
+    Multi-resolution previews of the scalar curves of a conversion, so a viewer can draw an
+    overview of any log from a small file and fetch full resolution only for the visible
+    interval (see the index sidecar).
+
+    `{name}.preview.json` holds, for each record (LAS file or DLIS frame), one level per
+    decimation factor (e.g. 1/10, 1/100, 1/1000) with one of:
+    |_minmax    the minimum and maximum of every bin of `factor` samples, with the index at the
+    |           start of the bin; drawing both as an envelope keeps every spike visible
+    |_lttb      Largest-Triangle-Three-Buckets: the `rows / factor` samples of each curve that
+                best preserve its visual shape, with their own index values
+
+    Levels are computed with NumPy on the arrays the scanners already hold (`ScanRecord.columns`),
+    for all curves of a record at once. Null samples are NaN and written as null.
+"""
+import math
+import numpy as np
+import orjson
+from pathlib import Path
+from scanners.ScanRecord import ScanRecord
+from utils.output_files import output_name
+
+PREVIEW_METHOD_MINMAX = "minmax"
+PREVIEW_METHOD_LTTB = "lttb"
+PREVIEW_SUFFIX = ".preview.json"
+
+
+def minmax_envelope(index, matrix, factor):
+    """
+    Reduces every bin of `factor` rows to its minimum and maximum, ignoring NaN.
+
+    Args:
+        index (np.ndarray): Index values, shape (rows,).
+        matrix (np.ndarray): Curve values, shape (rows, curves).
+        factor (int): Rows per bin.
+
+    Returns:
+        tuple: (index at the start of each bin, minimums and maximums of shape (bins, curves))
+    """
+    rows, curves = matrix.shape
+    bins = math.ceil(rows / factor)
+    padded = np.full((bins * factor, curves), np.nan)
+    padded[:rows] = matrix
+    padded = padded.reshape(bins, factor, curves)
+    # fmin / fmax skip NaN and give NaN only for bins without any value, without warnings
+    return index[::factor], np.fmin.reduce(padded, axis=1), np.fmax.reduce(padded, axis=1)
+
+
+def lttb(index, matrix, threshold):
+    """
+    Selects `threshold` rows of every curve with Largest-Triangle-Three-Buckets. Buckets are
+    walked in order, as each selection depends on the previous one, while the triangle areas of
+    a bucket are computed for all curves at once.
+
+    Args:
+        index (np.ndarray): Index values, shape (rows,).
+        matrix (np.ndarray): Curve values, shape (rows, curves).
+        threshold (int): Rows selected per curve.
+
+    Returns:
+        np.ndarray: Selected row positions of shape (threshold, curves).
+    """
+    rows, curves = matrix.shape
+    if threshold >= rows:
+        return np.repeat(np.arange(rows)[:, None], curves, axis=1)
+    if threshold < 3:
+        # Only the end points, without buckets in between
+        return np.repeat(np.array([0, rows - 1][:max(threshold, 1)])[:, None], curves, axis=1)
+
+    # The first and last rows are always kept; the others are split into threshold - 2 buckets
+    every = (rows - 2) / (threshold - 2)
+    edges = np.append((np.arange(threshold - 1) * every).astype(np.int64) + 1, rows)
+    curve_positions = np.arange(curves)
+    selected = np.empty((threshold, curves), dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = rows - 1
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for bucket in range(threshold - 2):
+            start, end, next_end = edges[bucket], edges[bucket + 1], edges[bucket + 2]
+
+            # Average point of the next bucket (the last row for the last bucket)
+            following = matrix[end:next_end]
+            counts = np.count_nonzero(~np.isnan(following), axis=0)
+            average_y = np.nansum(following, axis=0) / counts
+            average_x = index[end:next_end].mean()
+
+            previous = selected[bucket]
+            previous_x = index[previous]
+            previous_y = matrix[previous, curve_positions]
+            areas = np.abs((previous_x - average_x) * (matrix[start:end] - previous_y)
+                           - (previous_x - index[start:end, None]) * (average_y - previous_y))
+            selected[bucket + 1] = start + np.where(np.isnan(areas), -1.0, areas).argmax(axis=0)
+    return selected
+
+
+def build_record_preview(record, levels, method=PREVIEW_METHOD_MINMAX):
+    """
+    Computes the preview levels of one record. The first curve is the index.
+
+    Args:
+        record (dict): Record produced by a scanner (a ScanRecord carries its arrays).
+        levels (list): Decimation factors, e.g. [10, 100, 1000]; factors not below the row count
+            are skipped.
+        method (str, optional): `minmax` or `lttb`.
+
+    Returns:
+        dict: Frame name, index curve, row count and levels, or None when the record has no
+        numeric index.
+    """
+    if method not in (PREVIEW_METHOD_MINMAX, PREVIEW_METHOD_LTTB):
+        raise ValueError(f"Unknown preview method: {method}")
+
+    split = ScanRecord.index_and_matrix(record)
+    if split is None:
+        return None
+    index_curve, index, names, matrix = split
+    rows = len(index)
+
+    preview_levels = []
+    for factor in sorted(set(levels)):
+        if factor <= 1 or factor >= rows:
+            continue
+        if method == PREVIEW_METHOD_MINMAX:
+            bin_index, minimums, maximums = minmax_envelope(index, matrix, factor)
+            # One contiguous row per curve, as orjson serializes contiguous arrays only
+            minimums, maximums = np.ascontiguousarray(minimums.T), np.ascontiguousarray(maximums.T)
+            preview_levels.append({
+                "factor": factor,
+                "rows": len(bin_index),
+                "index": np.ascontiguousarray(bin_index),
+                "curves": {name: {"min": minimums[position], "max": maximums[position]}
+                           for position, name in enumerate(names)},
+            })
+        else:
+            selected = lttb(index, matrix, math.ceil(rows / factor))
+            preview_levels.append({
+                "factor": factor,
+                "rows": len(selected),
+                "curves": {name: {"index": index[selected[:, position]],
+                                  "values": matrix[selected[:, position], position]}
+                           for position, name in enumerate(names)},
+            })
+
+    return {
+        "frame": ScanRecord.frame_name(record),
+        "index": {"name": index_curve["name"], "unit": index_curve.get("unit"),
+                  "min": np.nanmin(index) if rows else None, "max": np.nanmax(index) if rows else None},
+        "rows": rows,
+        "levels": preview_levels,
+    }
+
+
+def write_preview(record_previews, output_path, method, levels):
+    """
+    Writes the previews of a conversion's records next to its output.
+
+    Args:
+        record_previews (list): Results of `build_record_preview`, one per record (None skipped).
+        output_path (str or Path): Primary output (`{name}.json` or `{name}.manifest.json`).
+        method (str): Method used for the levels.
+        levels (list): Decimation factors requested.
+
+    Returns:
+        Path: The preview file.
+    """
+    output_path = Path(output_path)
+    name = output_name(output_path)
+    preview_path = output_path.with_name(f"{name}{PREVIEW_SUFFIX}")
+
+    document = {
+        "name": name,
+        "method": method,
+        "levels": sorted(set(levels)),
+        "records": [preview for preview in record_previews if preview is not None],
+    }
+    preview_path.write_bytes(orjson.dumps(document, option=orjson.OPT_SERIALIZE_NUMPY))
+    return preview_path
@@ -0,0 +1,112 @@
+"""
+    Opt-in profiling of individual conversions.
+
+    A conversion is profiled when profiling is enabled for every task, when a `{input}.profile`
+    marker file sits next to the input, or when it is picked by 1-in-N sampling. Profiled
+    conversions run under cProfile and tracemalloc and leave three reports next to the task log:
+    |_{log}.prof                  cProfile stats, for pstats / snakeviz
+    |_{log}.profile.txt           top functions by cumulative time
+    |_{log}.alloc.txt             peak traced memory and the allocation sites still holding
+                                  the most memory when the conversion ends
+
+    cProfile only sees the calling thread; with INTRA_FILE_PARALLELISM above 1 the per-frame
+    work done by pool threads shows up as waits on their futures.
+"""
+import io
+import os
+import random
+from contextlib import contextmanager, nullcontext
+
+PROFILE_MARKER_SUFFIX = ".profile"
+
+
+def should_profile(filepath, enabled=False, sample_every=0):
+    """
+    Decides whether a conversion is profiled.
+
+    Args:
+        filepath (str or Path): Input file of the conversion.
+        enabled (bool, optional): Profile every conversion.
+        sample_every (int, optional): Profile 1 in `sample_every` conversions (0 disables sampling).
+
+    Returns:
+        str or None: Why the conversion is profiled, or None.
+    """
+    if enabled:
+        return "enabled"
+    if os.path.exists(f"{filepath}{PROFILE_MARKER_SUFFIX}"):
+        return "marker"
+    if sample_every and sample_every > 0 and random.random() < 1 / sample_every:
+        return "sampled"
+    return None
+
+
+@contextmanager
+def _profile(report_prefix, logger, top, trace_allocations):
+    import cProfile
+    import pstats
+    import tracemalloc
+
+    started_tracing = False
+    if trace_allocations and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        started_tracing = True
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        if started_tracing:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            peak = None
+
+        try:
+            profiler.dump_stats(f"{report_prefix}.prof")
+
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(top)
+            with open(f"{report_prefix}.profile.txt", "w", encoding="utf-8") as report:
+                report.write(stream.getvalue())
+
+            if snapshot is not None:
+                with open(f"{report_prefix}.alloc.txt", "w", encoding="utf-8") as report:
+                    if peak is not None:
+                        report.write(f"Peak traced memory: {peak / (1024 * 1024):.1f} MB\n\n")
+                    for statistic in snapshot.statistics("lineno")[:top]:
+                        report.write(f"{statistic}\n")
+
+            logger.info(f"Profiling reports written to {report_prefix}.prof / .profile.txt / .alloc.txt")
+        except OSError as e:
+            logger.error(f"Unable to write profiling reports {report_prefix}: {e}")
+
+
+def profile_conversion(filepath, log_filepath, logger, enabled=False, sample_every=0, top=40,
+                       trace_allocations=True, report_suffix=""):
+    """
+    Returns a context manager profiling the conversion of `filepath` if it is selected, and a
+    no-op context otherwise, so unprofiled conversions pay nothing beyond the marker check.
+
+    Args:
+        filepath (str or Path): Input file of the conversion.
+        log_filepath (str): Path of the task log; reports are written next to it.
+        logger: Logger instance.
+        enabled (bool, optional): Profile every conversion.
+        sample_every (int, optional): Profile 1 in `sample_every` conversions.
+        top (int, optional): Number of entries in the text reports.
+        trace_allocations (bool, optional): Also trace allocations with tracemalloc.
+        report_suffix (str, optional): Appended to the report names, for logs shared by several
+            conversions.
+    """
+    reason = should_profile(filepath, enabled=enabled, sample_every=sample_every)
+    if reason is None:
+        return nullcontext()
+
+    logger.info(f"Profiling conversion of {filepath} ({reason})")
+    report_prefix = log_filepath[:-len(".log")] if log_filepath.endswith(".log") else log_filepath
+    report_prefix += report_suffix
+    return _profile(report_prefix, logger, top, trace_allocations)
@@ -0,0 +1,169 @@
+import math
+import os
+import re
+import orjson
+from glob import escape as glob_escape
+from pathlib import Path
+from utils.SerialiseJson import JsonSerializable
+from utils.calculate_checksum_and_size import calculate_json_checksum
+from utils.json_index import write_indexed_json, index_path_for
+
+SHARDING_NONE = "none"
+SHARDING_FRAME = "frame"
+SHARDING_ROWS = "rows"
+SHARDING_MODES = (SHARDING_NONE, SHARDING_FRAME, SHARDING_ROWS)
+
+
+def _index_value(rows, position):
+    """
+    Returns the index (first column) value of a data row, or None if the row has no values.
+    """
+    try:
+        value = rows[position][0]
+    except (IndexError, TypeError):
+        return None
+    return value[0] if isinstance(value, list) and value else value
+
+
+def _slice_arrays(record, row_start, row_end):
+    """
+    Returns the flattened array channels of a record restricted to a block of rows, and the
+    curve definitions with their shapes adjusted to it.
+    """
+    curves = []
+    arrays = {}
+    for curve in record.get("curves", []):
+        values = record["arrays"].get(curve.get("name"))
+        if values is None or "shape" not in curve:
+            curves.append(curve)
+            continue
+        elements = math.prod(curve["shape"][1:])
+        arrays[curve["name"]] = values[row_start * elements:row_end * elements]
+        curves.append({**curve, "shape": [row_end - row_start, *curve["shape"][1:]]})
+    return curves, arrays
+
+
+def split_records(records, mode, rows_per_part):
+    """
+    Splits scanned records into parts.
+
+    Args:
+        records (list): Records produced by a scanner (one per frame for DLIS, one for LAS).
+        mode (str): `frame` writes one part per record, `rows` one part per block of rows.
+        rows_per_part (int): Rows per part in `rows` mode.
+
+    Yields:
+        tuple: (part record, frame index, first row, end row)
+    """
+    if mode not in (SHARDING_FRAME, SHARDING_ROWS):
+        raise ValueError(f"Unknown sharding mode: {mode}")
+    for frame_index, record in enumerate(records):
+        rows = record.get("data", [])
+
+        if mode == SHARDING_FRAME or rows_per_part <= 0 or len(rows) <= rows_per_part:
+            yield record, frame_index, 0, len(rows)
+            continue
+
+        for row_start in range(0, len(rows), rows_per_part):
+            row_end = min(row_start + rows_per_part, len(rows))
+            part = dict(record)
+            part["data"] = rows[row_start:row_end]
+            if "arrays" in record:
+                part["curves"], part["arrays"] = _slice_arrays(record, row_start, row_end)
+            yield part, frame_index, row_start, row_end
+
+
+def _remove_stale_parts(output_folder, base_name, written, logger):
+    """
+    Removes the parts (and part index sidecars) of an earlier run that the new manifest does not list.
+    """
+    pattern = re.compile(re.escape(base_name) + r"\.part\d{5}(\.index)?\.json")
+    for path in output_folder.glob(f"{glob_escape(base_name)}.part*.json"):
+        if pattern.fullmatch(path.name) and path.name not in written:
+            path.unlink()
+            logger.info(f"Removed stale part {path.name}")
+
+
+def write_sharded_output(records, output_folder, base_name, mode, rows_per_part, logger, index_block_rows=None):
+    """
+    Writes scanned records as part files plus a manifest.
+
+    Each part is a complete JSON Well Log document (a list with one record) holding one frame or
+    one block of rows, so existing readers can open any part on its own. The manifest lists the
+    parts with their frame, row range, index range, row count and checksum.
+
+    Args:
+        records (list): Records produced by a scanner.
+        output_folder (Path): Folder for the parts and the manifest.
+        base_name (str): Output name without extension, e.g. `{stem}{logical_file_id}`.
+        mode (str): `frame` or `rows`.
+        rows_per_part (int): Rows per part in `rows` mode.
+        logger: Logger instance.
+        index_block_rows (int, optional): When set, each part gets an index sidecar with row
+            blocks of this size.
+
+    Returns:
+        tuple: (manifest path, manifest dict)
+    """
+    if mode not in (SHARDING_FRAME, SHARDING_ROWS):
+        raise ValueError(f"Unknown sharding mode: {mode}")
+    output_folder = Path(output_folder)
+    parts = []
+    frames = []
+    written = set()
+
+    for frame_index, record in enumerate(records):
+        rows = record.get("data", [])
+        frames.append({
+            "frame_index": frame_index,
+            "name": next(iter((record.get("frame") or {}).get("objects", {})), None),
+            "row_count": len(rows),
+            "index_start": _index_value(rows, 0),
+            "index_end": _index_value(rows, -1),
+            "curves": [curve.get("name") for curve in record.get("curves", [])],
+            "parts": [],
+        })
+
+    for part_number, (part, frame_index, row_start, row_end) in enumerate(split_records(records, mode, rows_per_part)):
+        part_path = output_folder / f"{base_name}.part{part_number:05d}.json"
+
+        written.add(part_path.name)
+        if index_block_rows:
+            write_indexed_json([part], part_path, block_rows=index_block_rows)
+            written.add(index_path_for(part_path).name)
+        else:
+            with open(part_path, "wb") as part_file:
+                part_file.write(JsonSerializable.to_json_bytes([part]))
+
+        rows = part.get("data", [])
+        parts.append({
+            "file": part_path.name,
+            "frame_index": frame_index,
+            "row_start": row_start,
+            "row_end": row_end,
+            "row_count": row_end - row_start,
+            "index_start": _index_value(rows, 0),
+            "index_end": _index_value(rows, -1),
+            "checksum": calculate_json_checksum(part_path),
+            "size": os.path.getsize(part_path),
+        })
+        frames[frame_index]["parts"].append(part_number)
+        logger.info(f"Wrote part {part_path.name} (frame {frame_index}, rows {row_start}-{row_end})")
+
+    manifest = {
+        "name": base_name,
+        "sharding": mode,
+        "rows_per_part": rows_per_part if mode == SHARDING_ROWS else None,
+        "frames": frames,
+        "parts": parts,
+    }
+
+    manifest_path = output_folder / f"{base_name}.manifest.json"
+    with open(manifest_path, "wb") as manifest_file:
+        manifest_file.write(orjson.dumps(JsonSerializable.to_json(manifest), option=orjson.OPT_INDENT_2))
+
+    # A re-run with fewer parts must not leave the extra parts of the previous output behind
+    _remove_stale_parts(output_folder, base_name, written, logger)
+
+    logger.info(f"Wrote manifest {manifest_path.name} with {len(parts)} parts")
+    return manifest_path, manifest
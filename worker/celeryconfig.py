@@ -3,6 +3,7 @@
 from pathlib import Path
 import os
 import warnings
+from .workerconfig import WORKER_CONFIG
 
 # Suppress CPendingDeprecationWarnings
 warnings.filterwarnings("ignore", category=PendingDeprecationWarning)
@@ -20,6 +21,17 @@ _folders = {
 for folder in _folders.values():
     folder.mkdir(exist_ok=True)
 
+# Consumed broker messages are only kept when STORE_PROCESSED_MESSAGES is enabled
+_processed_messages_folder = _root.joinpath("processed")
+_processed_messages_folder.mkdir(exist_ok=True)
+
+# Folder of pending broker messages, read by the watcher for the queue depth metric
+broker_folder = _folders["data_folder_in"]
+
+# Folders cleaned up by the retention policy
+results_folder = _backend_folder
+processed_messages_folder = _processed_messages_folder
+
 # Create 'summary' folder for the CSV file
 _summary_folder = _root.joinpath("summary")
 _summary_folder.mkdir(exist_ok=True, parents=True)
@@ -29,6 +41,7 @@ las_csv_path = _summary_folder / "las_scanned_files.csv"
 las_header_file_path = _summary_folder / "las_headers.json"  # Persistent header storage
 dlis_csv_path = _summary_folder / "dlis_scanned_files.csv"
 dlis_header_file_path = _summary_folder / "dlis_headers.json"  # Persistent header storage
+curve_statistics_csv_path = _summary_folder / "curve_statistics.csv"  # One row per curve and record
 
 # Set the CSV_PATH environment variable
 os.environ["LAS_CSV_PATH"] = str(las_csv_path)
@@ -38,8 +51,15 @@ os.environ["DLIS_CSV_PATH"] = str(dlis_csv_path)
 broker_url = "filesystem://localhost//"
 result_backend = f"file:///{os.path.normpath(_backend_folder).replace(os.sep, '/')}"
 broker_transport_options = {k: str(v) for k, v in _folders.items()}
+broker_transport_options.update({
+    "store_processed": WORKER_CONFIG["STORE_PROCESSED_MESSAGES"],
+    "processed_folder": str(_processed_messages_folder),
+})
 task_serializer = "json"
 persist_results = True
+result_expires = WORKER_CONFIG["RESULTS_TTL_SECONDS"]
+# Recycle pool children whose resident memory grew past the limit (Celery expects KiB)
+worker_max_memory_per_child = WORKER_CONFIG["MAX_MEMORY_PER_CHILD_MB"] * 1024 or None
 result_serializer = "json"
 accept_content = ["json"]
 imports = ("worker.tasks",)
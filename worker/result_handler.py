@@ -1,11 +1,14 @@
 import os
 import csv
 from .celeryconfig import las_csv_path, dlis_csv_path
-from .celeryconfig import las_header_file_path, dlis_header_file_path
+from .celeryconfig import las_header_file_path, dlis_header_file_path, curve_statistics_csv_path
 from . import app
 import json
 from utils.logger import Logger
+from utils import metrics
 from mappings.WellLogsFormat import WellLogFormat
+from search import SearchIndex, SEARCH_CONFIG, document_from_result
+from .workerconfig import WORKER_CONFIG
 
 def load_headers(file_format):
     """
@@ -39,6 +42,13 @@ def append_row_to_csv(row, global_headers, file_format, file_logger):
     Append a row to the CSV file without rewriting the entire file.
     If new headers are added, the file header is updated.
     """
+    append_rows_to_csv([row], global_headers, file_format, file_logger)
+
+def append_rows_to_csv(rows, global_headers, file_format, file_logger):
+    """
+    Append rows to the CSV file without rewriting the entire file.
+    If new headers are added, the file header is updated once for all rows.
+    """
     # Check if the file exists
     if file_format == WellLogFormat.DLIS.value:
         file_exists = os.path.exists(dlis_csv_path)
@@ -61,11 +71,14 @@ def append_row_to_csv(row, global_headers, file_format, file_logger):
                 file_logger.info("Rewriting CSV headers due to new fields.")
                 rewrite_csv_headers(global_headers, csv_path=csv_path, file_logger=file_logger)
 
-    # Append the row to the CSV file
+    # Append the rows to the CSV file
     with open(csv_path, mode="a", newline="", encoding="utf-8") as csv_file:
         writer = csv.DictWriter(csv_file, fieldnames=global_headers)
-        writer.writerow(row)
-        file_logger.info("Appended new row to CSV.")
+        if not file_exists:
+            # A new file needs its header row, otherwise the first row is read back as the header
+            writer.writeheader()
+        writer.writerows(rows)
+        file_logger.info(f"Appended {len(rows)} new row(s) to CSV.")
 
 def rewrite_csv_headers(global_headers, csv_path, file_logger):
     """
@@ -106,6 +119,76 @@ def update_csv(result, file_logger):
     append_row_to_csv(result, global_headers, file_format=result['input_file_format'], file_logger=file_logger)
     file_logger.info(f"CSV updated successfully for {result['file_name']}")
 
+def update_csv_batch(results, file_logger):
+    """
+    Update the CSV files with many results at once: headers are loaded, extended and saved once
+    per format and all rows of a format are appended in a single write.
+    :param results: List of metadata dicts about conversions.
+    """
+    by_format = {}
+    for result in results:
+        by_format.setdefault(result['input_file_format'], []).append(result)
+
+    for file_format, rows in by_format.items():
+        global_headers = load_headers(file_format=file_format)
+
+        for row in rows:
+            for header in row.keys():
+                if header not in global_headers:
+                    global_headers.append(header)
+
+        save_headers(global_headers, file_format=file_format)
+        append_rows_to_csv(rows, global_headers, file_format=file_format, file_logger=file_logger)
+        file_logger.info(f"CSV updated successfully for {len(rows)} {file_format} files")
+
+def update_curve_statistics_csv(rows, file_logger):
+    """
+    Append per-curve statistics rows to the curve statistics CSV, extending its header when rows
+    bring new columns (e.g. other percentiles).
+    :param rows: Rows produced by the conversion, one per curve and record.
+    """
+    if not rows:
+        return
+
+    current_headers = []
+    if os.path.exists(curve_statistics_csv_path):
+        with open(curve_statistics_csv_path, "r", newline="", encoding="utf-8") as csv_file:
+            current_headers = csv.DictReader(csv_file).fieldnames or []
+
+    headers = list(current_headers)
+    for row in rows:
+        for header in row.keys():
+            if header not in headers:
+                headers.append(header)
+
+    if current_headers and headers != current_headers:
+        file_logger.info("Rewriting curve statistics CSV headers due to new fields.")
+        rewrite_csv_headers(headers, csv_path=curve_statistics_csv_path, file_logger=file_logger)
+
+    with open(curve_statistics_csv_path, mode="a", newline="", encoding="utf-8") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=headers)
+        if not current_headers:
+            writer.writeheader()
+        writer.writerows(rows)
+    file_logger.info(f"Appended {len(rows)} curve statistics row(s) to CSV.")
+
+def update_search_index(results, file_logger):
+    """
+    Index the outputs of successful conversions in the search index. A failure is logged without
+    affecting the summary CSVs, and `python -m search rebuild` can catch up later.
+    :param results: List of metadata dicts about conversions, with their curve units.
+    """
+    documents = [document_from_result(result) for result in results if result.get("status") == "SUCCESS"]
+    if not WORKER_CONFIG["SEARCH_INDEX"] or not documents:
+        return
+    try:
+        with SearchIndex(SEARCH_CONFIG["INDEX_PATH"], busy_timeout=SEARCH_CONFIG["BUSY_TIMEOUT_SECONDS"],
+                         logger=file_logger) as index:
+            index.add_documents(documents)
+    except Exception as e:
+        metrics.inc("welllog_search_index_failures_total")
+        file_logger.error(f"Error updating search index: {e}")
+
 @app.task(bind=True)
 def handle_task_completion(self, result, log_filename, initial_task_id=None):
     """
@@ -122,12 +205,52 @@ def handle_task_completion(self, result, log_filename, initial_task_id=None):
         combined_task_ids = f"{initial_task_id}, {self.request.id}"
         result["task_id"] = combined_task_ids
 
+        # Curve statistics go to their own CSV, one row per curve, and curve units to the search index only
+        curve_statistics = result.pop("curve_statistics", None)
+        curve_units = result.pop("curve_units", None)
+
         # Update the CSV file
-        update_csv(result, file_logger)
+        with metrics.timer("welllog_summary_write_duration_seconds", format=result.get("input_file_format")):
+            update_csv(result, file_logger)
+            update_curve_statistics_csv(curve_statistics, file_logger)
+        update_search_index([{**result, "curve_units": curve_units}], file_logger)
         file_logger.info(f"CSV updated with task result: {result}")
 
         # Return a meaningful status
         return f"CSV updated for file: {result['file_name']}"
     except Exception as e:
+        metrics.inc("welllog_summary_write_failures_total")
+        file_logger.error(f"Error updating CSV: {e}")
+        return f"Error updating CSV for file: {result.get('file_name', 'Unknown')}"
+
+@app.task(bind=True)
+def handle_batch_completion(self, results, log_filename, initial_task_id=None):
+    """
+    Handle the completion of a batch task by updating the CSV files once for all its files.
+    This function is chained to run after `convert_batch_task`.
+    """
+    file_logger = Logger(log_filename).get_logger()
+    try:
+        if not isinstance(results, list):
+            raise ValueError(f"Expected results to be a list, got {type(results).__name__}")
+
+        # Combine initial task ID with the current task ID
+        combined_task_ids = f"{initial_task_id}, {self.request.id}"
+        curve_statistics, curve_units = [], []
+        for result in results:
+            result["task_id"] = combined_task_ids
+            curve_statistics.extend(result.pop("curve_statistics", None) or [])
+            curve_units.append(result.pop("curve_units", None))
+
+        with metrics.timer("welllog_summary_write_duration_seconds", format="batch"):
+            update_csv_batch(results, file_logger)
+            update_curve_statistics_csv(curve_statistics, file_logger)
+        update_search_index([{**result, "curve_units": units} for result, units in zip(results, curve_units)],
+                            file_logger)
+        file_logger.info(f"CSV updated with {len(results)} batch results")
+
+        return f"CSV updated for {len(results)} files"
+    except Exception as e:
+        metrics.inc("welllog_summary_write_failures_total")
         file_logger.error(f"Error updating CSV: {e}")
-        return f"Error updating CSV for file: {result.get('file_name', 'Unknown')}"
\ No newline at end of file
+        return f"Error updating CSV for batch {initial_task_id}"
@@ -0,0 +1,141 @@
+import os
+import shutil
+import time
+
+
+def purge_folder(folder, ttl_seconds, max_files, logger):
+    """
+    Deletes files from a broker/result folder by age and by count.
+
+    Files older than `ttl_seconds` are removed first; if more than `max_files` remain, the oldest
+    are removed until `max_files` are left. Sub-directories are left untouched.
+
+    Args:
+        folder (str or Path): Folder to clean.
+        ttl_seconds (int): Maximum file age in seconds (0 disables the age limit).
+        max_files (int): Maximum number of files to keep (0 disables the count limit).
+        logger: Logger instance.
+
+    Returns:
+        int: Number of files deleted.
+    """
+    if not os.path.isdir(folder):
+        return 0
+
+    now = time.time()
+    removed = 0
+    kept = []
+
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            try:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                modified = entry.stat(follow_symlinks=False).st_mtime
+                if ttl_seconds and now - modified > ttl_seconds:
+                    os.remove(entry.path)
+                    removed += 1
+                else:
+                    kept.append((modified, entry.path))
+            except FileNotFoundError:
+                continue  # Removed concurrently by another process
+            except OSError as e:
+                logger.warning(f"Unable to purge {entry.path}: {e}")
+
+    if max_files and len(kept) > max_files:
+        kept.sort()
+        for _, path in kept[:len(kept) - max_files]:
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.warning(f"Unable to purge {path}: {e}")
+
+    if removed:
+        logger.info(f"Purged {removed} files from {folder}")
+    return removed
+
+
+def purge_subfolders(folder, ttl_seconds, logger):
+    """
+    Deletes the sub-folders of `folder` whose files were all last modified more than
+    `ttl_seconds` ago, e.g. abandoned conversion checkpoints.
+
+    Args:
+        folder (str or Path): Folder holding the sub-folders.
+        ttl_seconds (int): Maximum age in seconds of the newest file of a sub-folder (0 disables it).
+        logger: Logger instance.
+
+    Returns:
+        int: Number of sub-folders deleted.
+    """
+    if not ttl_seconds or not os.path.isdir(folder):
+        return 0
+
+    now = time.time()
+    removed = 0
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            try:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                modified = [os.stat(os.path.join(root, file_name)).st_mtime
+                            for root, _, files in os.walk(entry.path) for file_name in files]
+                # Empty folders are aged by their own modification time
+                newest = max(modified) if modified else entry.stat(follow_symlinks=False).st_mtime
+                if now - newest > ttl_seconds:
+                    shutil.rmtree(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                continue  # Removed concurrently by another process
+            except OSError as e:
+                logger.warning(f"Unable to purge {entry.path}: {e}")
+
+    if removed:
+        logger.info(f"Purged {removed} folders from {folder}")
+    return removed
+
+
+class RetentionPolicy:
+    """
+    Applies the retention limits to the result backend and processed broker messages, and runs
+    the other clean-ups (expired checkpoints and claims), at most once per `interval_seconds`.
+    """
+
+    def __init__(self, folders, ttl_seconds, max_files, interval_seconds, logger, cleanups=None):
+        """
+        Args:
+            folders (list): Folders to clean (result backend, processed messages).
+            ttl_seconds (int): Maximum file age in seconds.
+            max_files (int): Maximum number of files kept per folder.
+            interval_seconds (int): Minimum time between two clean-ups.
+            logger: Logger instance.
+            cleanups (dict, optional): Name -> callable returning the number of entries deleted.
+        """
+        self._folders = folders
+        self._cleanups = cleanups or {}
+        self._ttl_seconds = ttl_seconds
+        self._max_files = max_files
+        self._interval_seconds = interval_seconds
+        self._logger = logger
+        self._last_run = 0
+
+    def run_if_due(self):
+        if time.time() - self._last_run < self._interval_seconds:
+            return 0
+        self._last_run = time.time()
+
+        removed = 0
+        for folder in self._folders:
+            try:
+                removed += purge_folder(folder, self._ttl_seconds, self._max_files, self._logger)
+            except Exception as e:
+                self._logger.error(f"Error applying retention to {folder}: {e}")
+        for name, cleanup in self._cleanups.items():
+            try:
+                removed += cleanup()
+            except Exception as e:
+                self._logger.error(f"Error applying retention to {name}: {e}")
+        return removed
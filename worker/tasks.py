@@ -1,18 +1,42 @@
 from . import app
+from .workerconfig import WORKER_CONFIG
 from utils.SerialiseJson import JsonSerializable
-from worker.result_handler import handle_task_completion
+from worker.result_handler import handle_task_completion, handle_batch_completion
 from celery import chain
 import os
+from contextlib import ExitStack
 from pathlib import Path
 from utils.file_creation_time import get_file_creation_time
 from utils.calculate_checksum_and_size import calculate_json_checksum
-from utils.IdentifyWellLogFormat import WellLogFormat
+from utils.sharded_output import write_sharded_output, SHARDING_NONE, SHARDING_MODES
+from utils.json_index import write_indexed_json
+from utils.blob_output import offload_array_channels
+from utils.pipeline import write_json_pipelined, prefetch_file
+from utils.previews import build_record_preview, write_preview
+from utils.curve_statistics import compute_record_statistics, annotate_curves, summary_rows
+from utils.merged_output import extract_frame, write_merged_output
+from utils.claims import complete_unit, conversion_unit, FILE_UNIT
+from utils.containers import (open_member_text, materialize_member, member_output_stem, iter_member_streams,
+                              peek_member, member_text, member_temp_file)
+from utils.WellLogSniffer import WellLogSniffer
+from utils.ConversionCheckpoint import ConversionCheckpoint
+from scanners.DLISMetadataCache import DLISMetadataCache
+from mappings.WellLogsFormat import WellLogFormat
 import traceback
 from scanners.las_scanner import LasScanner
 from scanners.dlis_scanner import DLISScanner
 from dlisio import dlis
 from utils.logger import Logger
+from utils import metrics
+from utils.profiling import profile_conversion
+from utils.MemoryMonitor import MemoryMonitor, MemoryLimitExceeded
 from datetime import datetime
+import time
+
+metrics.configure("worker")
+
+# Metadata processor outputs shared by the conversions run in this worker process
+_metadata_cache = DLISMetadataCache(WORKER_CONFIG["METADATA_CACHE_SIZE"]) if WORKER_CONFIG["METADATA_CACHE_SIZE"] else None
 
 # Convert class name string back to class reference
 scanner_classes = {
@@ -30,14 +54,229 @@ def _extract_curve_names(json_data):
     Returns:
         str: Comma-separated string of unique curve names.
     """
-    curve_names = set()  # Use a set to automatically remove duplicates
+    curve_names = {}  # Dict keys remove duplicates and keep the curve order
     for record in json_data:
         curves = record.get("curves", [])
-        curve_names.update(curve.get("name", "Unknown") for curve in curves)
+        curve_names.update(dict.fromkeys(curve.get("name", "Unknown") for curve in curves))
 
     return ", ".join(curve_names) if curve_names else "None"
 
 
+def _extract_curve_units(json_data):
+    """
+    Extracts the unique (curve name, unit) pairs of the given JSON data, in curve order.
+
+    Args:
+        json_data (list): List of parsed JSON records.
+
+    Returns:
+        list: [name, unit] pairs, with None for curves without a unit.
+    """
+    def unit_of(curve):
+        unit = curve.get("unit")
+        # Missing DLIS units come out of the channel DataFrames as NaN
+        return None if isinstance(unit, float) and unit != unit else unit
+
+    pairs = dict.fromkeys((curve.get("name"), unit_of(curve))
+                          for record in json_data for curve in record.get("curves", []))
+    return [list(pair) for pair in pairs]
+
+
+MEMORY_ERROR = "MEMORY_ERROR"
+
+# Statuses written to the summary CSV by the completion tasks
+_RECORDED_STATUSES = ("SUCCESS", MEMORY_ERROR)
+
+# Fields kept in the task return value persisted by the result backend
+_RESULT_SUMMARY_FIELDS = ("task_id", "status", "file_name", "output_file", "message")
+
+
+def _record_conversion_metrics(result, started):
+    """
+    Records the duration, status and bytes of a conversion.
+    """
+    file_format = result.get("input_file_format")
+    metrics.inc("welllog_conversions_total", format=file_format, status=result.get("status"))
+    metrics.observe("welllog_conversion_duration_seconds", time.perf_counter() - started,
+                    format=file_format, size=metrics.size_bucket(result.get("input_file_size")))
+    if result.get("status") == "SUCCESS":
+        if isinstance(result.get("input_file_size"), int):
+            metrics.inc("welllog_input_bytes_total", result["input_file_size"], format=file_format)
+        if isinstance(result.get("output_file_size"), int):
+            metrics.inc("welllog_output_bytes_total", result["output_file_size"], format=file_format)
+
+
+def _record_metadata_cache_stats(scanner):
+    """
+    Records the DLIS metadata cache hits and misses of a scan in the metrics; they are kept out of
+    the result, so enabling the cache does not change the summary.
+    """
+    if _metadata_cache is None:
+        return
+    cache_stats = scanner.metadata_cache_stats
+    metrics.inc("welllog_metadata_cache_total", cache_stats["hits"], result="hit")
+    metrics.inc("welllog_metadata_cache_total", cache_stats["misses"], result="miss")
+
+
+def _build_preview(record, file_logger):
+    """
+    Computes the preview levels of a record; a record whose preview fails is left out of the preview.
+    """
+    try:
+        return build_record_preview(record, levels=WORKER_CONFIG["PREVIEW_LEVELS"],
+                                    method=WORKER_CONFIG["PREVIEW_METHOD"])
+    except Exception as e:
+        file_logger.error(f"Error computing preview: {e}")
+        file_logger.debug(traceback.format_exc())
+        return None
+
+
+def _build_statistics(record, file_logger):
+    """
+    Computes the statistics of a record's curves and adds them to the curve definitions; a record
+    whose statistics fail is left without them.
+    """
+    try:
+        record_statistics = compute_record_statistics(record, percentiles=WORKER_CONFIG["STATISTICS_PERCENTILES"],
+                                                      spike_threshold=WORKER_CONFIG["SPIKE_THRESHOLD"],
+                                                      flatline_min_samples=WORKER_CONFIG["FLATLINE_MIN_SAMPLES"])
+    except Exception as e:
+        file_logger.error(f"Error computing curve statistics: {e}")
+        file_logger.debug(traceback.format_exc())
+        return None
+    annotate_curves(record, record_statistics)
+    return record_statistics
+
+
+def _extract_frame(record, file_logger):
+    """
+    Takes the index and scalar curves of a frame for the merged output; a frame that fails is left out of it.
+    """
+    try:
+        return extract_frame(record)
+    except Exception as e:
+        file_logger.error(f"Error extracting frame for the merged output: {e}")
+        file_logger.debug(traceback.format_exc())
+        return None
+
+
+def _profiling(filepath, task_log, file_logger, report_suffix=""):
+    """
+    Profiles the conversion of `filepath` when selected, writing reports next to the task log.
+    """
+    return profile_conversion(filepath, log_filepath=task_log.log_filepath, logger=file_logger,
+                              enabled=WORKER_CONFIG["PROFILE_TASKS"],
+                              sample_every=WORKER_CONFIG["PROFILE_SAMPLE_EVERY"],
+                              top=WORKER_CONFIG["PROFILE_TOP"],
+                              trace_allocations=WORKER_CONFIG["PROFILE_TRACE_ALLOCATIONS"],
+                              report_suffix=report_suffix)
+
+
+def _run_conversion(task_id, filepath, output_folder, file_format, logical_file_id, task_log, file_logger,
+                    report_suffix="", archive_member=None, member_path=None, member_stream=None):
+    """
+    Runs `_convert_file` under the memory monitor (and the profiler when selected).
+
+    Returns:
+        dict: Result metadata of processing, with the peak RSS and major page faults of the
+        conversion. A conversion stopped at the soft memory limit has status MEMORY_ERROR.
+    """
+    monitor = MemoryMonitor(limit_mb=WORKER_CONFIG["MEMORY_SOFT_LIMIT_MB"],
+                            interval=WORKER_CONFIG["MEMORY_SAMPLE_SECONDS"],
+                            logger=file_logger)
+    try:
+        with monitor, _profiling(filepath, task_log, file_logger, report_suffix=report_suffix):
+            result = _convert_file(task_id=task_id, filepath=filepath, output_folder=output_folder,
+                                   file_format=file_format, logical_file_id=logical_file_id,
+                                   file_logger=file_logger, archive_member=archive_member,
+                                   member_path=member_path, member_stream=member_stream)
+    except MemoryLimitExceeded as e:
+        file_logger.error(f"Conversion of {filepath} stopped: {e}")
+        metrics.inc("welllog_conversions_total", format=file_format, status=MEMORY_ERROR)
+        metrics.inc("welllog_memory_limit_exceeded_total", format=file_format)
+        result = {
+            "status": MEMORY_ERROR,
+            "task_id": task_id,
+            "file_name": Path(archive_member or filepath).name,
+            "input_file_format": file_format,
+            "input_file_path": str(Path(filepath).resolve()),
+            "input_file_size": os.path.getsize(filepath) if os.path.exists(filepath) else "N/A",
+            "logical_file_id": logical_file_id,
+            "message": f"Memory limit exceeded: {e}",
+        }
+        if archive_member:
+            result.update({"archive_file": str(Path(filepath).resolve()), "archive_member": archive_member})
+
+    result.update(monitor.usage())
+    return result
+
+
+def _requeue_heavy(request, result, task_kwargs, file_logger):
+    """
+    Re-submits a conversion stopped at the memory limit to HEAVY_QUEUE, unless it already ran there.
+    """
+    heavy_queue = WORKER_CONFIG["HEAVY_QUEUE"]
+    current_queue = (request.delivery_info or {}).get("routing_key") if request else None
+    if not heavy_queue or current_queue == heavy_queue:
+        return
+
+    requeued = convert_to_json_task.apply_async(kwargs=task_kwargs, queue=heavy_queue)
+    result["requeued_task_id"] = requeued.id
+    result["message"] += f" Re-queued to {heavy_queue} as task {requeued.id}."
+    file_logger.info(f"Re-queued {task_kwargs['filepath']} to {heavy_queue}, Task ID: {requeued.id}")
+
+
+def _conversion_checkpoint(filepath, logical_file_id, file_logger, archive_member=None):
+    """
+    Returns the checkpoint of a DLIS logical file conversion, or None when checkpoints are disabled.
+    """
+    if not WORKER_CONFIG["CHECKPOINTS"] or logical_file_id is None:
+        return None
+    checkpoint_options = {"array_layout": WORKER_CONFIG["ARRAY_CHANNEL_LAYOUT"],
+                          "blob_min_elements": WORKER_CONFIG["BLOB_MIN_ELEMENTS"]}
+    if archive_member:
+        checkpoint_options["archive_member"] = archive_member
+    return ConversionCheckpoint(WORKER_CONFIG["CHECKPOINT_FOLDER"], filepath=filepath,
+                                logical_file_id=logical_file_id, logger=file_logger,
+                                options=checkpoint_options)
+
+
+def _discard_checkpoint(filepath, logical_file_id, file_logger, archive_member=None):
+    """
+    Deletes the checkpoint of a conversion that ended without output and will not be retried.
+    """
+    try:
+        checkpoint = _conversion_checkpoint(filepath, logical_file_id, file_logger, archive_member=archive_member)
+    except OSError:
+        return  # The input is gone; its checkpoint expires with the retention policy
+    if checkpoint:
+        checkpoint.clear()
+
+
+def _complete_claim_unit(claim_key, logical_file_id, file_logger, archive_member=None):
+    """
+    Records that this conversion unit of a claimed input file finished, whatever its status.
+    """
+    if claim_key:
+        complete_unit(claim_key, conversion_unit(logical_file_id, archive_member), logger=file_logger)
+
+
+def _summarise_result(result):
+    """
+    Reduces a conversion result to the fields needed to follow up on a task.
+
+    The full result (headers, checksums, curve names) is handed to the completion task through
+    the chain; persisting it again in the file result backend only grows data/results.
+
+    Args:
+        result (dict): Result metadata of processing.
+
+    Returns:
+        dict: Task ID, status, file name, output file and message.
+    """
+    return JsonSerializable.to_json({field: result.get(field) for field in _RESULT_SUMMARY_FIELDS})
+
+
 def _consolidate_headers(json_data):
     """
     Consolidates headers from multiple JSON records, ensuring:
@@ -73,8 +312,14 @@ def _consolidate_headers(json_data):
 
     return consolidated_header
 
-@app.task(bind=True)
-def convert_to_json_task(self, filepath, output_folder, file_format, logical_file_id=None):
+# Acknowledge after the task ran, so a conversion interrupted by a worker shutdown is restored to
+# the broker when the worker closes its channel; the retry resumes from the conversion checkpoint.
+# A hard kill of the worker still loses the message, as the filesystem broker deletes it when it is
+# received. A child process killed mid-task (OOM, segfault) acknowledges the message and fails the
+# task instead of requeueing it, so an input that crashes the worker cannot loop.
+@app.task(bind=True, acks_late=True)
+def convert_to_json_task(self, filepath, output_folder, file_format, logical_file_id=None, claim_key=None,
+                         archive_member=None):
     """
     Generic function to convert LAS or 222DLIS files to JSONWellLogFormat.
 
@@ -84,25 +329,301 @@ def convert_to_json_task(self, filepath, output_folder, file_format, logical_fil
         output_folder (Path): Path to save the output JSON file
         file_format (WellLogFormat): File format (LAS or DLIS)
         logical_file_id (optional): Logical file object name for DLIS processing
+        claim_key (str, optional): Key of the watcher's claim on the input file, completed when
+            the conversion finishes
+        archive_member (str, optional): Member to convert when `filepath` is an archive or a
+            compressed file
 
     Returns:
-        dict: Result metadata of processing
+        dict: Task ID, status, file name, output file and message; the full result metadata is
+        passed to the completion task
     """
     # instantiating a logger for each file
     log_filename = f'{os.path.basename(str(filepath))}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
-    file_logger = Logger(log_filename).get_logger()
+    task_log = Logger(log_filename)
+    file_logger = task_log.get_logger()
+
+    file_logger.info(f"Task received for processing: {filepath}{f' (member {archive_member})' if archive_member else ''}, "
+                     f"Format: {file_format}, Logical File ID: {logical_file_id}")
+
+    try:
+        with metrics.in_flight():
+            result = _run_conversion(task_id=self.request.id, filepath=filepath, output_folder=output_folder,
+                                     file_format=file_format, logical_file_id=logical_file_id,
+                                     task_log=task_log, file_logger=file_logger, archive_member=archive_member)
+    except Exception:
+        _complete_claim_unit(claim_key, logical_file_id, file_logger, archive_member=archive_member)
+        raise
+
+    if result["status"] == MEMORY_ERROR:
+        _requeue_heavy(self.request, result, dict(filepath=filepath, output_folder=output_folder,
+                                                  file_format=file_format, logical_file_id=logical_file_id,
+                                                  claim_key=claim_key, archive_member=archive_member),
+                       file_logger)
+        if not result.get("requeued_task_id"):
+            # The heavy queue resumes from the checkpoint; without it the conversion is over
+            _discard_checkpoint(filepath, logical_file_id, file_logger, archive_member=archive_member)
+
+    # A conversion re-queued to the heavy queue completes the claim there
+    if not result.get("requeued_task_id"):
+        _complete_claim_unit(claim_key, logical_file_id, file_logger, archive_member=archive_member)
+
+    if result["status"] in _RECORDED_STATUSES:
+        # Chain handle_task_completion
+        chain(handle_task_completion.s(result=JsonSerializable.to_json(result),
+                                       log_filename=log_filename,
+                                       initial_task_id=self.request.id)).apply_async()
+    return _summarise_result(result)
+
+
+@app.task(bind=True)
+def convert_batch_task(self, items):
+    """
+    Converts a batch of small files in one worker invocation.
+
+    Small files cost more in per-task overhead (broker message, log file, result file and a
+    chained completion task) than in conversion, so the watcher groups them. The batch shares one
+    log file and commits all successful results to the summary with a single completion task.
+
+    Args:
+        self: Celery task context
+        items (list): Dicts with `filepath`, `output_folder`, `file_format` and optionally
+            `logical_file_id`, `claim_key` and `archive_member`, as accepted by `convert_to_json_task`.
+
+    Returns:
+        list: Task ID, status, file name, output file and message, one per item
+    """
+    log_filename = f'batch_{datetime.now().strftime("%Y%m%d_%H%M%S")}_{str(self.request.id)[:8]}.log'
+    task_log = Logger(log_filename)
+    file_logger = task_log.get_logger()
+
+    file_logger.info(f"Batch task received for processing {len(items)} files")
+
+    results = []
+    with metrics.in_flight():
+        for position, item in enumerate(items):
+            file_logger.info(f"Processing batch item: {item['filepath']}, Format: {item['file_format']}")
+            if WORKER_CONFIG["PREFETCH_NEXT_FILE"] and position + 1 < len(items):
+                # Let the kernel read the next file while this one is converted
+                prefetch_file(items[position + 1]["filepath"], logger=file_logger)
+            try:
+                result = _run_conversion(task_id=self.request.id, filepath=item["filepath"],
+                                         output_folder=item["output_folder"], file_format=item["file_format"],
+                                         logical_file_id=item.get("logical_file_id"),
+                                         task_log=task_log, file_logger=file_logger,
+                                         report_suffix=f"_{os.path.basename(str(item['filepath']))}",
+                                         archive_member=item.get("archive_member"))
+                if result["status"] == MEMORY_ERROR:
+                    _requeue_heavy(self.request, result, dict(item), file_logger)
+                    if not result.get("requeued_task_id"):
+                        _discard_checkpoint(item["filepath"], item.get("logical_file_id"), file_logger,
+                                            archive_member=item.get("archive_member"))
+            except Exception as e:
+                # One bad file must not lose the rest of the batch
+                file_logger.error(f"Error processing batch item {item['filepath']}: {e}")
+                file_logger.debug(traceback.format_exc())
+                result = {"status": "FAILED", "file_name": os.path.basename(str(item["filepath"])),
+                          "input_file_path": str(item["filepath"]), "message": str(e)}
+            if not result.get("requeued_task_id"):
+                _complete_claim_unit(item.get("claim_key"), item.get("logical_file_id"), file_logger,
+                                     archive_member=item.get("archive_member"))
+            results.append(result)
+
+    succeeded = [result for result in results if result["status"] == "SUCCESS"]
+    file_logger.info(f"Batch completed: {len(succeeded)} of {len(results)} files converted")
+
+    recorded = [result for result in results if result["status"] in _RECORDED_STATUSES]
+    if recorded:
+        chain(handle_batch_completion.s(results=JsonSerializable.to_json(recorded),
+                                        log_filename=log_filename,
+                                        initial_task_id=self.request.id)).apply_async()
+    return [_summarise_result(result) for result in results]
+
+
+def _member_logical_file_ids(member_path, label, file_logger):
+    """
+    Lists the IDs of the logical files of a decompressed DLIS member, skipping unreadable headers.
+    """
+    logical_file_ids = []
+    with dlis.load(member_path) as logical_files:
+        for logical_file in logical_files:
+            try:
+                logical_file_ids.append(str(logical_file.fileheader.id))
+            except Exception as e:
+                file_logger.error(f"Error accessing logical file header in {label}: {e}")
+    return logical_file_ids
+
+
+@app.task(bind=True, acks_late=True)
+def convert_container_task(self, filepath, output_folder, members=None, claim_key=None):
+    """
+    Converts the LAS members, and every logical file of the DLIS members, of an archive or
+    compressed file.
 
-    file_logger.info(f"Task received for processing: {filepath}, Format: {file_format}, Logical File ID: {logical_file_id}")
+    The container is read once and each member is decompressed once: tar streams cannot be
+    rewound to a member without decompressing everything before it again. LAS members are parsed
+    from the decompressed stream (spooled in memory when it cannot seek), DLIS members are
+    decompressed to a temporary file shared by the conversions of all their logical files.
+    Conversions stopped at the memory limit are
+    re-queued to the heavy queue one by one, as `convert_to_json_task` with their member.
 
+    Args:
+        self: Celery task context
+        filepath (Path): Path to the archive or compressed file
+        output_folder (Path): Path to save the output JSON files
+        members (list, optional): Members to convert (default: all members)
+        claim_key (str, optional): Key of the watcher's claim on the container, completed for the
+            given members (or the whole file) when the task finishes
+
+    Returns:
+        list: Task ID, status, file name, output file and message, one per conversion
+    """
+    log_filename = f'{os.path.basename(str(filepath))}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
+    task_log = Logger(log_filename)
+    file_logger = task_log.get_logger()
+
+    file_logger.info(f"Container task received for processing: {filepath}"
+                     f"{f' (members {members})' if members else ''}")
+
+    results = []
+    try:
+        with metrics.in_flight():
+            for member, stream, member_size in iter_member_streams(filepath, members):
+                label = f"{filepath} (member {member})"
+                header, stream = peek_member(stream)
+                file_format = WellLogSniffer.detect_format(header).value
+
+                # The member's text stream or temporary file is released once all its logical files are done
+                with ExitStack() as member_resources:
+                    member_path = member_stream = None
+                    if file_format == WellLogFormat.LAS.value:
+                        member_stream = member_resources.enter_context(member_text(stream, member_size))
+                        logical_file_ids = [None]
+                    elif file_format == WellLogFormat.DLIS.value:
+                        member_path = member_resources.enter_context(
+                            member_temp_file(stream, member, member_size, filepath=filepath, logger=file_logger))
+                        logical_file_ids = _member_logical_file_ids(member_path, label, file_logger)
+                        file_logger.info(f"Loaded {len(logical_file_ids)} logical files from DLIS {label}")
+                    else:
+                        metrics.inc("welllog_files_rejected_total", format=file_format, reason="unknown_format")
+                        file_logger.warning(f"Unknown format: {label}")
+                        continue
+
+                    for logical_file_id in logical_file_ids:
+                        file_logger.info(f"Processing {label}, Format: {file_format}, Logical File ID: {logical_file_id}")
+                        try:
+                            result = _run_conversion(task_id=self.request.id, filepath=filepath,
+                                                     output_folder=output_folder, file_format=file_format,
+                                                     logical_file_id=logical_file_id,
+                                                     task_log=task_log, file_logger=file_logger,
+                                                     report_suffix=f"_{Path(member).name}{logical_file_id or ''}",
+                                                     archive_member=member, member_path=member_path,
+                                                     member_stream=member_stream)
+                            if result["status"] == MEMORY_ERROR:
+                                # The claim on the container is completed here, not by the heavy queue
+                                _requeue_heavy(self.request, result,
+                                               dict(filepath=filepath, output_folder=output_folder,
+                                                    file_format=file_format, logical_file_id=logical_file_id,
+                                                    archive_member=member), file_logger)
+                                if not result.get("requeued_task_id"):
+                                    _discard_checkpoint(filepath, logical_file_id, file_logger,
+                                                        archive_member=member)
+                        except Exception as e:
+                            # One bad member must not lose the rest of the container
+                            file_logger.error(f"Error processing {label}: {e}")
+                            file_logger.debug(traceback.format_exc())
+                            result = {"status": "FAILED", "file_name": Path(member).name,
+                                      "input_file_path": str(filepath), "archive_member": member,
+                                      "logical_file_id": logical_file_id, "message": str(e)}
+                        results.append(result)
+    except Exception as e:
+        file_logger.error(f"Error reading container {filepath}: {e}")
+        file_logger.debug(traceback.format_exc())
+        results.append({"status": "FAILED", "file_name": os.path.basename(str(filepath)),
+                        "input_file_path": str(filepath), "message": str(e)})
+    finally:
+        if claim_key:
+            units = [conversion_unit(archive_member=member) for member in members] if members else [FILE_UNIT]
+            for unit in units:
+                complete_unit(claim_key, unit, logger=file_logger)
+
+    succeeded = [result for result in results if result["status"] == "SUCCESS"]
+    file_logger.info(f"Container completed: {len(succeeded)} of {len(results)} conversions succeeded")
+
+    recorded = [result for result in results if result["status"] in _RECORDED_STATUSES]
+    if recorded:
+        chain(handle_batch_completion.s(results=JsonSerializable.to_json(recorded),
+                                        log_filename=log_filename,
+                                        initial_task_id=self.request.id)).apply_async()
+    return [_summarise_result(result) for result in results]
+
+
+def _convert_file(task_id, filepath, output_folder, file_format, logical_file_id, file_logger, archive_member=None,
+                  member_path=None, member_stream=None):
+    """
+    Converts one LAS file or DLIS logical file and writes its output.
+
+    Args:
+        task_id (str): ID of the Celery task doing the conversion
+        filepath (Path): Path to the input file
+        output_folder (Path): Path to save the output JSON file
+        file_format (WellLogFormat): File format (LAS or DLIS)
+        logical_file_id (optional): Logical file object name for DLIS processing
+        file_logger: Logger instance
+        archive_member (str, optional): Member of the archive or compressed file `filepath` to convert
+        member_path (Path, optional): DLIS member already decompressed to a temporary file, read
+            instead of decompressing it again
+        member_stream (tuple, optional): LAS member already opened as a text stream, with its
+            uncompressed size (see `utils.containers.member_text`)
+
+    Returns:
+        dict: Result metadata of processing, with status SUCCESS or FAILED
+    """
+    # Streams and temporary files of archive members are released when the conversion ends
+    with ExitStack() as resources:
+        return _convert_input(task_id=task_id, filepath=filepath, output_folder=output_folder,
+                              file_format=file_format, logical_file_id=logical_file_id,
+                              file_logger=file_logger, archive_member=archive_member, resources=resources,
+                              member_path=member_path, member_stream=member_stream)
+
+
+def _convert_input(task_id, filepath, output_folder, file_format, logical_file_id, file_logger, archive_member,
+                   resources, member_path=None, member_stream=None):
+    """
+    Body of `_convert_file`; archive members are opened in `resources` (an ExitStack).
+    """
+    started = time.perf_counter()
     filepath = Path(filepath).resolve()
     output_folder = Path(output_folder).resolve()
+    # Outputs mirror the folder structure of the upload tree
+    output_folder.mkdir(parents=True, exist_ok=True)
 
     creation_time = get_file_creation_time(filepath=filepath, file_logger=file_logger)
     logical_file = None
+    input_file_size = os.path.getsize(filepath) if filepath.exists() else "N/A"
+
+    # Members of archives are read without extracting them: LAS members are decompressed as a
+    # stream into the parser, DLIS members (which need random access) to a temporary file.
+    # Container tasks pass the member already opened, conversions of a single member open it here
+    source = filepath
+    if member_stream:
+        source, member_size = member_stream
+        input_file_size = member_size if member_size is not None else "N/A"
+    elif member_path:
+        source = Path(member_path)
+        input_file_size = os.path.getsize(source)
+    elif archive_member and file_format == WellLogFormat.DLIS.value:
+        source = resources.enter_context(materialize_member(filepath, archive_member, logger=file_logger))
+        input_file_size = os.path.getsize(source)
+    elif archive_member:
+        source, member_size = resources.enter_context(open_member_text(filepath, archive_member))
+        input_file_size = member_size if member_size is not None else "N/A"
 
     # DLIS-specific metadata
     if file_format == WellLogFormat.DLIS.value and logical_file_id is not None:
-        logical_files = dlis.load(filepath)
+        logical_files = dlis.load(source)
+        if archive_member:
+            resources.callback(logical_files.close)  # Before the temporary file is removed
         for single_logical_file in logical_files:
             try:
                 if str(single_logical_file.fileheader.id) == logical_file_id:
@@ -113,17 +634,22 @@ def convert_to_json_task(self, filepath, output_folder, file_format, logical_fil
 
 
     output_filename_suffix = logical_file_id if logical_file_id else ""
-    output_filename = f"{filepath.stem}{output_filename_suffix}.json"
-    output_file_path = output_folder / output_filename
+    if archive_member:
+        # Members are written under a folder named after their archive, mirroring their paths in it
+        output_file_path = output_folder / f"{member_output_stem(filepath, archive_member)}{output_filename_suffix}.json"
+        output_file_path.parent.mkdir(parents=True, exist_ok=True)
+    else:
+        output_filename = f"{filepath.stem}{output_filename_suffix}.json"
+        output_file_path = output_folder / output_filename
 
     # Initialize result structure
     result = {
         "status": "ERROR",
-        "task_id": self.request.id,
-        "file_name": filepath.name,
+        "task_id": task_id,
+        "file_name": Path(archive_member).name if archive_member else filepath.name,
         "input_file_format": file_format,
         "input_file_path": str(filepath),
-        "input_file_size": os.path.getsize(filepath) if filepath.exists() else "N/A",
+        "input_file_size": input_file_size,
         "input_file_creation_date": creation_time,
         "input_file_creation_user": "Unknown",
         "output_file": str(output_file_path),
@@ -131,20 +657,89 @@ def convert_to_json_task(self, filepath, output_folder, file_format, logical_fil
         "output_file_size": "Unknown",
         "message": "An error occurred during processing.",
     }
+    if archive_member:
+        # Summary rows point back to the archive holding the member
+        result.update({"archive_file": str(filepath), "archive_member": archive_member})
 
+    checkpoint = None
     try:
         scanner_cls = scanner_classes[file_format]  # Retrieve actual class
 
         file_logger.info(f"Scanning {file_format} file: {filepath}{f' (Logical File: {logical_file_id})' if logical_file else ''}...")
 
+        sharding = WORKER_CONFIG["OUTPUT_SHARDING"]
+        if sharding not in SHARDING_MODES:
+            # Rejected before scanning rather than silently written as another mode
+            raise ValueError(f"Unknown sharding mode: {sharding}")
+        index_block_rows = WORKER_CONFIG["INDEX_BLOCK_ROWS"] if WORKER_CONFIG["WRITE_INDEX_SIDECAR"] else None
+
+        # Pipelining streams the records into a single JSON document; sharded, indexed and blob
+        # outputs are written from the complete list of records
+        pipelined = (WORKER_CONFIG["PIPELINED_EXECUTION"] and sharding == SHARDING_NONE and not index_block_rows
+                     and WORKER_CONFIG["BLOB_MIN_ELEMENTS"] <= 0)
+
         # Initialize scanner
-        scanner = scanner_cls(file=filepath, logger=file_logger) if not logical_file else scanner_cls(file_path=filepath,
-                                                                                  logical_file=logical_file,
-                                                                                  logger=file_logger)
-        normalised_json = scanner.scan()
+        if not logical_file:
+            scanner = scanner_cls(file=source, logger=file_logger, name=archive_member)
+            normalised_json = scanner.scan()
+        else:
+            # The DLIS file itself, a temporary file for archive members, so threads can reopen it
+            scanner = scanner_cls(file_path=source,
+                                  logical_file=logical_file,
+                                  logger=file_logger,
+                                  parallelism=WORKER_CONFIG["INTRA_FILE_PARALLELISM"],
+                                  metadata_cache=_metadata_cache,
+                                  array_layout=WORKER_CONFIG["ARRAY_CHANNEL_LAYOUT"],
+                                  blob_min_elements=WORKER_CONFIG["BLOB_MIN_ELEMENTS"])
+            checkpoint = _conversion_checkpoint(filepath, logical_file_id, file_logger, archive_member=archive_member)
+            if pipelined:
+                # Frames are extracted as the pipeline consumes them
+                normalised_json = scanner.iter_records(checkpoint=checkpoint)
+            else:
+                normalised_json = scanner.scan(checkpoint=checkpoint)
+                _record_metadata_cache_stats(scanner)
+
+        # Previews and curve statistics are computed from the arrays the scanners hold, while the
+        # records are in memory and before they are serialized
+        previews = [] if WORKER_CONFIG["WRITE_PREVIEWS"] else None
+        records_statistics = [] if WORKER_CONFIG["CURVE_STATISTICS"] else None
+        # The frames of a logical file are held until the last one is read, then merged at once
+        merged_frames = [] if logical_file and WORKER_CONFIG["WRITE_MERGED_OUTPUT"] else None
+        merged_header = {}
+
+        def analyse_record(record):
+            if previews is not None:
+                previews.append(_build_preview(record, file_logger))
+            if records_statistics is not None:
+                records_statistics.append(_build_statistics(record, file_logger))
+            if merged_frames is not None:
+                merged_frames.append(_extract_frame(record, file_logger))
+                merged_header.update(record.get("header") or {})
+
+        checksum = None
+        if pipelined:
+            # Extraction, serialization, writing and hashing overlap; only the headers and curve
+            # definitions of the records are kept for the result
+            file_logger.info(f"Pipelining conversion of {filepath} into {output_file_path}...")
+            record_summaries = []
+
+            def on_record(record):
+                analyse_record(record)
+                record_summaries.append({"header": record.get("header", {}), "curves": record.get("curves", [])})
+
+            checksum, output_file_size, _ = write_json_pipelined(
+                normalised_json, output_file_path, logger=file_logger,
+                queue_size=WORKER_CONFIG["PIPELINE_QUEUE_SIZE"], on_record=on_record)
+            normalised_json = record_summaries
+            if logical_file:
+                _record_metadata_cache_stats(scanner)
+        else:
+            for record in normalised_json:
+                analyse_record(record)
 
         # Extract Curve Names
         result["Curve Names"] = _extract_curve_names(normalised_json)
+        curve_units = _extract_curve_units(normalised_json) if WORKER_CONFIG["SEARCH_INDEX"] else None
 
         # Consolidate Headers
         consolidated_header = _consolidate_headers(normalised_json)
@@ -152,30 +747,95 @@ def convert_to_json_task(self, filepath, output_folder, file_format, logical_fil
         # Merge result and dynamic headers
         result.update(consolidated_header)
 
-        # Serialize JSON data
-        file_logger.info(f"Serializing scanned data from {filepath}...")
-        json_bytes = JsonSerializable.to_json_bytes(normalised_json)
+        # Move large array channels to blob files, leaving references in the curve definitions
+        blob_paths = []
+        if WORKER_CONFIG["BLOB_MIN_ELEMENTS"] > 0:
+            blob_paths = offload_array_channels(normalised_json, output_folder=output_file_path.parent,
+                                                base_name=output_file_path.stem,
+                                                min_elements=WORKER_CONFIG["BLOB_MIN_ELEMENTS"],
+                                                blob_format=WORKER_CONFIG["BLOB_FORMAT"],
+                                                logger=file_logger)
+
+        if sharding != SHARDING_NONE:
+            # Write one part per frame / block of rows plus a manifest that points to them
+            file_logger.info(f"Writing sharded output ({sharding}) for {filepath}...")
+            output_file_path, manifest = write_sharded_output(normalised_json,
+                                                              output_folder=output_file_path.parent,
+                                                              base_name=output_file_path.stem,
+                                                              mode=sharding,
+                                                              rows_per_part=WORKER_CONFIG["SHARD_ROWS"],
+                                                              logger=file_logger,
+                                                              index_block_rows=index_block_rows)
+            output_file_size = os.path.getsize(output_file_path) + sum(part["size"] for part in manifest["parts"])
+            result.update({
+                "output_file": str(output_file_path),
+                "output_parts": len(manifest["parts"]),
+            })
+        elif index_block_rows:
+            # Serialize record by record, recording byte offsets in the index sidecar
+            file_logger.info(f"Saving JSON data with index sidecar to {output_file_path}...")
+            write_indexed_json(normalised_json, output_file_path, block_rows=index_block_rows)
+
+            output_file_size = os.path.getsize(output_file_path)
+        elif not pipelined:
+            # Serialize JSON data
+            file_logger.info(f"Serializing scanned data from {filepath}...")
+            json_bytes = JsonSerializable.to_json_bytes(normalised_json)
+
+            # Save JSON to file
+            file_logger.info(f"Saving JSON data to {output_file_path}...")
+            with open(output_file_path, "wb") as json_file:
+                json_file.write(json_bytes)
+
+            output_file_size = os.path.getsize(output_file_path) if output_file_path.exists() else "N/A"
+
+        if blob_paths:
+            result["output_blobs"] = len(blob_paths)
+            if isinstance(output_file_size, int):
+                output_file_size += sum(os.path.getsize(blob_path) for blob_path in blob_paths)
+
+        if previews is not None:
+            preview_path = write_preview(previews, output_file_path, method=WORKER_CONFIG["PREVIEW_METHOD"],
+                                         levels=WORKER_CONFIG["PREVIEW_LEVELS"])
+            result["output_preview"] = str(preview_path)
+            file_logger.info(f"Wrote preview levels {WORKER_CONFIG['PREVIEW_LEVELS']} to {preview_path}")
+
+        if merged_frames is not None:
+            try:
+                merged_path = write_merged_output(merged_frames, merged_header, output_file_path,
+                                                  method=WORKER_CONFIG["MERGE_METHOD"],
+                                                  step=WORKER_CONFIG["MERGE_STEP"] or None)
+            except Exception as e:
+                merged_path = None
+                file_logger.error(f"Error writing merged output: {e}")
+                file_logger.debug(traceback.format_exc())
+            if merged_path:
+                result["output_merged"] = str(merged_path)
+                file_logger.info(f"Wrote {len(merged_frames)} frame(s) merged on a common index to {merged_path}")
 
-        # Save JSON to file
-        file_logger.info(f"Saving JSON data to {output_file_path}...")
-        with open(output_file_path, "wb") as json_file:
-            json_file.write(json_bytes)
+        # Calculate checksum of the output JSON file (the pipeline hashed it while writing)
+        if checksum is None:
+            checksum = calculate_json_checksum(output_file_path)
 
-        # Calculate checksum of the output JSON file
-        checksum = calculate_json_checksum(output_file_path)
+        # The output is complete, a retry no longer needs the checkpoint
+        if checkpoint:
+            checkpoint.clear()
 
         result.update({
             "status": "SUCCESS",
             "output_file_checksum": checksum,
-            "output_file_size": os.path.getsize(output_file_path) if output_file_path.exists() else "N/A",
+            "output_file_size": output_file_size,
             "message": f"File processed successfully: {filepath}",
         })
 
         file_logger.info(f"Task completed successfully: {result}")
-        # Chain handle_task_completion
-        chain(handle_task_completion.s(result=JsonSerializable.to_json(result),
-                                       log_filename=log_filename,
-                                       initial_task_id=self.request.id)).apply_async()
+        _record_conversion_metrics(result, started)
+        if records_statistics is not None:
+            # Rows of the curve statistics summary, written by the completion task (kept out of the log)
+            result["curve_statistics"] = summary_rows(records_statistics, result)
+        if curve_units is not None:
+            # Indexed by the completion task with their units, not written to the summary CSV or the log
+            result["curve_units"] = curve_units
         return result
 
     except Exception as e:
@@ -183,4 +843,8 @@ def convert_to_json_task(self, filepath, output_folder, file_format, logical_fil
         result["message"] = f"Error processing {file_format} file: {str(e)}"
         file_logger.error(f"Error processing {file_format} file: {e}")
         file_logger.debug(traceback.format_exc())
+        # Failed conversions are not retried, so their checkpoint would never be used
+        if checkpoint:
+            checkpoint.clear()
+        _record_conversion_metrics(result, started)
         return result
\ No newline at end of file
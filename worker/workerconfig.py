@@ -0,0 +1,80 @@
+from pathlib import Path
+from utils.env import env_bool, env_float, env_int, env_int_list, env_str
+
+_data_folder = Path(__file__).resolve().parent / "data"
+
+# Worker-specific configuration
+WORKER_CONFIG = {
+    # Number of threads used inside a single DLIS logical file to run the metadata processors
+    # and the per-frame channel/bulk extraction concurrently (1 keeps the serial behaviour)
+    "INTRA_FILE_PARALLELISM": env_int("INTRA_FILE_PARALLELISM", 1),
+    # Output sharding: "none" writes a single JSON per logical file, "frame" one part per frame,
+    # "rows" one part per block of SHARD_ROWS rows. Sharded outputs come with a manifest.
+    "OUTPUT_SHARDING": env_str("OUTPUT_SHARDING", "none").lower(),
+    "SHARD_ROWS": env_int("SHARD_ROWS", 100000),
+    # Write a {name}.index.json sidecar with byte offsets of each section and of every
+    # INDEX_BLOCK_ROWS rows, so readers can seek to a depth interval without parsing everything
+    "WRITE_INDEX_SIDECAR": env_bool("WRITE_INDEX_SIDECAR", False),
+    "INDEX_BLOCK_ROWS": env_int("INDEX_BLOCK_ROWS", 1000),
+    # Array (multi-dimensional) DLIS channels: "nested" writes a list per sample in the data rows,
+    # "flat" one flattened block per channel in the record's "arrays" section, with its shape in the curve
+    "ARRAY_CHANNEL_LAYOUT": env_str("ARRAY_CHANNEL_LAYOUT", "nested").lower(),
+    # Array channels with at least BLOB_MIN_ELEMENTS elements per sample are written to binary blob
+    # files ("npy" or "raw") next to the JSON, which keeps a reference (0 disables it)
+    "BLOB_MIN_ELEMENTS": env_int("BLOB_MIN_ELEMENTS", 0),
+    "BLOB_FORMAT": env_str("BLOB_FORMAT", "npy").lower(),
+    # Pipelined execution: a conversion's extraction, serialization, writing and hashing run as
+    # overlapping stages with PIPELINE_QUEUE_SIZE records buffered between them. Applies to single
+    # JSON outputs without index or blobs
+    "PIPELINED_EXECUTION": env_bool("PIPELINED_EXECUTION", False),
+    "PIPELINE_QUEUE_SIZE": env_int("PIPELINE_QUEUE_SIZE", 2),
+    # Batch tasks ask the kernel to read their next file into the page cache while converting one
+    "PREFETCH_NEXT_FILE": env_bool("PREFETCH_NEXT_FILE", True),
+    # Decimated previews of the scalar curves ("minmax" envelopes or "lttb" samples at 1/level of
+    # the rows) written to {name}.preview.json during the conversion
+    "WRITE_PREVIEWS": env_bool("WRITE_PREVIEWS", False),
+    "PREVIEW_LEVELS": env_int_list("PREVIEW_LEVELS", [10, 100, 1000]),
+    "PREVIEW_METHOD": env_str("PREVIEW_METHOD", "minmax").lower(),
+    # Per-curve statistics and QC metrics (nulls, range, percentiles, spikes above SPIKE_THRESHOLD
+    # robust deviations, flatlines of FLATLINE_MIN_SAMPLES identical samples) added to the curve
+    # definitions and to summary/curve_statistics.csv
+    "CURVE_STATISTICS": env_bool("CURVE_STATISTICS", False),
+    "STATISTICS_PERCENTILES": env_int_list("STATISTICS_PERCENTILES", [10, 50, 90]),
+    "SPIKE_THRESHOLD": env_float("SPIKE_THRESHOLD", 5.0),
+    "FLATLINE_MIN_SAMPLES": env_int("FLATLINE_MIN_SAMPLES", 10),
+    # Merged output of each DLIS logical file: the scalar curves of all frames, flipped to increasing
+    # index and resampled ("linear" or "nearest") onto one grid of MERGE_STEP (0: finest frame
+    # spacing), written to {name}.merged.json
+    "WRITE_MERGED_OUTPUT": env_bool("WRITE_MERGED_OUTPUT", False),
+    "MERGE_METHOD": env_str("MERGE_METHOD", "linear").lower(),
+    "MERGE_STEP": env_float("MERGE_STEP", 0.0),
+    # Index the mnemonics, units, well, field, operator and date of every output in the search
+    # index (SEARCH_INDEX_PATH, see search/), queried with `python -m search`
+    "SEARCH_INDEX": env_bool("SEARCH_INDEX", True),
+    # Keep consumed broker messages in data/processed (they are subject to the retention limits)
+    "STORE_PROCESSED_MESSAGES": env_bool("STORE_PROCESSED_MESSAGES", False),
+    # Retention of result backend files and stored broker messages (0 disables a limit)
+    "RESULTS_TTL_SECONDS": env_int("RESULTS_TTL_SECONDS", 7 * 24 * 3600),
+    "RESULTS_MAX_FILES": env_int("RESULTS_MAX_FILES", 100000),
+    "RETENTION_INTERVAL_SECONDS": env_int("RETENTION_INTERVAL_SECONDS", 3600),
+    # DLIS conversions record completed frames in CHECKPOINT_FOLDER so a retried task resumes. Each
+    # frame is written and synced once more, so it only pays off for long conversions that get retried.
+    # Checkpoints of failed conversions are deleted; abandoned ones expire after CHECKPOINT_TTL_SECONDS
+    "CHECKPOINTS": env_bool("CHECKPOINTS", False),
+    "CHECKPOINT_FOLDER": env_str("CHECKPOINT_FOLDER", str(_data_folder / "checkpoints")),
+    "CHECKPOINT_TTL_SECONDS": env_int("CHECKPOINT_TTL_SECONDS", 24 * 3600),
+    # Profiling: every task, 1 in PROFILE_SAMPLE_EVERY tasks, or inputs with a {input}.profile marker
+    "PROFILE_TASKS": env_bool("PROFILE_TASKS", False),
+    "PROFILE_SAMPLE_EVERY": env_int("PROFILE_SAMPLE_EVERY", 0),
+    "PROFILE_TOP": env_int("PROFILE_TOP", 40),
+    "PROFILE_TRACE_ALLOCATIONS": env_bool("PROFILE_TRACE_ALLOCATIONS", True),
+    # Soft memory ceiling per conversion in MB (0 disables it): the conversion is stopped, recorded
+    # with status MEMORY_ERROR and, if HEAVY_QUEUE is set, re-queued there
+    "MEMORY_SOFT_LIMIT_MB": env_int("MEMORY_SOFT_LIMIT_MB", 0),
+    "MEMORY_SAMPLE_SECONDS": env_float("MEMORY_SAMPLE_SECONDS", 0.2),
+    "HEAVY_QUEUE": env_str("HEAVY_QUEUE", ""),
+    # Worker children are replaced after a task leaves them above this RSS in MB (0 disables it)
+    "MAX_MEMORY_PER_CHILD_MB": env_int("MAX_MEMORY_PER_CHILD_MB", 0),
+    # Metadata processor outputs cached per worker process, keyed by object set fingerprints (0 disables it)
+    "METADATA_CACHE_SIZE": env_int("METADATA_CACHE_SIZE", 256),
+}